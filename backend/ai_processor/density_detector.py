@@ -3,31 +3,41 @@ Crowd density calculation and analysis
 """
 import cv2
 import numpy as np
+from ai_processor.detections import as_detection_array
+from ai_processor.ground_plane import MIN_CELL_COVERAGE
 
 class DensityDetector:
     """Calculate crowd density from person detections"""
     
-    def __init__(self, reference_area_sqm=100.0):
+    def __init__(self, reference_area_sqm=100.0, max_density_per_sqm=2.0):
         """
         Initialize density detector
         
         Args:
             reference_area_sqm: Reference area in square meters for density calculation
-                                This is an approximation - adjust based on camera calibration
+                                This is an approximation used only for uncalibrated cameras
+            max_density_per_sqm: People per square meter treated as fully dense (density_value 1.0)
         """
         self.reference_area_sqm = reference_area_sqm
+        self.max_density_per_sqm = max_density_per_sqm
     
-    def calculate_density(self, detections, frame_shape):
+    def calculate_density(self, detections, frame_shape, ground_plane=None, hotspot_threshold=0.65):
         """
         Calculate crowd density from detections
         
         Args:
-            detections: List of person detections
+            detections: (N, 5) detection array or list of person detections
             frame_shape: Shape of the frame (height, width)
+            ground_plane: Optional GroundPlane for calibrated cameras
+            hotspot_threshold: Cell density value (0-1) reported as a hotspot (calibrated only)
         
         Returns:
-            dict with 'person_count', 'density_value', 'density_per_sqm'
+            dict with 'person_count', 'density_value', 'density_per_sqm'; calibrated
+            cameras add 'zone_count', 'zone_area_sqm', 'max_cell_value', 'grid' and 'hotspots'
         """
+        detections = as_detection_array(detections)
+        if ground_plane is not None:
+            return self._calibrated_density(detections, frame_shape, ground_plane, hotspot_threshold)
         person_count = len(detections)
         
         # Calculate approximate area covered by detections
@@ -44,13 +54,8 @@ class DensityDetector:
         frame_area_pixels = frame_height * frame_width
         
         # Average detection area (approximation)
-        total_detection_area = 0
-        for det in detections:
-            x1, y1, x2, y2 = det['bbox']
-            area = (x2 - x1) * (y2 - y1)
-            total_detection_area += area
-        
-        avg_detection_area = total_detection_area / person_count if person_count > 0 else 0
+        areas = (detections[:, 2] - detections[:, 0]) * (detections[:, 3] - detections[:, 1])
+        avg_detection_area = float(areas.mean())
         
         # Estimate ground area (simplified - assumes detections represent ~1-2 sqm per person)
         # This is a heuristic and should be calibrated for real-world use
@@ -64,8 +69,7 @@ class DensityDetector:
         density_per_sqm = person_count / area_sqm if area_sqm > 0 else 0
         
         # Normalized density value (0-1 scale, where 1 = very dense)
-        # Assuming >2 people/sq m is very dense
-        density_value = min(density_per_sqm / 2.0, 1.0)
+        density_value = min(density_per_sqm / self.max_density_per_sqm, 1.0)
         
         return {
             'person_count': person_count,
@@ -73,6 +77,51 @@ class DensityDetector:
             'density_per_sqm': round(density_per_sqm, 2)
         }
     
+    def _calibrated_density(self, detections, frame_shape, ground_plane, hotspot_threshold):
+        """Density over the calibrated ground zone, plus a per-cell occupancy grid"""
+        counts, layout = ground_plane.occupancy(detections, frame_shape)
+        zone_count = int(counts.sum())
+        zone_area = layout['zone_area']
+        density_per_sqm = zone_count / zone_area if zone_area > 0 else 0.0
+        
+        cell_area = layout['cell_area']
+        covered = cell_area >= MIN_CELL_COVERAGE * ground_plane.cell_size ** 2
+        cell_density = np.divide(counts, cell_area, out=np.zeros(counts.shape), where=covered)
+        cell_values = np.minimum(cell_density / self.max_density_per_sqm, 1.0)
+        
+        hotspots = [{
+            'row': int(row),
+            'col': int(col),
+            'count': int(counts[row, col]),
+            'density_per_sqm': round(float(cell_density[row, col]), 2)
+        } for row, col in np.argwhere(cell_values >= hotspot_threshold)]
+        
+        return {
+            'person_count': len(detections),
+            'density_value': round(min(density_per_sqm / self.max_density_per_sqm, 1.0), 3),
+            'density_per_sqm': round(density_per_sqm, 2),
+            'zone_count': zone_count,
+            'zone_area_sqm': round(zone_area, 1),
+            'max_cell_value': round(float(cell_values.max()), 3),
+            'grid': {
+                'rows': ground_plane.rows,
+                'cols': ground_plane.cols,
+                'cell_m': ground_plane.cell_size,
+                'counts': counts.tolist()
+            },
+            'hotspots': hotspots
+        }
+    
+    def check_alert(self, density_info, threshold=0.65):
+        """
+        Check whether the whole zone or any single grid cell exceeds the threshold
+        
+        Args:
+            density_info: Result of calculate_density()
+            threshold: Alert threshold (0-1)
+        """
+        return self.check_threshold(max(density_info['density_value'], density_info.get('max_cell_value', 0.0)), threshold)
+    
     def check_threshold(self, density_value, threshold=0.65):
         """
         Check if density exceeds threshold
@@ -0,0 +1,155 @@
+"""
+Compact detection arrays shared by detection, density and drawing code
+
+Detections are an (N, 5) float32 array with rows [x1, y1, x2, y2, confidence].
+"""
+import cv2
+import numpy as np
+
+def empty_detections():
+    """Return an empty (0, 5) detection array"""
+    return np.zeros((0, 5), dtype=np.float32)
+
+def as_detection_array(detections):
+    """
+    Normalize detections to an (N, 5) float32 array
+
+    Args:
+        detections: (N, 5) array or list of {'bbox': [...], 'confidence': float} dicts
+
+    Returns:
+        (N, 5) float32 array
+    """
+    if isinstance(detections, np.ndarray):
+        return detections.reshape(-1, 5).astype(np.float32, copy=False)
+    if not detections:
+        return empty_detections()
+    return np.array(
+        [[*det['bbox'], det['confidence']] for det in detections],
+        dtype=np.float32
+    )
+
+def _pairwise_overlap(boxes_a, boxes_b):
+    """Pairwise intersection areas (A, B) and the areas of both box sets"""
+    a = boxes_a[:, None, :4]
+    b = boxes_b[None, :, :4]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter_w * inter_h, area_a, area_b
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Pairwise intersection-over-union of two box sets
+
+    Args:
+        boxes_a: (A, 4+) array of [x1, y1, x2, y2, ...]
+        boxes_b: (B, 4+) array of [x1, y1, x2, y2, ...]
+
+    Returns:
+        (A, B) float32 IoU matrix
+    """
+    if not len(boxes_a) or not len(boxes_b):
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+    intersection, area_a, area_b = _pairwise_overlap(boxes_a, boxes_b)
+    union = np.maximum(area_a + area_b - intersection, 1e-6)
+    return (intersection / union).astype(np.float32, copy=False)
+
+def box_ios(boxes_a, boxes_b):
+    """
+    Pairwise intersection over the smaller box's area
+
+    Unlike IoU this is close to 1 when one box is a cut-off part of the other,
+    which is what duplicates from neighbouring tiles look like.
+
+    Args:
+        boxes_a: (A, 4+) array of [x1, y1, x2, y2, ...]
+        boxes_b: (B, 4+) array of [x1, y1, x2, y2, ...]
+
+    Returns:
+        (A, B) float32 matrix
+    """
+    if not len(boxes_a) or not len(boxes_b):
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+    intersection, area_a, area_b = _pairwise_overlap(boxes_a, boxes_b)
+    smaller = np.maximum(np.minimum(area_a, area_b), 1e-6)
+    return (intersection / smaller).astype(np.float32, copy=False)
+
+def non_max_suppression(detections, iou_threshold=0.45, max_detections=300):
+    """
+    Greedy NMS: keep the most confident box and drop boxes overlapping it
+
+    Each iteration computes the IoU of one kept box against all remaining
+    candidates at once, so the Python loop runs once per kept box rather than
+    once per pair.
+
+    Args:
+        detections: (N, 5) detection array
+        iou_threshold: Boxes overlapping a kept box by more than this are dropped
+        max_detections: Maximum number of boxes to keep
+
+    Returns:
+        (M, 5) detection array sorted by descending confidence
+    """
+    if not len(detections):
+        return detections
+    order = np.argsort(-detections[:, 4], kind='stable')
+    keep = []
+    while len(order) and len(keep) < max_detections:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        overlaps = box_iou(detections[best:best + 1], detections[rest])[0]
+        order = rest[overlaps <= iou_threshold]
+    return detections[keep]
+
+def detections_to_dicts(detections):
+    """
+    List-of-dicts view of detections (the format returned by the original detect() API)
+
+    Args:
+        detections: (N, 5) detection array
+
+    Returns:
+        List of detections: [{'bbox': [x1, y1, x2, y2], 'confidence': float}, ...]
+    """
+    array = as_detection_array(detections)
+    boxes = array[:, :4].astype(np.int32).tolist()
+    confidences = array[:, 4].tolist()
+    return [
+        {'bbox': bbox, 'confidence': confidence}
+        for bbox, confidence in zip(boxes, confidences)
+    ]
+
+def draw_detections(frame, detections, labels=True):
+    """
+    Draw bounding boxes on frame
+
+    Args:
+        frame: OpenCV frame
+        detections: (N, 5) detection array or list of detection dicts
+        labels: Draw confidence labels above each box
+
+    Returns:
+        Frame with drawn bounding boxes
+    """
+    detections = as_detection_array(detections)
+    boxes = detections[:, :4].astype(np.int32).tolist()
+    confidences = detections[:, 4].tolist()
+
+    for (x1, y1, x2, y2), confidence in zip(boxes, confidences):
+        # Draw bounding box (blue color)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 100, 0), 2)
+        if not labels:
+            continue
+
+        # Draw confidence label
+        label = f'Person {confidence:.2f}'
+        label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(frame, (x1, y1 - label_size[1] - 10),
+                      (x1 + label_size[0], y1), (255, 100, 0), -1)
+        cv2.putText(frame, label, (x1, y1 - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    return frame
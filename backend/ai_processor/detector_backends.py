@@ -0,0 +1,189 @@
+"""
+Pluggable person detector backends
+
+Every backend exposes the same interface as YOLOPersonDetector: detect_batch(),
+detect_array(), detect() and draw_detections(). Besides the ultralytics/PyTorch
+path, YOLOv8 models exported to ONNX (see ai_processor.export_onnx) can run on
+ONNX Runtime (optionally with the OpenVINO execution provider) or OpenCV DNN,
+which need neither torch nor ultralytics at runtime.
+"""
+import os
+import cv2
+import numpy as np
+from ai_processor.detections import (
+    empty_detections, detections_to_dicts, draw_detections, non_max_suppression
+)
+from ai_processor.frame_profiles import letterbox, unletterbox_detections
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DETECTOR_BACKENDS = ('ultralytics', 'onnxruntime', 'openvino', 'opencv')
+DEFAULT_ONNX_MODEL = os.path.join(BACKEND_DIR, 'weights', 'yolov8n-person-int8.onnx')
+
+class PersonDetector:
+    """Base class: subclasses implement detect_batch()"""
+
+    def detect_batch(self, frames, conf_threshold=0.25):
+        """
+        Detect people in several frames the caller already letterboxed or tiled
+
+        Args:
+            frames: List of OpenCV frames (numpy arrays)
+            conf_threshold: Confidence threshold for detections
+
+        Returns:
+            List with one (N, 5) detection array per input frame, in input order
+        """
+        raise NotImplementedError
+
+    def detect_array(self, frame, conf_threshold=0.25):
+        """Detect people in a single frame of any size, returning an (N, 5) array"""
+        return self.detect_batch([frame], conf_threshold)[0]
+
+    def detect(self, frame, conf_threshold=0.25):
+        """Detect people in a frame, returning a list of detection dicts"""
+        return detections_to_dicts(self.detect_array(frame, conf_threshold))
+
+    def draw_detections(self, frame, detections, labels=True):
+        """Draw bounding boxes on frame"""
+        return draw_detections(frame, detections, labels)
+
+class _OnnxPersonDetector(PersonDetector):
+    """
+    Pre- and post-processing shared by the ONNX backends
+
+    Frames are letterboxed to the model input and packed into one NCHW blob.
+    The raw YOLOv8 output (B, 4 + classes, anchors) is decoded in NumPy: only
+    the box rows and the person score (class 0) are read, so full COCO exports
+    and person-only exports are handled the same way.
+    """
+
+    def __init__(self, model_path, input_size=None, iou_threshold=0.45, max_detections=300):
+        self.model_path = model_path
+        self.input_size = input_size
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+
+    def detect_batch(self, frames, conf_threshold=0.25):
+        if not frames:
+            return []
+        size = self.input_size or max(32, (max(max(frame.shape[:2]) for frame in frames) + 31) // 32 * 32)
+        squares, transforms = [], []
+        for frame in frames:
+            square, scale, pad = letterbox(frame, size)
+            squares.append(square)
+            transforms.append((scale, pad, frame.shape))
+        blob = cv2.dnn.blobFromImages(squares, 1.0 / 255.0, (size, size), swapRB=True)
+        outputs = self._infer(blob)
+        return [
+            self._decode(output, conf_threshold, *transform)
+            for output, transform in zip(outputs, transforms)
+        ]
+
+    def _infer(self, blob):
+        """Run the network on an (N, 3, H, W) blob, returning (N, 4 + classes, anchors)"""
+        raise NotImplementedError
+
+    def _decode(self, output, conf_threshold, scale, pad, frame_shape):
+        """Decode one image's raw output into (N, 5) detections in frame coordinates"""
+        scores = output[4]
+        candidates = np.flatnonzero(scores >= conf_threshold)
+        if not len(candidates):
+            return empty_detections()
+        cx, cy, w, h = output[:4, candidates]
+        boxes = np.stack(
+            [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2, scores[candidates]], axis=1
+        ).astype(np.float32, copy=False)
+        boxes = non_max_suppression(boxes, self.iou_threshold, self.max_detections)
+        return unletterbox_detections(boxes, scale, pad, frame_shape)
+
+class OnnxRuntimePersonDetector(_OnnxPersonDetector):
+    """YOLOv8 ONNX model on ONNX Runtime (FP32 or INT8 QDQ)"""
+
+    def __init__(self, model_path=None, threads=0, openvino=False, **kwargs):
+        """
+        Initialize ONNX Runtime session
+
+        Args:
+            model_path: ONNX model path (defaults to the exported person-only INT8 model)
+            threads: Intra-op threads (0 lets ONNX Runtime choose)
+            openvino: Prefer the OpenVINO execution provider when it is installed
+        """
+        import onnxruntime as ort
+
+        model_path = model_path or DEFAULT_ONNX_MODEL
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        providers = ['CPUExecutionProvider']
+        if openvino:
+            if 'OpenVINOExecutionProvider' in ort.get_available_providers():
+                providers.insert(0, 'OpenVINOExecutionProvider')
+            else:
+                print("Warning: OpenVINO execution provider not available, using the CPU provider")
+        self.session = ort.InferenceSession(model_path, options, providers=providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        # Exported with a fixed input size and/or batch of 1 unless --dynamic was used
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        kwargs.setdefault('input_size', height if isinstance(height, int) else None)
+        super().__init__(model_path, **kwargs)
+        self.providers = self.session.get_providers()
+
+    def _infer(self, blob):
+        if self.fixed_batch is None or self.fixed_batch == len(blob):
+            return self.session.run(None, {self.input_name: blob})[0]
+        return np.concatenate([
+            self.session.run(None, {self.input_name: blob[i:i + 1]})[0]
+            for i in range(len(blob))
+        ])
+
+class OpenCVDNNPersonDetector(_OnnxPersonDetector):
+    """YOLOv8 ONNX model on OpenCV's DNN module (no extra dependencies)"""
+
+    def __init__(self, model_path=None, input_size=640, **kwargs):
+        """
+        Initialize OpenCV DNN network
+
+        Args:
+            model_path: ONNX model path (defaults to the exported person-only INT8 model)
+            input_size: Square network input size the model was exported with
+        """
+        model_path = model_path or DEFAULT_ONNX_MODEL
+        self.net = cv2.dnn.readNetFromONNX(model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        super().__init__(model_path, input_size=input_size, **kwargs)
+
+    def _infer(self, blob):
+        # One image per forward: OpenCV's ONNX importer handles a fixed batch of 1 most reliably
+        outputs = []
+        for i in range(len(blob)):
+            self.net.setInput(blob[i:i + 1])
+            outputs.append(self.net.forward())
+        return np.concatenate(outputs)
+
+def create_detector(backend='ultralytics', model_path=None, threads=0):
+    """
+    Build a person detector for the configured backend
+
+    Args:
+        backend: One of DETECTOR_BACKENDS
+        model_path: Weights (.pt) or ONNX model path; None uses the backend's default
+        threads: Inference threads for the ONNX Runtime backends (0 = library default)
+
+    Returns:
+        PersonDetector
+    """
+    if backend == 'ultralytics':
+        # Imported here so the ONNX backends never load torch
+        from ai_processor.yolo_model import YOLOPersonDetector
+        return YOLOPersonDetector(model_path)
+    if backend in ('onnxruntime', 'openvino'):
+        return OnnxRuntimePersonDetector(model_path, threads=threads, openvino=backend == 'openvino')
+    if backend == 'opencv':
+        return OpenCVDNNPersonDetector(model_path)
+    raise ValueError(f"Unknown detector backend: {backend} (expected one of {', '.join(DETECTOR_BACKENDS)})")
@@ -0,0 +1,243 @@
+"""
+Video capture through an ffmpeg subprocess writing raw frames to a pipe
+"""
+import json
+import shutil
+import time
+import cv2
+import numpy as np
+
+try:
+    # The capture thread is a native thread (see FrameGrabber), so the pipes must
+    # be plain blocking file objects rather than eventlet's green ones
+    from eventlet import patcher
+    subprocess = patcher.original('subprocess')
+    _time = patcher.original('time')
+except ImportError:
+    import subprocess
+    _time = time
+
+FFMPEG = shutil.which('ffmpeg')
+FFPROBE = shutil.which('ffprobe')
+
+CAPTURE_BACKENDS = ('opencv', 'ffmpeg')
+
+class FFmpegCapture:
+    """
+    Drop-in for the parts of cv2.VideoCapture that FrameGrabber uses
+
+    ffmpeg decodes (with its own decode threads), optionally scales, and writes
+    BGR24 frames to stdout. Frames are read with readinto() straight into a ring
+    of preallocated buffers and returned as NumPy views of them, so a read makes
+    no allocation or copy. A returned frame is overwritten after ring_size further
+    reads (about a quarter of a second at 30 fps with the default ring), so
+    anything kept longer must be copied; FrameGrabber copies the frames it
+    publishes (see reuses_buffers), and only those.
+    """
+
+    # Frames returned by read()/retrieve() are views that later reads overwrite
+    reuses_buffers = True
+
+    def __init__(self, source, loop=False, max_width=None, decode_threads=0, ring_size=8,
+                 reconnect_delay=1.0):
+        """
+        Initialize and start ffmpeg
+
+        Args:
+            source: RTSP/HTTP URL or video file path
+            loop: Restart from the beginning at end of file (video files)
+            max_width: Scale frames down to at most this width inside ffmpeg
+            decode_threads: ffmpeg decoder threads (0 lets ffmpeg choose)
+            ring_size: Number of preallocated frame buffers
+            reconnect_delay: Seconds to wait before restarting ffmpeg after it exits
+        """
+        self.source = source
+        self.loop = loop
+        self.max_width = max_width
+        self.decode_threads = decode_threads
+        self.ring_size = max(2, ring_size)
+        self.reconnect_delay = reconnect_delay
+
+        self.proc = None
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self._buffers = []
+        self._frames = []
+        self._index = 0
+        self._grabbed = None
+        self.frames_read = 0
+        self.restarts = 0
+        self.error = None
+
+        if FFMPEG is None or FFPROBE is None:
+            self.error = 'ffmpeg/ffprobe not found on PATH'
+            return
+        try:
+            self._probe()
+            self._allocate()
+            self._start()
+        except Exception as e:
+            self.error = str(e)
+            self.release()
+
+    def isOpened(self):
+        return self.proc is not None and self.error is None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        return 0.0
+
+    def set(self, prop, value):
+        """Seeking to frame 0 restarts the file; other properties are not supported"""
+        if prop == cv2.CAP_PROP_POS_FRAMES and value == 0:
+            self._restart(delay=0.0)
+            return True
+        return False
+
+    def read(self):
+        """
+        Read the next frame into the ring
+
+        Returns:
+            Tuple (ok, frame) like cv2.VideoCapture.read()
+        """
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def grab(self):
+        """
+        Read the next frame's bytes into the ring
+
+        ffmpeg has already decoded and converted it, so unlike OpenCV there is no
+        conversion left to skip; this exists so FrameGrabber can drive both alike.
+        """
+        if self.proc is None:
+            if not self._restart():
+                return False
+        buffer = self._buffers[self._index]
+        view = memoryview(buffer)
+        filled = 0
+        while filled < len(buffer):
+            count = self.proc.stdout.readinto(view[filled:])
+            if not count:
+                # ffmpeg exited (end of file or lost connection); restart on the next read
+                self._stop_process()
+                return False
+            filled += count
+        self._grabbed = self._index
+        self._index = (self._index + 1) % self.ring_size
+        self.frames_read += 1
+        return True
+
+    def retrieve(self):
+        """Return the last grabbed frame as a view of its ring buffer (valid until it is reused)"""
+        if self._grabbed is None:
+            return False, None
+        return True, self._frames[self._grabbed]
+
+    def release(self):
+        self._stop_process()
+
+    def stats(self):
+        return {
+            'backend': 'ffmpeg',
+            'width': self.width,
+            'height': self.height,
+            'frames_read': self.frames_read,
+            'restarts': self.restarts,
+            'error': self.error
+        }
+
+    def _probe(self):
+        """Read the source's size and frame rate with ffprobe"""
+        result = subprocess.run(
+            [FFPROBE, '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=width,height,avg_frame_rate,r_frame_rate',
+             '-of', 'json'] + self._input_options() + [self.source],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=15
+        )
+        streams = json.loads(result.stdout or b'{}').get('streams') or []
+        if not streams:
+            raise RuntimeError(f"ffprobe could not read {self.source}: {result.stderr.decode(errors='replace').strip()}")
+        stream = streams[0]
+        source_width, source_height = int(stream['width']), int(stream['height'])
+        self.fps = _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate'))
+
+        self.width, self.height = source_width, source_height
+        if self.max_width and source_width > self.max_width:
+            self.width = self.max_width - self.max_width % 2
+            self.height = max(2, round(source_height * self.width / source_width / 2) * 2)
+
+    def _allocate(self):
+        frame_bytes = self.width * self.height * 3
+        self._buffers = [bytearray(frame_bytes) for _ in range(self.ring_size)]
+        self._frames = [
+            np.frombuffer(buffer, dtype=np.uint8).reshape(self.height, self.width, 3)
+            for buffer in self._buffers
+        ]
+
+    def _input_options(self):
+        if self.source.startswith('rtsp://'):
+            return ['-rtsp_transport', 'tcp', '-timeout', '5000000']
+        if self.source.startswith(('http://', 'https://')):
+            return ['-rw_timeout', '5000000']
+        return []
+
+    def _start(self):
+        command = [FFMPEG, '-hide_banner', '-loglevel', 'error', '-nostdin']
+        if self.decode_threads:
+            command += ['-threads', str(self.decode_threads)]
+        if self.loop:
+            command += ['-stream_loop', '-1']
+        command += self._input_options() + ['-i', self.source, '-an', '-sn', '-dn']
+        if (self.width, self.height) != (0, 0):
+            command += ['-vf', f'scale={self.width}:{self.height}']
+        command += ['-pix_fmt', 'bgr24', '-f', 'rawvideo', 'pipe:1']
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+
+    def _restart(self, delay=None):
+        """Restart ffmpeg (reconnect); returns True if it is running again"""
+        self._stop_process()
+        if self.error and not self._buffers:
+            return False
+        _time.sleep(self.reconnect_delay if delay is None else delay)
+        try:
+            self._start()
+            self.restarts += 1
+            return True
+        except Exception as e:
+            self.error = str(e)
+            return False
+
+    def _stop_process(self):
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+        if proc.stdout:
+            proc.stdout.close()
+
+def _parse_rate(rate):
+    """'30000/1001' -> 29.97"""
+    try:
+        numerator, denominator = (rate or '0/1').split('/')
+        return float(numerator) / float(denominator) if float(denominator) else 0.0
+    except ValueError:
+        return 0.0
@@ -0,0 +1,206 @@
+"""
+Latest-frame-wins capture stage for video sources
+"""
+import time
+import cv2
+
+try:
+    # Capture must run on a real OS thread: cap.read() blocks inside native code
+    # and would stall the eventlet hub if it ran on a green thread.
+    from eventlet import patcher
+    _threading = patcher.original('threading')
+    _time = patcher.original('time')
+except ImportError:
+    import threading as _threading
+    _time = time
+
+class FrameGrabber:
+    """Read frames continuously and keep only the newest one in a single slot"""
+
+    def __init__(self, cap, camera_id, is_file_source=False, max_failures=10, target_fps=None):
+        """
+        Initialize frame grabber
+
+        Args:
+            cap: Opened cv2.VideoCapture or FFmpegCapture (the grabber takes ownership and releases it)
+            camera_id: Camera ID, used for thread naming and stats
+            is_file_source: True for local video files (looped and paced at native FPS)
+            max_failures: Consecutive read failures before the source is considered lost
+            target_fps: Rate frames are consumed at; frames beyond it are grabbed but never
+                        retrieved (None retrieves every frame)
+        """
+        self.cap = cap
+        self.camera_id = camera_id
+        self.is_file_source = is_file_source
+        self.max_failures = max_failures
+        self.error = None
+        # Sources reading into a ring of reused buffers (FFmpegCapture) would overwrite a
+        # published frame while the consumer is still detecting on or encoding it
+        self._copy_frames = getattr(cap, 'reuses_buffers', False)
+
+        self._lock = _threading.Lock()
+        self._frame = None
+        self._frame_id = 0
+        self._frame_time = 0.0
+        self._consumed_id = 0
+        self._running = False
+        self._thread = None
+
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0  # Grabbed but not retrieved
+
+        self._retrieve_interval = 0.0
+        self._source_interval = 0.0  # Smoothed time between grabbed frames
+        self._grab_cpu = 0.0  # Smoothed CPU seconds per grab() / retrieve()
+        self._retrieve_cpu = 0.0
+        self.set_target_fps(target_fps)
+
+        # Live sources are paced by the camera itself, files would be read as fast as
+        # they decode, so pace them at their native frame rate
+        self._frame_interval = 0.0
+        if is_file_source:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            self._frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 25
+            self._source_interval = self._frame_interval
+
+    @property
+    def alive(self):
+        """True while the capture thread is running"""
+        return self._running
+
+    def start(self):
+        """Start the capture thread"""
+        self._running = True
+        self._thread = _threading.Thread(
+            target=self._run,
+            name=f'grabber-{self.camera_id}',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Signal the capture thread to stop
+
+        Does not join: a blocked RTSP read can take seconds to time out, and the
+        thread releases the capture itself when it exits.
+        """
+        self._running = False
+
+    def set_target_fps(self, target_fps):
+        """
+        Change the rate frames are retrieved at
+
+        Args:
+            target_fps: Frames per second the consumer processes, or None for every frame
+        """
+        self._retrieve_interval = 1.0 / target_fps if target_fps and target_fps > 0 else 0.0
+
+    def latest(self, after_id=0):
+        """
+        Get the newest frame if it is newer than after_id
+
+        Args:
+            after_id: ID of the last frame the caller processed
+
+        Returns:
+            Tuple (frame_id, frame, captured_at) or None if no newer frame is available
+        """
+        with self._lock:
+            if self._frame is None or self._frame_id <= after_id:
+                return None
+            self._consumed_id = self._frame_id
+            return self._frame_id, self._frame, self._frame_time
+
+    def stats(self):
+        """Return capture counters"""
+        source_fps = 1.0 / self._source_interval if self._source_interval else 0.0
+        skip_ratio = self.frames_skipped / (self.frames_read + self.frames_skipped) if self.frames_read else 0.0
+        return {
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'frames_skipped': self.frames_skipped,
+            'source_fps': round(source_fps, 2),
+            'grab_cpu_ms': round(self._grab_cpu * 1000.0, 3),
+            'retrieve_cpu_ms': round(self._retrieve_cpu * 1000.0, 3),
+            # CPU per second not spent retrieving (converting) frames nobody would process
+            'decode_cpu_saved_ms_per_sec': round(source_fps * skip_ratio * self._retrieve_cpu * 1000.0, 1),
+            'alive': self._running,
+            'error': self.error,
+            'decoder': self.cap.stats() if hasattr(self.cap, 'stats') else {'backend': 'opencv'}
+        }
+
+    def _publish(self, frame):
+        """Replace the slot contents with a new frame, counting the stale one as dropped"""
+        if self._copy_frames:
+            frame = frame.copy()
+        with self._lock:
+            if self._frame_id > self._consumed_id:
+                self.frames_dropped += 1
+            self._frame = frame
+            self._frame_id += 1
+            self._frame_time = time.time()
+            self.frames_read += 1
+
+    def _run(self):
+        """Capture loop (runs on its own OS thread)"""
+        consecutive_failures = 0
+        last_grab = None
+        last_retrieve = 0.0
+        try:
+            while self._running:
+                started = _time.monotonic()
+                if self._retrieve_interval:
+                    # grab() advances the stream (demuxing and, for most codecs, decoding
+                    # so later frames stay decodable); retrieve() does the conversion to
+                    # BGR and is only paid for frames the consumer will see
+                    cpu_started = _time.thread_time()
+                    ret = self.cap.grab()
+                    self._grab_cpu = _smooth(self._grab_cpu, _time.thread_time() - cpu_started)
+                    frame = None
+                    if ret:
+                        if last_grab is not None:
+                            self._source_interval = _smooth(self._source_interval, started - last_grab)
+                        last_grab = started
+                        # Take the source frame closest to each due time rather than the first after it
+                        if started - last_retrieve >= self._retrieve_interval - self._source_interval / 2:
+                            cpu_started = _time.thread_time()
+                            ret, frame = self.cap.retrieve()
+                            self._retrieve_cpu = _smooth(self._retrieve_cpu, _time.thread_time() - cpu_started)
+                            last_retrieve = started
+                else:
+                    ret, frame = self.cap.read()
+
+                if not ret:
+                    if self.is_file_source:
+                        # Restart video file loop
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+
+                    consecutive_failures += 1
+                    if consecutive_failures >= self.max_failures:
+                        self.error = 'Connection lost'
+                        break
+                    _time.sleep(0.1)
+                    continue
+
+                consecutive_failures = 0
+                if frame is not None:
+                    self._publish(frame)
+                else:
+                    self.frames_skipped += 1
+
+                if self._frame_interval:
+                    remaining = self._frame_interval - (_time.monotonic() - started)
+                    if remaining > 0:
+                        _time.sleep(remaining)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._running = False
+            self.cap.release()
+
+def _smooth(average, sample, weight=0.1):
+    """Exponential moving average that starts at the first sample"""
+    return sample if not average else (1.0 - weight) * average + weight * sample
@@ -0,0 +1,93 @@
+"""
+Inference and delivery resolution profiles
+"""
+import cv2
+import numpy as np
+
+# Delivery profiles clients can pick when subscribing to a camera
+DELIVERY_PROFILES = {
+    'full': {'max_width': 1280, 'jpeg_quality': 80, 'labels': True, 'overlay': True},
+    'standard': {'max_width': 800, 'jpeg_quality': 70, 'labels': True, 'overlay': True},
+    'thumbnail': {'max_width': 320, 'jpeg_quality': 50, 'labels': False, 'overlay': False}
+}
+DEFAULT_PROFILE = 'standard'
+
+# Matches the input size yolov8 models are trained at
+DEFAULT_INFERENCE_SIZE = 640
+
+def resolve_profiles(overrides=None):
+    """
+    Merge a camera's profile overrides into the defaults
+
+    Args:
+        overrides: Optional {profile_name: {setting: value}} from the camera document
+
+    Returns:
+        {profile_name: settings} for every known profile
+    """
+    profiles = {name: dict(settings) for name, settings in DELIVERY_PROFILES.items()}
+    for name, settings in (overrides or {}).items():
+        if name in profiles and isinstance(settings, dict):
+            profiles[name].update(settings)
+    return profiles
+
+def resize_to_width(frame, max_width):
+    """
+    Downscale a frame so it is at most max_width pixels wide
+
+    Returns:
+        Tuple (frame, scale) - the input frame itself when no resize is needed
+    """
+    width = frame.shape[1]
+    if width <= max_width:
+        return frame, 1.0
+    scale = max_width / width
+    resized = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return resized, scale
+
+def letterbox(frame, size):
+    """
+    Resize a frame to fit a size x size square, padding the remainder
+
+    Returns:
+        Tuple (square frame, scale, (pad_x, pad_y)) needed to map detections back
+    """
+    height, width = frame.shape[:2]
+    scale = size / max(height, width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    if (new_width, new_height) != (width, height):
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        frame = cv2.resize(frame, (new_width, new_height), interpolation=interpolation)
+    pad_x = (size - new_width) // 2
+    pad_y = (size - new_height) // 2
+    square = cv2.copyMakeBorder(
+        frame, pad_y, size - new_height - pad_y, pad_x, size - new_width - pad_x,
+        cv2.BORDER_CONSTANT, value=(114, 114, 114)
+    )
+    return square, scale, (pad_x, pad_y)
+
+def unletterbox_detections(detections, scale, pad, frame_shape):
+    """
+    Map (N, 5) detections from letterboxed coordinates back to the source frame
+
+    Args:
+        detections: Detections in letterboxed coordinates
+        scale: Scale returned by letterbox()
+        pad: (pad_x, pad_y) returned by letterbox()
+        frame_shape: Shape of the source frame
+    """
+    mapped = detections.copy()
+    mapped[:, [0, 2]] = (mapped[:, [0, 2]] - pad[0]) / scale
+    mapped[:, [1, 3]] = (mapped[:, [1, 3]] - pad[1]) / scale
+    height, width = frame_shape[:2]
+    mapped[:, [0, 2]] = np.clip(mapped[:, [0, 2]], 0, width - 1)
+    mapped[:, [1, 3]] = np.clip(mapped[:, [1, 3]], 0, height - 1)
+    return mapped
+
+def scale_detections(detections, scale):
+    """Scale (N, 5) detection boxes by a factor, leaving confidences untouched"""
+    if scale == 1.0:
+        return detections
+    scaled = detections.copy()
+    scaled[:, :4] *= scale
+    return scaled
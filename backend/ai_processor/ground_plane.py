@@ -0,0 +1,143 @@
+"""
+Ground-plane calibration: image pixels to real-world metres
+"""
+import math
+import cv2
+import numpy as np
+
+# Default side length (metres) of an occupancy grid cell
+DEFAULT_CELL_SIZE_M = 2.0
+
+# Cells whose visible ground is smaller than this fraction of a full cell are
+# ignored for hotspots - a sliver at the zone edge would otherwise report huge densities
+MIN_CELL_COVERAGE = 0.25
+
+def validate_calibration(calibration):
+    """
+    Check a camera's calibration document
+
+    Args:
+        calibration: {'image_points': 4 x [x, y] normalized to 0-1,
+                      'world_points': 4 x [x, y] in metres,
+                      'grid_cell_m': optional cell size in metres}
+
+    Returns:
+        Error message, or None if the calibration is usable
+    """
+    if not isinstance(calibration, dict):
+        return 'calibration must be an object'
+    try:
+        image_points = np.array(calibration.get('image_points'), dtype=np.float64)
+        world_points = np.array(calibration.get('world_points'), dtype=np.float64)
+    except (TypeError, ValueError):
+        return 'calibration points must be numbers'
+    if image_points.shape != (4, 2) or world_points.shape != (4, 2):
+        return 'calibration needs exactly four image_points and four world_points'
+    if not np.isfinite(image_points).all() or not np.isfinite(world_points).all():
+        return 'calibration points must be finite'
+    if (image_points < 0).any() or (image_points > 1).any():
+        return 'image_points must be normalized to the 0-1 range'
+    if abs(cv2.contourArea(image_points.astype(np.float32))) < 1e-4:
+        return 'image_points must enclose an area'
+    if abs(cv2.contourArea(world_points.astype(np.float32))) < 1e-2:
+        return 'world_points must enclose an area'
+    cell = calibration.get('grid_cell_m', DEFAULT_CELL_SIZE_M)
+    if not isinstance(cell, (int, float)) or not 0.25 <= cell <= 20:
+        return 'grid_cell_m must be between 0.25 and 20'
+    return None
+
+class GroundPlane:
+    """Homography from a camera's image to its ground plane, with a cached layout per resolution"""
+
+    def __init__(self, calibration):
+        """
+        Initialize ground plane
+
+        Args:
+            calibration: Validated calibration document (see validate_calibration)
+        """
+        self.image_points = np.array(calibration['image_points'], dtype=np.float32)
+        self.world_points = np.array(calibration['world_points'], dtype=np.float32)
+        self.cell_size = float(calibration.get('grid_cell_m', DEFAULT_CELL_SIZE_M))
+
+        # Grid covers the bounding box of the calibrated zone on the ground
+        self.origin = self.world_points.min(axis=0)
+        extent = self.world_points.max(axis=0) - self.origin
+        self.cols = max(1, math.ceil(extent[0] / self.cell_size))
+        self.rows = max(1, math.ceil(extent[1] / self.cell_size))
+        self._layouts = {}  # {(height, width): layout dict}
+
+    def layout(self, frame_shape):
+        """
+        Precomputed geometry for a frame size
+
+        Returns:
+            dict with 'homography', 'mask' (pixels inside the zone), 'zone_area' (m^2)
+            and 'cell_area' ((rows, cols) m^2 of visible ground per grid cell)
+        """
+        height, width = frame_shape[:2]
+        layout = self._layouts.get((height, width))
+        if layout is not None:
+            return layout
+
+        pixels = self.image_points * np.array([width, height], dtype=np.float32)
+        homography = cv2.getPerspectiveTransform(pixels, self.world_points)
+
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, [np.round(pixels).astype(np.int32)], 1)
+        ys, xs = np.nonzero(mask)
+
+        # Ground area under each pixel is the homography's Jacobian determinant,
+        # which for a projective map is det(H) / w^3
+        w = homography[2, 0] * xs + homography[2, 1] * ys + homography[2, 2]
+        pixel_area = np.abs(np.linalg.det(homography)) / np.maximum(np.abs(w), 1e-9) ** 3
+
+        world = cv2.perspectiveTransform(np.stack([xs, ys], axis=1).astype(np.float32)[None], homography)[0]
+        cells, valid = self._cell_index(world)
+        cell_area = np.bincount(
+            cells[valid], weights=pixel_area[valid], minlength=self.rows * self.cols
+        ).reshape(self.rows, self.cols)
+
+        layout = {
+            'homography': homography,
+            'mask': mask,
+            'zone_area': float(pixel_area.sum()),
+            'cell_area': cell_area
+        }
+        self._layouts[(height, width)] = layout
+        return layout
+
+    def occupancy(self, detections, frame_shape):
+        """
+        Count people per ground cell from their foot points
+
+        Args:
+            detections: (N, 5) detection array in frame coordinates
+            frame_shape: Shape of the frame the detections belong to
+
+        Returns:
+            Tuple ((rows, cols) int count grid, layout)
+        """
+        layout = self.layout(frame_shape)
+        counts = np.zeros(self.rows * self.cols, dtype=np.int64)
+        if len(detections):
+            height, width = frame_shape[:2]
+            # Foot point: bottom centre of the box, the part that touches the ground
+            feet_x = np.clip((detections[:, 0] + detections[:, 2]) / 2.0, 0, width - 1)
+            feet_y = np.clip(detections[:, 3], 0, height - 1)
+            inside = layout['mask'][feet_y.astype(np.int32), feet_x.astype(np.int32)] > 0
+            if inside.any():
+                feet = np.stack([feet_x[inside], feet_y[inside]], axis=1).astype(np.float32)
+                world = cv2.perspectiveTransform(feet[None], layout['homography'])[0]
+                cells, valid = self._cell_index(world)
+                counts = np.bincount(cells[valid], minlength=self.rows * self.cols)
+        return counts.reshape(self.rows, self.cols), layout
+
+    def _cell_index(self, world):
+        """Flattened grid cell of each (x, y) ground point, and which points fall on the grid"""
+        grid = np.floor((world - self.origin) / self.cell_size).astype(np.int64)
+        valid = (
+            (grid[:, 0] >= 0) & (grid[:, 0] < self.cols) &
+            (grid[:, 1] >= 0) & (grid[:, 1] < self.rows)
+        )
+        return grid[:, 1] * self.cols + grid[:, 0], valid
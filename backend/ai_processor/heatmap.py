@@ -0,0 +1,97 @@
+"""
+Crowd heatmap overlay rendered from detection foot points
+"""
+import cv2
+import numpy as np
+
+# Render modes viewers can pick; 'auto' draws boxes, without labels once the crowd
+# is large (the cheapest overlay - see benchmarks/bench_overlay.py)
+RENDER_MODES = ('boxes', 'heatmap', 'auto')
+DEFAULT_RENDER_MODE = 'auto'
+
+class HeatmapRenderer:
+    """
+    Draw a colour-mapped density overlay instead of one box per person
+
+    Foot points are binned into a coarse grid, blurred with a cached Gaussian
+    kernel and blended onto the frame with a per-pixel alpha, so the cost is a
+    few array operations regardless of how many people are in view. The grid is
+    colour-mapped at its own resolution and only the rectangle with visible heat
+    is upscaled and blended.
+    """
+
+    # Heat below this (under half a colour step at full opacity) is not drawn
+    MIN_HEAT = 1.0 / 255.0
+
+    def __init__(self, cell_px=16, sigma_cells=1.5, alpha=0.55, saturation_people=4.0):
+        """
+        Initialize heatmap renderer
+
+        Args:
+            cell_px: Size of a grid cell in frame pixels
+            sigma_cells: Gaussian blur radius in grid cells
+            alpha: Overlay opacity at full heat
+            saturation_people: Overlapping people at which the colour map saturates
+        """
+        self.cell_px = cell_px
+        self.sigma_cells = sigma_cells
+        self.alpha = alpha
+        self.saturation_people = saturation_people
+
+        # Separable kernel, built once; its peak sets the heat of a single person
+        size = 2 * int(3 * sigma_cells) + 1
+        self.kernel = cv2.getGaussianKernel(size, sigma_cells).astype(np.float32)
+        self.saturation = float(self.kernel.max() ** 2) * saturation_people
+
+    def render(self, frame, detections):
+        """
+        Blend the heatmap of detections onto frame in place
+
+        Args:
+            frame: OpenCV frame the detections are in coordinates of
+            detections: (N, 5) detection array
+
+        Returns:
+            The frame
+        """
+        height, width = frame.shape[:2]
+        rows = max(1, -(-height // self.cell_px))
+        cols = max(1, -(-width // self.cell_px))
+
+        grid = np.zeros(rows * cols, dtype=np.float32)
+        if len(detections):
+            # Foot point: bottom centre of each box
+            feet_x = ((detections[:, 0] + detections[:, 2]) / 2.0) // self.cell_px
+            feet_y = detections[:, 3] // self.cell_px
+            cells = np.clip(feet_y, 0, rows - 1).astype(np.int64) * cols + np.clip(feet_x, 0, cols - 1).astype(np.int64)
+            grid = np.bincount(cells, minlength=rows * cols).astype(np.float32)
+        grid = grid.reshape(rows, cols)
+
+        heat = cv2.sepFilter2D(grid, -1, self.kernel, self.kernel, borderType=cv2.BORDER_CONSTANT)
+        heat = np.minimum(heat * (1.0 / self.saturation), 1.0)
+
+        # Only cells with visible heat are blended: crop to them (plus one cell so the
+        # upscaling interpolates across the edge) instead of blending the whole frame
+        visible = heat >= self.MIN_HEAT
+        active_rows = np.flatnonzero(visible.any(axis=1))
+        if not len(active_rows):
+            return frame
+        active_cols = np.flatnonzero(visible.any(axis=0))
+        row_start, row_end = max(0, active_rows[0] - 1), min(rows, active_rows[-1] + 2)
+        col_start, col_end = max(0, active_cols[0] - 1), min(cols, active_cols[-1] + 2)
+        heat = heat[row_start:row_end, col_start:col_end]
+
+        y0, x0 = row_start * self.cell_px, col_start * self.cell_px
+        y1, x1 = min(height, row_end * self.cell_px), min(width, col_end * self.cell_px)
+        size = ((col_end - col_start) * self.cell_px, (row_end - row_start) * self.cell_px)
+
+        # Colour-mapped at grid resolution, then upscaled together with the weights
+        # (cropped where the last cells reach past the frame edge)
+        colours = cv2.applyColorMap((heat * 255).astype(np.uint8), cv2.COLORMAP_JET)
+        colours = np.ascontiguousarray(cv2.resize(colours, size, interpolation=cv2.INTER_LINEAR)[:y1 - y0, :x1 - x0])
+        overlay_weight = np.ascontiguousarray(
+            cv2.resize(heat * self.alpha, size, interpolation=cv2.INTER_LINEAR)[:y1 - y0, :x1 - x0]
+        )
+        region = np.ascontiguousarray(frame[y0:y1, x0:x1])
+        frame[y0:y1, x0:x1] = cv2.blendLinear(region, colours, 1.0 - overlay_weight, overlay_weight)
+        return frame
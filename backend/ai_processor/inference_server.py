@@ -0,0 +1,287 @@
+"""
+Shared batched inference across all active camera streams
+"""
+import threading
+import time
+from collections import deque
+
+class InferenceRequest:
+    """A pending detection request for one camera frame (or the tiles of one frame)"""
+
+    def __init__(self, camera_id, frames, detector_key=None, single=True):
+        self.camera_id = camera_id
+        self.frames = frames
+        self.detector_key = detector_key
+        self.single = single  # Resolve with one detection array rather than a list
+        self.submitted_at = time.time()
+        self.latency_ms = 0.0  # Submit to result
+        self.inference_ms = 0.0  # Forward pass of the batch this frame ran in
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def resolve(self, result=None, error=None):
+        """Complete the request with a result or an error"""
+        self.result = result
+        self.error = error
+        self.latency_ms = (time.time() - self.submitted_at) * 1000.0
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the detections of this frame
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Detections for the submitted frame, or a list with one array per tile
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f'Inference timed out for camera {self.camera_id}')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class InferenceServer:
+    """
+    Collect the newest frame of every active stream and run them as one batch
+
+    Cameras may use different detectors (model and input size, see
+    ModelSelector); frames are only batched with frames for the same detector.
+    """
+
+    def __init__(self, socketio, detector, max_batch_size=8, max_wait=0.02, conf_threshold=0.25):
+        """
+        Initialize inference server
+
+        Args:
+            socketio: Flask-SocketIO instance (used to run the scheduler as a background task)
+            detector: Default detector providing detect_batch(frames, conf_threshold)
+            max_batch_size: Maximum number of frames per forward pass
+            max_wait: Maximum seconds the oldest frame waits for the batch to fill
+            conf_threshold: Confidence threshold for detections
+        """
+        self.socketio = socketio
+        self.detector = detector
+        self.detectors = {None: detector}  # {detector key: detector}
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self.conf_threshold = conf_threshold
+        self.running = False
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = {}  # {camera_id: InferenceRequest} - newest frame per camera
+        self._streams = {}  # {camera_id: detector key} - cameras expected to contribute to batches
+
+        self.batches = 0
+        self.frames = 0
+        self.superseded = 0
+        self.errors = 0
+        self._recent = deque(maxlen=200)  # (batch_size, wait_ms, inference_ms)
+        self._by_detector = {}  # {detector key: [batches, frames, inference ms]}
+
+    def start(self):
+        """Start the scheduler loop"""
+        if self.running:
+            return
+        self.running = True
+        self.socketio.start_background_task(target=self._run)
+
+    def stop(self):
+        """Stop the scheduler loop and fail any pending requests"""
+        self.running = False
+        self._wakeup.set()
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for request in pending:
+            request.resolve(error=RuntimeError('Inference server stopped'))
+
+    def add_detector(self, key, detector):
+        """Make a detector available to submit() under key"""
+        self.detectors[key] = detector
+
+    def register_stream(self, camera_id, detector_key=None):
+        """Declare that a camera will submit frames"""
+        with self._lock:
+            self._streams[camera_id] = detector_key
+
+    def unregister_stream(self, camera_id):
+        """Remove a camera from the set the scheduler waits for"""
+        with self._lock:
+            self._streams.pop(camera_id, None)
+        self._wakeup.set()
+
+    def submit(self, camera_id, frame, detector_key=None):
+        """
+        Queue a frame for detection
+
+        A frame still waiting from the same camera is superseded by the new one.
+
+        Args:
+            camera_id: Camera the frame belongs to
+            frame: Frame to run detection on
+            detector_key: Detector registered with add_detector() (None = default)
+
+        Returns:
+            InferenceRequest to wait on
+        """
+        return self._enqueue(InferenceRequest(camera_id, [frame], detector_key))
+
+    def submit_tiles(self, camera_id, tiles, detector_key=None):
+        """
+        Queue the tiles of one frame; they run in the same batch
+
+        Returns:
+            InferenceRequest resolving to one detection array per tile
+        """
+        return self._enqueue(InferenceRequest(camera_id, list(tiles), detector_key, single=False))
+
+    def _enqueue(self, request):
+        """Make request the pending request of its camera"""
+        camera_id, detector_key = request.camera_id, request.detector_key
+        if detector_key not in self.detectors:
+            raise KeyError(f'Unknown detector: {detector_key}')
+        with self._lock:
+            previous = self._pending.get(camera_id)
+            self._pending[camera_id] = request
+            if camera_id in self._streams:
+                self._streams[camera_id] = detector_key
+        if previous is not None:
+            self.superseded += 1
+            previous.resolve(error=RuntimeError('Superseded by a newer frame'))
+        self._wakeup.set()
+        return request
+
+    def detect(self, camera_id, frame, timeout=10.0, detector_key=None):
+        """Submit a frame and wait for its detections"""
+        return self.submit(camera_id, frame, detector_key).wait(timeout)
+
+    def _collect_batch(self):
+        """
+        Wait until the batch is full, every stream has submitted or max_wait expires
+
+        The batch runs the detector of the oldest pending frame; frames for other
+        detectors stay pending for the next batch. Batch size counts frames, so a
+        tiled request fills several slots (and always runs, even if it alone
+        exceeds max_batch_size).
+        """
+        with self._lock:
+            if not self._pending:
+                self._wakeup.clear()
+                return []
+            first = min(self._pending.values(), key=lambda r: r.submitted_at)
+            oldest, key = first.submitted_at, first.detector_key
+
+        while self.running:
+            with self._lock:
+                self._wakeup.clear()
+                ready = sum(len(request.frames) for request in self._pending.values() if request.detector_key == key)
+                missing = sum(
+                    1 for camera_id, stream_key in self._streams.items()
+                    if stream_key == key and camera_id not in self._pending
+                )
+            remaining = oldest + self.max_wait - time.time()
+            if ready >= self.max_batch_size or missing == 0 or remaining <= 0:
+                break
+            self._wakeup.wait(remaining)
+
+        with self._lock:
+            batch, frames = [], 0
+            for request in sorted(self._pending.values(), key=lambda r: r.submitted_at):
+                if request.detector_key != key:
+                    continue
+                if batch and frames + len(request.frames) > self.max_batch_size:
+                    break
+                batch.append(request)
+                frames += len(request.frames)
+            for request in batch:
+                del self._pending[request.camera_id]
+            if self._pending:
+                self._wakeup.set()
+        return batch
+
+    def _run(self):
+        """Scheduler loop"""
+        while self.running:
+            self._wakeup.wait(0.5)
+            batch = self._collect_batch()
+            if batch:
+                self._run_batch(batch)
+            # Yield so streams can pick up their results before the next batch
+            self.socketio.sleep(0)
+
+    def _run_batch(self, batch):
+        """Run one forward pass and route the results back to each camera"""
+        started = time.time()
+        wait_ms = sum(started - request.submitted_at for request in batch) * 1000.0 / len(batch)
+        key = batch[0].detector_key
+        frames = [frame for request in batch for frame in request.frames]
+        try:
+            results = self.detectors[key].detect_batch(frames, self.conf_threshold)
+        except Exception as e:
+            self.errors += 1
+            print(f"Batched inference failed: {e}")
+            for request in batch:
+                request.resolve(error=e)
+            return
+
+        inference_ms = (time.time() - started) * 1000.0
+        self.batches += 1
+        self.frames += len(frames)
+        self._recent.append((len(frames), wait_ms, inference_ms))
+        totals = self._by_detector.setdefault(key, [0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += len(frames)
+        totals[2] += inference_ms
+
+        start = 0
+        for request in batch:
+            detections = results[start:start + len(request.frames)]
+            start += len(request.frames)
+            request.inference_ms = inference_ms
+            request.resolve(result=detections[0] if request.single else detections)
+
+    def stats(self):
+        """
+        Get per-batch timing statistics
+
+        Returns:
+            dict with totals, recent averages and a per-batch-size breakdown
+        """
+        recent = list(self._recent)
+        by_size = {}
+        for size, wait_ms, inference_ms in recent:
+            entry = by_size.setdefault(size, {'batches': 0, 'inference_ms': 0.0, 'wait_ms': 0.0})
+            entry['batches'] += 1
+            entry['inference_ms'] += inference_ms
+            entry['wait_ms'] += wait_ms
+        for size, entry in by_size.items():
+            entry['avg_inference_ms'] = round(entry.pop('inference_ms') / entry['batches'], 2)
+            entry['avg_wait_ms'] = round(entry.pop('wait_ms') / entry['batches'], 2)
+            entry['per_frame_ms'] = round(entry['avg_inference_ms'] / size, 2)
+
+        count = len(recent)
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000.0, 1),
+            'batches': self.batches,
+            'frames': self.frames,
+            'superseded': self.superseded,
+            'errors': self.errors,
+            'avg_batch_size': round(sum(r[0] for r in recent) / count, 2) if count else 0.0,
+            'avg_wait_ms': round(sum(r[1] for r in recent) / count, 2) if count else 0.0,
+            'avg_inference_ms': round(sum(r[2] for r in recent) / count, 2) if count else 0.0,
+            'by_batch_size': {str(size): entry for size, entry in sorted(by_size.items())},
+            'by_detector': {
+                key or 'default': {
+                    'batches': batches,
+                    'frames': frames,
+                    'avg_batch_size': round(frames / batches, 2),
+                    'avg_inference_ms': round(total_ms / batches, 2)
+                }
+                for key, (batches, frames, total_ms) in self._by_detector.items()
+            }
+        }
@@ -0,0 +1,100 @@
+"""
+Inference worker process for ProcessPoolDetector
+
+Run as: python -m ai_processor.inference_worker --model yolov8n.pt --cpus 0,1 [--backend ultralytics]
+
+Protocol (one JSON object per line):
+    stdin   {"shm": name, "frames": [[height, width, channels, offset], ...], "conf": 0.25}
+    stdout  {"detections": [[[x1, y1, x2, y2, conf], ...], ...], "ms": float}
+            {"error": message}
+The first line written to stdout is {"ready": true} once the model is loaded.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+def _attach(name):
+    """Attach to a shared memory block owned by the parent process"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers with the resource tracker, which would
+        # unlink the parent's block when this worker exits
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+def _pin_to_cpus(cpus, torch_threads=True):
+    """Restrict this process (and torch's intra-op pool) to the given cores"""
+    if not cpus:
+        return
+    if hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            print(f"Inference worker could not pin to CPUs {cpus}: {e}", file=sys.stderr)
+    if not torch_threads:
+        return  # ONNX backends size their thread pool from the CPU count instead
+    try:
+        import torch
+        torch.set_num_threads(len(cpus))
+    except ImportError:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Person detection worker process')
+    parser.add_argument('--model', default=None, help='Model weights path')
+    parser.add_argument('--cpus', default='', help='Comma-separated CPU ids to pin to')
+    parser.add_argument('--backend', default='ultralytics', help='Detector backend')
+    args = parser.parse_args()
+
+    # Keep stdout for the protocol only; anything the libraries print goes to stderr
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    cpus = {int(cpu) for cpu in args.cpus.split(',') if cpu.strip()}
+    _pin_to_cpus(cpus, torch_threads=args.backend == 'ultralytics')
+
+    from ai_processor.detector_backends import create_detector
+    detector = create_detector(args.backend, args.model, threads=len(cpus))
+    protocol_out.write(json.dumps({'ready': True}) + '\n')
+
+    shm = None
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if shm is None or shm.name != request['shm']:
+                if shm is not None:
+                    shm.close()
+                shm = _attach(request['shm'])
+
+            # Views into shared memory - no copy on this side
+            frames = [
+                np.ndarray((height, width, channels), dtype=np.uint8, buffer=shm.buf, offset=offset)
+                for height, width, channels, offset in request['frames']
+            ]
+            started = time.perf_counter()
+            results = detector.detect_batch(frames, request.get('conf', 0.25))
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            del frames
+
+            protocol_out.write(json.dumps({
+                'detections': [result.tolist() for result in results],
+                'ms': round(elapsed_ms, 2)
+            }) + '\n')
+        except Exception as e:
+            protocol_out.write(json.dumps({'error': str(e)}) + '\n')
+
+    if shm is not None:
+        shm.close()
+
+if __name__ == '__main__':
+    main()
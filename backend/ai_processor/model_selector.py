@@ -0,0 +1,207 @@
+"""
+Latency-budget-aware choice of detection model and input size per camera
+"""
+import time
+import numpy as np
+from ai_processor.detector_backends import create_detector
+from ai_processor.tiling import tile_layout
+
+# Least to most accurate; used when MODEL_CANDIDATES is not set (the default model at three input sizes)
+DEFAULT_CANDIDATES = '@320,@480,@640'
+
+class ModelCandidate:
+    """One model at one input size, with its measured latency"""
+
+    def __init__(self, model_path, input_size, rank):
+        self.model_path = model_path
+        self.input_size = input_size
+        self.rank = rank  # Position in the candidate list: higher is more accurate
+        self.key = f'{model_path}@{input_size}'
+        self.benchmark_ms = None
+
+    def to_dict(self):
+        return {
+            'model': self.model_path,
+            'input_size': self.input_size,
+            'benchmark_ms': round(self.benchmark_ms, 1) if self.benchmark_ms is not None else None
+        }
+
+def parse_candidates(spec, default_model):
+    """
+    Parse 'model@size,model@size,...' (least to most accurate) into candidates
+
+    A missing model means default_model, a missing @size means 640.
+    """
+    candidates = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        model_path, _, size = item.rpartition('@') if '@' in item else (item, '', '640')
+        candidates.append(ModelCandidate(model_path or default_model, int(size), len(candidates)))
+    return candidates
+
+class ModelSelector:
+    """
+    Pick the most accurate candidate whose latency fits a camera's budget
+
+    Every candidate is benchmarked once in isolation at startup. At runtime the
+    inference time cameras actually observe (which includes sharing batches with
+    other cameras) is compared with those benchmarks; the ratio (the load factor)
+    scales every candidate's expected latency, so when the machine gets busier
+    cameras step down to cheaper models and step back up when load drops.
+
+    For a tiled camera a frame costs one detection per tile, and a smaller input
+    size means more tiles, so its expected latency is the per-tile benchmark
+    times the tile count the candidate's input size gives for the camera's
+    frames (tiling is passed as (height, width, overlap)).
+    """
+
+    def __init__(self, candidates, backend='ultralytics', default_model=None, default_detector=None,
+                 overhead_ms=0.0, reevaluate_interval=10.0, upgrade_margin=0.15):
+        """
+        Initialize model selector
+
+        Args:
+            candidates: ModelCandidate list, least to most accurate
+            backend: Detector backend used to load candidate models
+            default_model: Model path of the already loaded default detector
+            default_detector: Loaded detector reused for candidates with default_model
+            overhead_ms: Fixed latency added to every detection (e.g. the batching wait)
+            reevaluate_interval: Seconds between re-selections for a running camera
+            upgrade_margin: Headroom a more accurate model needs before switching up to it
+        """
+        self.candidates = candidates
+        self.backend = backend
+        self.overhead_ms = overhead_ms
+        self.reevaluate_interval = reevaluate_interval
+        self.upgrade_margin = upgrade_margin
+        self.detectors = {}  # {model_path: detector}
+        if default_detector is not None:
+            self.detectors[default_model] = default_detector
+        self.load_factor = 1.0
+        self._observed = {}  # {(candidate key, tiles): smoothed observed ms per frame}
+        self.evaluated_at = None
+
+    def benchmark(self, repeat=5):
+        """
+        Load every candidate model and time it on a synthetic frame
+
+        Candidates whose model fails to load are dropped.
+
+        Returns:
+            List of benchmarked candidates
+        """
+        rng = np.random.default_rng(0)
+        available = []
+        for candidate in self.candidates:
+            try:
+                detector = self.detector(candidate)
+            except Exception as e:
+                print(f"Warning: Skipping model candidate {candidate.key}: {e}")
+                continue
+            frame = rng.integers(0, 255, (candidate.input_size, candidate.input_size, 3), dtype=np.uint8)
+            # detect_batch() runs the frame at the candidate's size, as the pipeline does
+            detector.detect_batch([frame])  # Warm-up
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                detector.detect_batch([frame])
+                timings.append((time.perf_counter() - started) * 1000.0)
+            candidate.benchmark_ms = float(np.median(timings))
+            available.append(candidate)
+            print(f"✓ Benchmarked {candidate.key}: {candidate.benchmark_ms:.1f} ms")
+        self.candidates = available
+        self.evaluated_at = time.time()
+        return available
+
+    def detector(self, candidate):
+        """Detector for a candidate, loading its model on first use"""
+        if candidate.model_path not in self.detectors:
+            self.detectors[candidate.model_path] = create_detector(self.backend, candidate.model_path)
+        return self.detectors[candidate.model_path]
+
+    @staticmethod
+    def tile_count(candidate, tiling=None):
+        """Detections per frame: 1, or the tiles of a tiled camera's frames at the candidate's size"""
+        if tiling is None:
+            return 1
+        height, width, overlap = tiling
+        return len(tile_layout(height, width, candidate.input_size, overlap))
+
+    def expected_ms(self, candidate, tiling=None):
+        """Expected per-frame latency of a candidate under the current load"""
+        return candidate.benchmark_ms * self.tile_count(candidate, tiling) * self.load_factor + self.overhead_ms
+
+    def select(self, budget_ms, current=None, tiling=None):
+        """
+        Choose a candidate for a latency budget
+
+        Args:
+            budget_ms: Camera's per-frame latency budget in milliseconds
+            current: Candidate the camera runs now (switching up needs upgrade_margin headroom)
+            tiling: (height, width, overlap) of a tiled camera's frames, None if not tiled
+
+        Returns:
+            Most accurate candidate expected to fit, or the fastest one if none fits
+        """
+        if not self.candidates:
+            return None
+        fitting = [
+            candidate for candidate in self.candidates
+            if self.expected_ms(candidate, tiling) * (1.0 + self._margin(candidate, current)) <= budget_ms
+        ]
+        if fitting:
+            return max(fitting, key=lambda candidate: candidate.rank)
+        return min(self.candidates, key=lambda candidate: self.expected_ms(candidate, tiling))
+
+    def record(self, candidate, latency_ms, inference_ms, tiles=1, weight=0.05):
+        """
+        Record one detection a camera ran with a candidate
+
+        Args:
+            candidate: Candidate the detection ran with
+            latency_ms: Submit-to-result latency the camera observed for the whole frame
+            inference_ms: Duration of the forward pass (batch) the frame was part of
+            tiles: Tiles the frame was detected as (the load factor compares per-tile time)
+        """
+        key = (candidate.key, tiles)
+        previous = self._observed.get(key)
+        self._observed[key] = latency_ms if previous is None else (1.0 - weight) * previous + weight * latency_ms
+        if candidate.benchmark_ms:
+            ratio = max(1.0, inference_ms / (candidate.benchmark_ms * tiles))
+            self.load_factor = (1.0 - weight) * self.load_factor + weight * ratio
+
+    def observed_ms(self, candidate, tiling=None):
+        """Smoothed per-frame latency cameras observed with a candidate (and tile count)"""
+        return self._observed.get((candidate.key, self.tile_count(candidate, tiling)))
+
+    def describe(self, candidate, budget_ms, tiling=None):
+        """Selection details for the camera API"""
+        observed = self.observed_ms(candidate, tiling)
+        expected = self.expected_ms(candidate, tiling)
+        return dict(
+            candidate.to_dict(),
+            latency_budget_ms=budget_ms,
+            tiles=self.tile_count(candidate, tiling),
+            expected_ms=round(expected, 1),
+            observed_ms=round(observed, 1) if observed is not None else None,
+            load_factor=round(self.load_factor, 2),
+            fits_budget=expected <= budget_ms
+        )
+
+    def stats(self):
+        return {
+            'load_factor': round(self.load_factor, 2),
+            'candidates': [
+                dict(candidate.to_dict(), expected_ms=round(self.expected_ms(candidate), 1),
+                     observed_ms=round(self.observed_ms(candidate), 1) if self.observed_ms(candidate) is not None else None)
+                for candidate in self.candidates
+            ]
+        }
+
+    def _margin(self, candidate, current):
+        """Hysteresis: only demand headroom from candidates more accurate than the current one"""
+        if current is not None and candidate.rank > current.rank:
+            return self.upgrade_margin
+        return 0.0
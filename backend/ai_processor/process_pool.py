@@ -0,0 +1,211 @@
+"""
+Run person detection in a pool of worker processes
+
+Each worker holds its own model instance pinned to a subset of cores, so
+inference runs outside this interpreter's GIL and never blocks the eventlet
+hub. Frames are handed over through shared memory; only small JSON control
+messages and the detections travel over the worker's pipes.
+"""
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+from multiprocessing import shared_memory
+from ai_processor.detections import as_detection_array, draw_detections
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _available_cpus():
+    """Return the CPU ids this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+class _PoolWorker:
+    """One inference worker process and its shared frame buffer"""
+
+    def __init__(self, index, model_path, backend, cpus):
+        self.index = index
+        self.model_path = model_path
+        self.backend = backend
+        self.cpus = cpus
+        self.proc = None
+        self.shm = None
+        self.frames = 0
+        self.busy_ms = 0.0
+
+    def start(self):
+        """Launch the worker and wait until its model is loaded"""
+        command = [sys.executable, '-m', 'ai_processor.inference_worker',
+                   '--cpus', ','.join(str(cpu) for cpu in self.cpus), '--backend', self.backend]
+        if self.model_path:
+            command += ['--model', self.model_path]
+        # With eventlet monkey patching these pipes are green, so waiting on a
+        # worker yields to the hub instead of blocking it
+        self.proc = subprocess.Popen(
+            command,
+            cwd=BACKEND_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        reply = self._read_reply()
+        if not reply.get('ready'):
+            raise RuntimeError(f"Inference worker {self.index} failed to start: {reply.get('error')}")
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def send(self, frames, conf_threshold):
+        """Copy frames into shared memory and send the request (does not wait)"""
+        layout = []
+        offset = 0
+        for frame in frames:
+            layout.append((frame.shape, offset))
+            # Keep each frame 64-byte aligned
+            offset += (frame.nbytes + 63) // 64 * 64
+        self._ensure_capacity(offset)
+
+        for frame, (shape, frame_offset) in zip(frames, layout):
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=frame_offset)
+            view[...] = frame
+            del view
+
+        request = {
+            'shm': self.shm.name,
+            'frames': [[shape[0], shape[1], shape[2] if len(shape) > 2 else 1, frame_offset]
+                       for shape, frame_offset in layout],
+            'conf': conf_threshold
+        }
+        self.proc.stdin.write(json.dumps(request) + '\n')
+        self.proc.stdin.flush()
+
+    def receive(self):
+        """Wait for the detections of the last request"""
+        reply = self._read_reply()
+        if 'error' in reply:
+            raise RuntimeError(f"Inference worker {self.index} error: {reply['error']}")
+        results = [as_detection_array(np.asarray(result, dtype=np.float32)) for result in reply['detections']]
+        self.frames += len(results)
+        self.busy_ms += reply.get('ms', 0.0)
+        return results
+
+    def stop(self):
+        """Stop the worker and free its shared memory"""
+        if self.proc is not None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+            self.proc = None
+        self._release_shm()
+
+    def _read_reply(self):
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Inference worker {self.index} exited")
+        return json.loads(line)
+
+    def _ensure_capacity(self, nbytes):
+        """Grow the shared buffer when a request does not fit"""
+        if self.shm is not None and self.shm.size >= nbytes:
+            return
+        self._release_shm()
+        # Over-allocate so small resolution changes do not reallocate every time
+        self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes * 2, 1 << 20))
+
+    def _release_shm(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+class ProcessPoolDetector:
+    """Detector that splits each batch across a pool of worker processes"""
+
+    def __init__(self, processes=2, model_path=None, backend='ultralytics'):
+        """
+        Initialize and start the worker pool
+
+        Args:
+            processes: Number of worker processes
+            model_path: Model weights path passed to every worker
+            backend: Detector backend every worker loads
+        """
+        cpus = _available_cpus()
+        processes = max(1, min(int(processes), len(cpus)))
+        self.workers = [
+            _PoolWorker(index, model_path, backend, cpus[index::processes])
+            for index in range(processes)
+        ]
+        try:
+            for worker in self.workers:
+                worker.start()
+        except Exception:
+            self.close()
+            raise
+
+    def detect_batch(self, frames, conf_threshold=0.25):
+        """
+        Detect people in several frames, spread across the worker processes
+
+        Args:
+            frames: List of OpenCV frames (numpy arrays)
+            conf_threshold: Confidence threshold for detections
+
+        Returns:
+            List with one (N, 5) detection array per input frame, in input order
+        """
+        if not frames:
+            return []
+        for worker in self.workers:
+            if not worker.alive():
+                print(f"Restarting inference worker {worker.index}")
+                worker.stop()
+                worker.start()
+
+        # Contiguous chunks, one per worker, all in flight at the same time
+        chunks = np.array_split(np.arange(len(frames)), len(self.workers))
+        active = []
+        for worker, indices in zip(self.workers, chunks):
+            if len(indices):
+                worker.send([frames[i] for i in indices], conf_threshold)
+                active.append(worker)
+
+        # Drain every worker even if one fails so no reply is left in a pipe
+        results = []
+        error = None
+        for worker in active:
+            try:
+                results.extend(worker.receive())
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def detect_array(self, frame, conf_threshold=0.25):
+        """Detect people in a single frame"""
+        return self.detect_batch([frame], conf_threshold)[0]
+
+    def draw_detections(self, frame, detections, labels=True):
+        """Draw bounding boxes on frame"""
+        return draw_detections(frame, detections, labels)
+
+    def stats(self):
+        """Return per-worker counters"""
+        return [{
+            'worker': worker.index,
+            'cpus': worker.cpus,
+            'alive': worker.alive(),
+            'frames': worker.frames,
+            'busy_ms': round(worker.busy_ms, 1)
+        } for worker in self.workers]
+
+    def close(self):
+        """Stop all worker processes"""
+        for worker in self.workers:
+            worker.stop()
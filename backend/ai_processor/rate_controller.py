@@ -0,0 +1,109 @@
+"""
+Per-camera inference pacing and motion-based frame skipping
+"""
+import time
+from collections import deque
+import cv2
+import numpy as np
+
+class RateController:
+    """Pace a camera's processing loop to a target FPS and skip inference on static frames"""
+
+    def __init__(self, target_fps=12.0, motion_threshold=2.0, max_skip_interval=1.0, window=5.0):
+        """
+        Initialize rate controller
+
+        Args:
+            target_fps: Target processing rate (frames per second)
+            motion_threshold: Mean absolute difference (0-255) of a downscaled grayscale
+                              frame below which the scene is treated as unchanged.
+                              0 disables skipping.
+            max_skip_interval: Run inference at least this often (seconds) even if nothing moves
+            window: Length of the sliding window (seconds) used for reported rates
+        """
+        self.target_fps = max(0.1, float(target_fps))
+        self.motion_threshold = float(motion_threshold)
+        self.max_skip_interval = float(max_skip_interval)
+        self.window = float(window)
+
+        self._reference = None  # Thumbnail of the last frame that was inferred
+        self._last_inference = 0.0
+        self._events = deque()  # (timestamp, inferred, processing_seconds)
+        self.frames_inferred = 0
+        self.frames_skipped = 0
+
+    @property
+    def interval(self):
+        """Target seconds per processed frame"""
+        return 1.0 / self.target_fps
+
+    def should_infer(self, frame):
+        """
+        Decide whether a frame needs a fresh inference
+
+        Args:
+            frame: OpenCV frame about to be processed
+
+        Returns:
+            True to run detection, False to reuse the previous detections
+        """
+        thumbnail = cv2.cvtColor(cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        now = time.time()
+
+        if (
+            self._reference is None
+            or self.motion_threshold <= 0
+            or now - self._last_inference >= self.max_skip_interval
+        ):
+            changed = True
+        else:
+            # Compare against the last inferred frame so slow drift still accumulates
+            diff = cv2.absdiff(thumbnail, self._reference)
+            changed = float(np.mean(diff)) >= self.motion_threshold
+
+        if changed:
+            self._reference = thumbnail
+            self._last_inference = now
+        return changed
+
+    def record(self, inferred, processing_time):
+        """
+        Record one processed frame
+
+        Args:
+            inferred: Whether detection ran for this frame
+            processing_time: Seconds spent processing the frame
+        """
+        now = time.time()
+        self._events.append((now, inferred, processing_time))
+        if inferred:
+            self.frames_inferred += 1
+        else:
+            self.frames_skipped += 1
+        cutoff = now - self.window
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+    def sleep_time(self, loop_started):
+        """
+        Seconds to sleep so the loop runs at the target rate
+
+        Args:
+            loop_started: time.time() at the start of this iteration
+        """
+        return max(0.0, self.interval - (time.time() - loop_started))
+
+    def stats(self):
+        """Return effective rates over the sliding window"""
+        events = list(self._events)
+        span = min(self.window, events[-1][0] - events[0][0]) if len(events) > 1 else 0.0
+        inferred = sum(1 for _, was_inferred, _ in events if was_inferred)
+        return {
+            'target_fps': round(self.target_fps, 2),
+            'processed_fps': round((len(events) - 1) / span, 2) if span > 0 else 0.0,
+            'inference_fps': round(inferred / span, 2) if span > 0 else 0.0,
+            'skip_ratio': round(1.0 - inferred / len(events), 3) if events else 0.0,
+            'avg_processing_ms': round(sum(e[2] for e in events) * 1000.0 / len(events), 2) if events else 0.0,
+            'frames_inferred': self.frames_inferred,
+            'frames_skipped': self.frames_skipped
+        }
@@ -0,0 +1,167 @@
+"""
+Shared per-camera stream sessions with reference-counted viewers
+"""
+import time
+from ai_processor.ground_plane import GroundPlane
+
+class StreamSession:
+    """One capture + inference pipeline shared by every viewer of a camera"""
+
+    def __init__(self, camera_id, camera_url, is_file_source=False, detection_fps=None,
+                 inference_size=None, profiles=None, tracking=False, detect_every=1, calibration=None,
+                 capture_backend='opencv', latency_budget_ms=None, tiling=False, tile_overlap=0.2):
+        """
+        Initialize stream session
+
+        Args:
+            camera_id: Camera ID
+            camera_url: Source URL, webcam index or video file
+            is_file_source: True for local video files
+            detection_fps: Target processing rate for this camera
+            inference_size: Square input size frames are letterboxed to for detection
+            profiles: Delivery profiles available to this camera's viewers
+            tracking: Track people between detections
+            detect_every: With tracking, run detection on every Nth processed frame
+            calibration: Optional ground-plane calibration from the camera document
+            capture_backend: Decoder for network and file sources ('opencv' or 'ffmpeg')
+            latency_budget_ms: Detection latency budget; the model is then picked by ModelSelector
+            tiling: Detect on overlapping full-resolution tiles of inference_size
+            tile_overlap: Fraction of a tile shared with its neighbours
+        """
+        self.camera_id = camera_id
+        self.camera_url = camera_url
+        self.is_file_source = is_file_source
+        self.detection_fps = detection_fps
+        self.inference_size = inference_size
+        self.profiles = profiles or {}
+        self.tracking = tracking
+        self.detect_every = max(1, int(detect_every))
+        self.ground_plane = GroundPlane(calibration) if calibration else None
+        self.capture_backend = capture_backend
+        self.latency_budget_ms = latency_budget_ms
+        self.tiling = tiling
+        self.tile_overlap = tile_overlap
+        self.model = None  # ModelCandidate chosen for the budget, None = default detector
+        self.model_selected_at = 0.0
+        self.frame_shape = None  # (height, width) of source frames, set by the worker
+        self.viewers = {}  # {sid: options dict}
+        self.running = True
+        self.started_at = time.time()
+        self.idle_since = time.time()
+        self.task = None
+
+        # Pipeline stages, attached by the worker once the source is open
+        self.grabber = None
+        self.rate_controller = None
+        self.transport_meter = None
+        self.tracker = None
+        self.latency_ms = 0.0
+        self.avg_latency_ms = 0.0
+
+    @property
+    def tiling_shape(self):
+        """(height, width, overlap) model selection sizes a tiled camera's frames by, None if untiled or not yet known"""
+        if not self.tiling or self.frame_shape is None:
+            return None
+        return (*self.frame_shape, self.tile_overlap)
+
+    @property
+    def detector_key(self):
+        """InferenceServer detector this camera's frames run on"""
+        return self.model.key if self.model is not None else None
+
+    @staticmethod
+    def view_key(options):
+        """Options that change the pixels of a frame - viewers with equal keys share an encode"""
+        return (options['profile'], options['threshold'], options['render'])
+
+    def room(self, options):
+        """Socket.IO room for viewers with these options"""
+        key = '-'.join(str(part) for part in self.view_key(options))
+        return f"camera:{self.camera_id}:{key}:{'binary' if options['binary'] else 'base64'}"
+
+    def add_viewer(self, sid, options):
+        """
+        Add or update a viewer
+
+        Returns:
+            Room the viewer previously belonged to if it changed, else None
+        """
+        previous = self.viewers.get(sid)
+        self.viewers[sid] = options
+        self.idle_since = None
+        if previous is not None and self.room(previous) != self.room(options):
+            return self.room(previous)
+        return None
+
+    def remove_viewer(self, sid):
+        """
+        Remove a viewer
+
+        Returns:
+            Room the viewer belonged to, or None if it was not watching
+        """
+        options = self.viewers.pop(sid, None)
+        if options is None:
+            return None
+        if not self.viewers:
+            self.idle_since = time.time()
+        return self.room(options)
+
+    def idle_for(self):
+        """Seconds since the last viewer left (0 while someone is watching)"""
+        if self.idle_since is None:
+            return 0.0
+        return time.time() - self.idle_since
+
+    def view_groups(self):
+        """
+        Group viewers that receive identical frames
+
+        Returns:
+            List of (options, binary_room or None, base64_room or None, binary_count, base64_count)
+        """
+        groups = {}
+        for options in self.viewers.values():
+            key = self.view_key(options)
+            group = groups.setdefault(key, {'options': options, 'binary': 0, 'base64': 0})
+            group['binary' if options['binary'] else 'base64'] += 1
+
+        result = []
+        for group in groups.values():
+            options = group['options']
+            result.append((
+                options,
+                self.room(dict(options, binary=True)) if group['binary'] else None,
+                self.room(dict(options, binary=False)) if group['base64'] else None,
+                group['binary'],
+                group['base64']
+            ))
+        return result
+
+    def all_rooms(self):
+        """Every room that currently has viewers"""
+        return {self.room(options) for options in self.viewers.values()}
+
+    def record_latency(self, latency):
+        """Track capture-to-emit latency (exponential moving average)"""
+        latency_ms = latency * 1000.0
+        self.avg_latency_ms = latency_ms if not self.latency_ms else 0.9 * self.avg_latency_ms + 0.1 * latency_ms
+        self.latency_ms = latency_ms
+
+    def stats(self):
+        """Return session statistics"""
+        return {
+            'viewers': len(self.viewers),
+            'view_groups': len(self.view_groups()),
+            'idle_seconds': round(self.idle_for(), 1),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'capture': self.grabber.stats() if self.grabber else None,
+            'rate': self.rate_controller.stats() if self.rate_controller else None,
+            'transport': self.transport_meter.stats() if self.transport_meter else None,
+            'model': dict(self.model.to_dict(), latency_budget_ms=self.latency_budget_ms) if self.model else None,
+            'tiling': {'tile_size': self.inference_size, 'overlap': self.tile_overlap} if self.tiling else None,
+            'tracking': dict(self.tracker.stats(), detect_every=self.detect_every) if self.tracker else None,
+            'latency_ms': round(self.latency_ms, 1),
+            'avg_latency_ms': round(self.avg_latency_ms, 1)
+        }
@@ -0,0 +1,145 @@
+"""
+Tiled detection for high-resolution cameras
+
+Letterboxing a 4K frame down to the model input shrinks distant people below
+what the detector can see. In tiled mode the full-resolution frame is cut into
+overlapping tiles at the model's input size, all tiles run as one batch, and
+the per-tile detections are shifted back and merged.
+"""
+from functools import lru_cache
+import numpy as np
+from ai_processor.detections import box_iou, box_ios, empty_detections
+
+DEFAULT_TILE_OVERLAP = 0.2
+
+class TileLayout:
+    """Tile origins for one frame size; built once per resolution (see tile_layout)"""
+
+    def __init__(self, height, width, tile_size, overlap):
+        """
+        Plan the tiles
+
+        Args:
+            height: Frame height in pixels
+            width: Frame width in pixels
+            tile_size: Tile edge in pixels (the detector's input size)
+            overlap: Minimum fraction of a tile shared with its neighbour
+        """
+        self.tile_width = min(tile_size, width)
+        self.tile_height = min(tile_size, height)
+        xs = _tile_starts(width, self.tile_width, overlap)
+        ys = _tile_starts(height, self.tile_height, overlap)
+        self.origins = [(int(x), int(y)) for y in ys for x in xs]
+
+        origins = np.array(self.origins, dtype=np.float32)
+        self.offsets = np.concatenate([origins, origins], axis=1)  # (T, 4) added to [x1, y1, x2, y2]
+        self.rects = np.concatenate(
+            [origins, origins + [self.tile_width, self.tile_height]], axis=1
+        )  # (T, 4) tile extents in frame coordinates
+
+    def __len__(self):
+        return len(self.origins)
+
+    def tiles(self, frame):
+        """Views of each tile (no copy)"""
+        return [
+            frame[y:y + self.tile_height, x:x + self.tile_width]
+            for x, y in self.origins
+        ]
+
+    def merge(self, results, overlap_threshold=0.6):
+        """
+        Combine per-tile detections into frame coordinates
+
+        Args:
+            results: One (N, 5) detection array per tile, in tile order
+            overlap_threshold: Intersection over the smaller box above which a cut-off box
+                               from another tile is treated as the same person
+
+        Returns:
+            (M, 5) detection array
+        """
+        counts = [len(result) for result in results]
+        if not sum(counts):
+            return empty_detections()
+        detections = np.concatenate(results).astype(np.float32, copy=True)
+        tile_ids = np.repeat(np.arange(len(results)), counts)
+        detections[:, :4] += self.offsets[tile_ids]
+        return cross_tile_nms(detections, tile_ids, self.rects, overlap_threshold)
+
+@lru_cache(maxsize=32)
+def tile_layout(height, width, tile_size, overlap=DEFAULT_TILE_OVERLAP):
+    """Cached TileLayout for a frame size, so per-frame planning is a dict lookup"""
+    return TileLayout(height, width, tile_size, overlap)
+
+def cross_tile_nms(detections, tile_ids, tile_rects, overlap_threshold=0.6, iou_threshold=0.5, edge_px=2.0):
+    """
+    Drop duplicates of the same person detected in neighbouring tiles
+
+    Each tile was already NMS'd by the detector, so only pairs from different
+    tiles are compared, and only boxes reaching into another tile can have such
+    a duplicate. Two boxes are duplicates when their IoU exceeds iou_threshold,
+    or when the smaller one was cut off at its tile's inner edge and lies mostly
+    (intersection over the smaller box) inside the other - the half person a
+    tile sees of someone standing on its border. A small person partly hidden
+    behind someone from another tile is not cut off and is kept.
+
+    The pair matrix is computed at once; suppression then runs greedily in
+    confidence order, so a box that was itself suppressed suppresses nothing.
+
+    Args:
+        detections: (N, 5) detections in frame coordinates
+        tile_ids: (N,) tile index of each detection
+        tile_rects: (T, 4) tile extents
+        overlap_threshold: Intersection-over-smaller threshold for cut-off boxes
+        iou_threshold: IoU threshold for any pair
+        edge_px: Distance from a tile's inner edge at which a box counts as cut off
+
+    Returns:
+        (M, 5) detection array
+    """
+    # Boxes intersecting a tile other than their own
+    inside = (
+        (detections[:, None, 0] < tile_rects[None, :, 2]) & (detections[:, None, 2] > tile_rects[None, :, 0])
+        & (detections[:, None, 1] < tile_rects[None, :, 3]) & (detections[:, None, 3] > tile_rects[None, :, 1])
+    )
+    inside[np.arange(len(detections)), tile_ids] = False
+    shared = np.flatnonzero(inside.any(axis=1))
+    if len(shared) < 2:
+        return detections
+
+    candidates = shared[np.argsort(-detections[shared, 4], kind='stable')]
+    boxes = detections[candidates]
+    own = tile_rects[tile_ids[candidates]]
+    frame_right, frame_bottom = tile_rects[:, 2].max(), tile_rects[:, 3].max()
+    # Touching an edge of its tile that is not also the frame's edge
+    cut = (
+        ((boxes[:, 0] <= own[:, 0] + edge_px) & (own[:, 0] > 0))
+        | ((boxes[:, 2] >= own[:, 2] - edge_px) & (own[:, 2] < frame_right))
+        | ((boxes[:, 1] <= own[:, 1] + edge_px) & (own[:, 1] > 0))
+        | ((boxes[:, 3] >= own[:, 3] - edge_px) & (own[:, 3] < frame_bottom))
+    )
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    smaller_cut = np.where(areas[:, None] <= areas[None, :], cut[:, None], cut[None, :])
+    duplicate = (box_iou(boxes, boxes) > iou_threshold) | (
+        (box_ios(boxes, boxes) > overlap_threshold) & smaller_cut
+    )
+    duplicate &= tile_ids[candidates][:, None] != tile_ids[candidates][None, :]
+
+    # Greedy, like non_max_suppression: only kept boxes suppress later (less confident) ones
+    suppressed = np.zeros(len(candidates), dtype=bool)
+    for i in range(len(candidates)):
+        if not suppressed[i]:
+            suppressed[i + 1:] |= duplicate[i, i + 1:]
+
+    keep = np.ones(len(detections), dtype=bool)
+    keep[candidates[suppressed]] = False
+    return detections[keep]
+
+def _tile_starts(length, tile, overlap):
+    """Evenly spread tile starts covering [0, length) with at least the given overlap"""
+    if length <= tile:
+        return [0]
+    stride = max(1, int(tile * (1.0 - overlap)))
+    count = -(-(length - tile) // stride) + 1
+    return np.linspace(0, length - tile, count).round().astype(int)
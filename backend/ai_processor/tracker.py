@@ -0,0 +1,213 @@
+"""
+Multi-object tracking of person detections between inference frames
+"""
+import numpy as np
+from ai_processor.detections import box_iou, empty_detections
+
+# Kalman noise, as fractions of a box's height so they scale with distance to the camera
+POSITION_STD = 0.05      # Measurement noise of a detection's centre and size
+PROCESS_STD = 0.05       # Per-second drift of centre and size
+VELOCITY_STD = 0.5       # Per-second change in velocity
+INITIAL_VELOCITY_STD = 1.0
+
+class PersonTracker:
+    """
+    IoU-association tracker with a constant-velocity Kalman filter per track
+
+    State per track is [cx, cy, w, h, vx, vy]. All tracks are predicted and
+    corrected together as stacked arrays, so the cost per frame is a handful
+    of NumPy calls rather than a loop over people.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=3, min_hits=2):
+        """
+        Initialize tracker
+
+        Args:
+            iou_threshold: Minimum IoU between a predicted track and a detection to match them
+            max_misses: Detection passes a track may go unmatched before it is dropped
+            min_hits: Matches needed before a track is counted (suppresses one-off false positives)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+
+        self.state = np.zeros((0, 6), dtype=np.float64)
+        self.covariance = np.zeros((0, 6, 6), dtype=np.float64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int32)
+        self.misses = np.zeros(0, dtype=np.int32)
+        self.confidences = np.zeros(0, dtype=np.float32)
+
+        self.next_id = 1
+        self.detection_updates = 0
+        self.predicted_frames = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def predict(self, dt):
+        """
+        Advance every track by dt seconds without new detections
+
+        Returns:
+            Tuple (detections (M, 5), track ids (M,)) for the counted tracks
+        """
+        self._predict(dt)
+        self.predicted_frames += 1
+        return self.tracks()
+
+    def update(self, detections, dt):
+        """
+        Advance every track by dt seconds and correct it with fresh detections
+
+        Args:
+            detections: (N, 5) detection array from the detector
+            dt: Seconds since the previous predict/update
+
+        Returns:
+            Tuple (detections (M, 5), track ids (M,)) for the counted tracks
+        """
+        self._predict(dt)
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+
+        track_indices, detection_indices = self._match(detections)
+        if len(track_indices):
+            self._correct(track_indices, detections[detection_indices])
+            self.confidences[track_indices] = detections[detection_indices, 4]
+
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[track_indices] = True
+        self.hits[matched] += 1
+        self.misses[matched] = 0
+        self.misses[~matched] += 1
+
+        keep = self.misses <= self.max_misses
+        if not keep.all():
+            self._select(keep)
+
+        unmatched = np.ones(len(detections), dtype=bool)
+        unmatched[detection_indices] = False
+        if unmatched.any():
+            self._spawn(detections[unmatched])
+
+        self.detection_updates += 1
+        return self.tracks()
+
+    def tracks(self):
+        """Counted tracks as (detections (M, 5), ids (M,))"""
+        # Before min_hits detection passes have run, count everything so a new
+        # stream does not start at zero
+        counted = (self.hits >= self.min_hits) | (self.detection_updates < self.min_hits)
+        if not counted.any():
+            return empty_detections(), np.zeros(0, dtype=np.int64)
+        boxes = np.concatenate([
+            self._boxes()[counted], self.confidences[counted][:, None]
+        ], axis=1).astype(np.float32)
+        return boxes, self.ids[counted]
+
+    def _predict(self, dt):
+        if not len(self.ids) or dt <= 0:
+            return
+        transition = np.eye(6)
+        transition[0, 4] = transition[1, 5] = dt
+        self.state = self.state @ transition.T
+        self.state[:, 2:4] = np.maximum(self.state[:, 2:4], 1.0)
+
+        heights = self.state[:, 3]
+        noise = np.empty((len(self.ids), 6))
+        noise[:, :4] = (PROCESS_STD * heights[:, None]) ** 2 * dt
+        noise[:, 4:] = (VELOCITY_STD * heights[:, None]) ** 2 * dt
+        self.covariance = transition @ self.covariance @ transition.T
+        diagonal = np.arange(6)
+        self.covariance[:, diagonal, diagonal] += noise
+
+    def _match(self, detections):
+        """Greedy highest-IoU-first association of predicted tracks and detections"""
+        if not len(self.ids) or not len(detections):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        iou = box_iou(self._boxes(), detections)
+        pairs = np.argwhere(iou >= self.iou_threshold)
+        if not len(pairs):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        pairs = pairs[np.argsort(-iou[pairs[:, 0], pairs[:, 1]], kind='stable')]
+
+        track_used = np.zeros(len(self.ids), dtype=bool)
+        detection_used = np.zeros(len(detections), dtype=bool)
+        track_indices, detection_indices = [], []
+        for track, detection in pairs.tolist():
+            if track_used[track] or detection_used[detection]:
+                continue
+            track_used[track] = detection_used[detection] = True
+            track_indices.append(track)
+            detection_indices.append(detection)
+        return np.array(track_indices, dtype=np.int64), np.array(detection_indices, dtype=np.int64)
+
+    def _correct(self, track_indices, detections):
+        """Kalman update of matched tracks with their detections' [cx, cy, w, h]"""
+        measurement = _to_cxcywh(detections)
+        state = self.state[track_indices]
+        covariance = self.covariance[track_indices]
+
+        measurement_noise = (POSITION_STD * measurement[:, 3]) ** 2
+        innovation = measurement - state[:, :4]
+        innovation_covariance = covariance[:, :4, :4] + measurement_noise[:, None, None] * np.eye(4)
+        gain = covariance[:, :, :4] @ np.linalg.inv(innovation_covariance)
+
+        self.state[track_indices] = state + (gain @ innovation[:, :, None])[:, :, 0]
+        self.covariance[track_indices] = covariance - gain @ covariance[:, :4, :]
+
+    def _spawn(self, detections):
+        """Start a track for each unmatched detection"""
+        count = len(detections)
+        state = np.zeros((count, 6))
+        state[:, :4] = _to_cxcywh(detections)
+        heights = state[:, 3]
+        variance = np.empty((count, 6))
+        variance[:, :4] = (2 * POSITION_STD * heights[:, None]) ** 2
+        variance[:, 4:] = (INITIAL_VELOCITY_STD * heights[:, None]) ** 2
+        covariance = np.zeros((count, 6, 6))
+        diagonal = np.arange(6)
+        covariance[:, diagonal, diagonal] = variance
+
+        self.state = np.concatenate([self.state, state])
+        self.covariance = np.concatenate([self.covariance, covariance])
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + count)])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int32)])
+        self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int32)])
+        self.confidences = np.concatenate([self.confidences, detections[:, 4].astype(np.float32)])
+        self.next_id += count
+
+    def _select(self, mask):
+        self.state = self.state[mask]
+        self.covariance = self.covariance[mask]
+        self.ids = self.ids[mask]
+        self.hits = self.hits[mask]
+        self.misses = self.misses[mask]
+        self.confidences = self.confidences[mask]
+
+    def _boxes(self):
+        """Current track boxes as (T, 4) [x1, y1, x2, y2]"""
+        half = self.state[:, 2:4] / 2.0
+        return np.concatenate([self.state[:, :2] - half, self.state[:, :2] + half], axis=1)
+
+    def stats(self):
+        """Return tracker counters"""
+        counted, _ = self.tracks()
+        return {
+            'active_tracks': len(self.ids),
+            'counted_tracks': len(counted),
+            'ids_issued': self.next_id - 1,
+            'detection_updates': self.detection_updates,
+            'predicted_frames': self.predicted_frames
+        }
+
+def _to_cxcywh(detections):
+    """(N, 4+) [x1, y1, x2, y2] boxes -> (N, 4) [cx, cy, w, h]"""
+    boxes = detections[:, :4].astype(np.float64)
+    return np.stack([
+        (boxes[:, 0] + boxes[:, 2]) / 2.0,
+        (boxes[:, 1] + boxes[:, 3]) / 2.0,
+        np.maximum(boxes[:, 2] - boxes[:, 0], 1.0),
+        np.maximum(boxes[:, 3] - boxes[:, 1], 1.0)
+    ], axis=1)
@@ -6,33 +6,114 @@ import base64
 import time
 import sys
 import os
+from flask import request
+from flask_socketio import join_room, leave_room, ConnectionRefusedError
+
+try:
+    from eventlet import patcher, tpool
+except ImportError:
+    patcher = tpool = None
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import Camera, DensityLog
-from ai_processor.yolo_model import YOLOPersonDetector
+from auth import verify_token
+from ai_processor.detector_backends import create_detector, DEFAULT_ONNX_MODEL
+from ai_processor.model_selector import ModelSelector, parse_candidates, DEFAULT_CANDIDATES
 from ai_processor.density_detector import DensityDetector
+from ai_processor.frame_grabber import FrameGrabber
+from ai_processor.ffmpeg_capture import FFmpegCapture
+from ai_processor.inference_server import InferenceServer
+from ai_processor.process_pool import ProcessPoolDetector
+from ai_processor.rate_controller import RateController
+from ai_processor.stream_session import StreamSession
+from ai_processor.tracker import PersonTracker
+from ai_processor.tiling import tile_layout, DEFAULT_TILE_OVERLAP
+from ai_processor.heatmap import HeatmapRenderer, RENDER_MODES, DEFAULT_RENDER_MODE
+from ai_processor.frame_profiles import (
+    DEFAULT_PROFILE, DEFAULT_INFERENCE_SIZE, resolve_profiles,
+    resize_to_width, letterbox, unletterbox_detections, scale_detections
+)
 
 # Paths for resolving local video files
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
 VIDEO_DIR = os.path.join(PROJECT_ROOT, "videos")
 
+class TransportMeter:
+    """Track outbound frame bytes and encode CPU for one stream"""
+    
+    def __init__(self):
+        self.started = time.time()
+        self.frames = 0
+        self.bytes_binary = 0
+        self.bytes_base64 = 0
+        self.encode_cpu = 0.0
+    
+    def record(self, binary_bytes, base64_bytes, encode_cpu):
+        self.frames += 1
+        self.bytes_binary += binary_bytes
+        self.bytes_base64 += base64_bytes
+        self.encode_cpu += encode_cpu
+    
+    def stats(self):
+        elapsed = max(time.time() - self.started, 1e-6)
+        return {
+            'frames': self.frames,
+            'binary_bytes_per_sec': round(self.bytes_binary / elapsed),
+            'base64_bytes_per_sec': round(self.bytes_base64 / elapsed),
+            'encode_cpu_ms_per_frame': round(self.encode_cpu * 1000.0 / self.frames, 3) if self.frames else 0.0
+        }
+
 class VideoStreamer:
     """Handle real-time video streaming and processing"""
     
-    def __init__(self, socketio, density_threshold=0.65):
+    def __init__(self, socketio, density_threshold=0.65, inference_batch_size=8, inference_max_wait=0.02,
+                 inference_processes=0, detection_fps=12.0, motion_threshold=2.0, idle_grace=30.0,
+                 tracking=False, detect_every=3, large_crowd_people=40, capture_backend='opencv',
+                 detector_backend='ultralytics', detector_model=None, model_candidates=DEFAULT_CANDIDATES):
         """
         Initialize video streamer
         
         Args:
             socketio: Flask-SocketIO instance
             density_threshold: Default density threshold for alerts
+            inference_batch_size: Maximum frames per batched forward pass across cameras
+            inference_max_wait: Maximum seconds a frame waits for its batch to fill
+            inference_processes: Run detection in this many worker processes (0 = in-process)
+            detection_fps: Default target processing rate per camera
+            motion_threshold: Mean frame difference below which inference is skipped (0 disables)
+            idle_grace: Seconds a stream stays alive after its last viewer leaves
+            tracking: Track people between detections by default (cameras may override)
+            detect_every: With tracking, run detection on every Nth processed frame
+            large_crowd_people: Crowd size from which 'auto' viewers get boxes without labels
+            capture_backend: Default decoder for network and file sources ('opencv' or 'ffmpeg')
+            detector_backend: Person detector backend (see detector_backends.DETECTOR_BACKENDS)
+            detector_model: Weights or ONNX model path (None uses the backend's default)
+            model_candidates: 'model@size,...' (least to most accurate) benchmarked at startup for
+                              cameras with a latency budget; empty disables model selection
         """
         self.socketio = socketio
         self.density_threshold = density_threshold
-        self.active_streams = {}  # {camera_id: stream_thread}
-        self.stream_signals = {}  # {camera_id: boolean} - True to keep running
+        self.inference_batch_size = inference_batch_size
+        self.inference_max_wait = inference_max_wait
+        self.inference_processes = inference_processes
+        self.detection_fps = detection_fps
+        self.motion_threshold = motion_threshold
+        self.idle_grace = idle_grace
+        self.tracking = tracking
+        self.detect_every = detect_every
+        self.large_crowd_people = large_crowd_people
+        self.capture_backend = capture_backend
+        self.detector_backend = detector_backend
+        self.detector_model = detector_model
+        self.model_candidates = model_candidates
+        self.model_selector = None
+        self.heatmap_renderer = HeatmapRenderer()
+        self.inference_server = None
+        self.sessions = {}  # {camera_id: StreamSession}
+        self.clients = {}  # {sid: token payload}, filled when the handshake authenticates
         self.yolo_detector = None
         self.density_detector = DensityDetector()
         
@@ -44,97 +125,270 @@ class VideoStreamer:
     
     def _init_yolo(self):
         """Initialize YOLO model"""
+        if self.inference_processes > 0:
+            try:
+                self.yolo_detector = ProcessPoolDetector(
+                    self.inference_processes, self.detector_model, self.detector_backend
+                )
+                print(f"Started {len(self.yolo_detector.workers)} inference worker processes")
+            except Exception as e:
+                print(f"Warning: Could not start inference worker processes: {e}")
+                print("Falling back to in-process inference")
+        
         try:
-            self.yolo_detector = YOLOPersonDetector()
-            print("YOLOv8 model loaded successfully")
+            if self.yolo_detector is None:
+                self.yolo_detector = create_detector(self.detector_backend, self.detector_model)
+                print(f"YOLOv8 model loaded successfully ({self.detector_backend} backend)")
+            # One scheduler batches frames from every active camera into a single forward pass
+            self.inference_server = InferenceServer(
+                self.socketio,
+                self.yolo_detector,
+                max_batch_size=self.inference_batch_size,
+                max_wait=self.inference_max_wait
+            )
+            self.inference_server.start()
         except Exception as e:
             print(f"Warning: Could not load YOLO model: {e}")
-            print("Please ensure ultralytics is installed and yolov8n.pt is available")
+            if self.detector_backend == 'ultralytics':
+                print("Please ensure ultralytics is installed and yolov8n.pt is available")
+            else:
+                print("Please ensure the ONNX model exists (python -m ai_processor.export_onnx) and its runtime is installed")
+        
+        if self.inference_server and self.model_candidates:
+            self._init_model_selector()
+    
+    def _init_model_selector(self):
+        """Benchmark the candidate models for cameras with a latency budget"""
+        default_model = self.detector_model or (
+            'yolov8n.pt' if self.detector_backend == 'ultralytics' else DEFAULT_ONNX_MODEL
+        )
+        selector = ModelSelector(
+            parse_candidates(self.model_candidates, default_model),
+            self.detector_backend,
+            default_model=default_model,
+            default_detector=self.yolo_detector,
+            overhead_ms=self.inference_max_wait * 1000.0
+        )
+        print("Benchmarking model candidates for latency budgets...")
+        for candidate in selector.benchmark():
+            self.inference_server.add_detector(candidate.key, selector.detector(candidate))
+        if selector.candidates:
+            self.model_selector = selector
+        else:
+            print("Warning: No model candidates available, latency budgets are ignored")
     
     def _register_events(self):
         """Register SocketIO event handlers"""
         
         @self.socketio.on('connect')
-        def handle_connect():
-            print(f"✓ Client connected to video streamer")
-            self.socketio.emit('connected', {'message': 'Connected to video streamer'})
+        def handle_connect(auth=None):
+            # Authenticate once per connection; later events trust the sid
+            token = (auth or {}).get('token') or request.args.get('token')
+            payload = verify_token(token) if token else None
+            if not payload:
+                print("✗ Rejected unauthenticated Socket.IO connection")
+                raise ConnectionRefusedError('Authentication required')
+            self.clients[request.sid] = payload
+            print(f"✓ Client connected to video streamer ({payload.get('email')})")
+            self.socketio.emit('connected', {'message': 'Connected to video streamer'}, to=request.sid)
         
         @self.socketio.on('disconnect')
         def handle_disconnect():
             print("Client disconnected")
+            self.clients.pop(request.sid, None)
+            for camera_id in list(self.sessions):
+                self.unsubscribe(camera_id, request.sid)
         
         @self.socketio.on('start_stream')
         def handle_start_stream(data):
-            """Start streaming a camera"""
+            """Start watching a camera (joins the running stream if there is one)"""
             try:
                 camera_id = data.get('camera_id')
-                threshold = data.get('threshold', self.density_threshold)
                 
                 print(f"Received start_stream request for camera: {camera_id}")
                 
-                if not camera_id:
-                    self.socketio.emit('error', {'message': 'Camera ID required'})
+                if request.sid not in self.clients:
+                    self.socketio.emit('error', {'message': 'Not authenticated'}, to=request.sid)
                     return
                 
-                if camera_id in self.active_streams:
-                    # Stream already running, just update threshold? 
-                    # For now we can ignore or restart. Let's restart logic safely.
-                    print(f"Stream already active for camera {camera_id}")
+                if not camera_id:
+                    self.socketio.emit('error', {'message': 'Camera ID required'}, to=request.sid)
                     return
                 
-                print(f"✓ Starting stream for camera: {camera_id}")
-                self.start_stream(camera_id, threshold)
+                self.subscribe(camera_id, request.sid, self._viewer_options(data))
             except Exception as e:
                 print(f"✗ Error in start_stream handler: {e}")
-                self.socketio.emit('error', {'message': f'Error starting stream: {str(e)}'})
+                self.socketio.emit('error', {'message': f'Error starting stream: {str(e)}'}, to=request.sid)
+        
+        @self.socketio.on('update_stream')
+        def handle_update_stream(data):
+            """Change a viewer's options (e.g. threshold) without restarting the pipeline"""
+            camera_id = data.get('camera_id')
+            session = self.sessions.get(camera_id)
+            if session and request.sid in session.viewers:
+                self.subscribe(camera_id, request.sid, self._viewer_options(data))
         
         @self.socketio.on('stop_stream')
         def handle_stop_stream(data):
-            """Stop streaming a camera"""
+            """Stop watching a camera (the stream stops after the idle grace period)"""
             camera_id = data.get('camera_id')
             if camera_id:
-                self.stop_stream(camera_id)
+                self.unsubscribe(camera_id, request.sid)
     
-    def start_stream(self, camera_id, threshold=None):
-        """Start streaming a camera or video file"""
-        if threshold is None:
+    def _viewer_options(self, data):
+        """Build a viewer's options from a start_stream/update_stream payload"""
+        try:
+            threshold = float(data.get('threshold', self.density_threshold))
+        except (TypeError, ValueError):
             threshold = self.density_threshold
+        profile = data.get('profile', DEFAULT_PROFILE)
+        render = data.get('render', DEFAULT_RENDER_MODE)
+        return {
+            # Delivery resolution/quality; unknown names fall back to the default
+            'profile': profile if profile in resolve_profiles() else DEFAULT_PROFILE,
+            # Rounded so viewers with practically equal thresholds share a view group
+            'threshold': round(min(max(threshold, 0.0), 1.0), 2),
+            # Boxes, heatmap, or boxes that drop their labels once the crowd is large
+            'render': render if render in RENDER_MODES else DEFAULT_RENDER_MODE,
+            # Clients opt in to binary frames; everyone else receives base64
+            'binary': bool(data.get('binary'))
+        }
+    
+    @staticmethod
+    def _render_mode(options, large_crowd):
+        """Resolve a viewer's render mode: 'boxes', 'unlabelled' or 'heatmap' ('auto' depends on the crowd size)"""
+        if options['render'] == 'auto':
+            return 'unlabelled' if large_crowd else 'boxes'
+        return options['render']
+    
+    def subscribe(self, camera_id, sid, options):
+        """Add a viewer to a camera, starting the shared stream if it is not running"""
+        session = self.sessions.get(camera_id)
+        if session is None or not session.running:
+            print(f"✓ Starting stream for camera: {camera_id}")
+            session = self.start_stream(camera_id)
+            if session is None:
+                self.socketio.emit('error', {'camera_id': camera_id, 'message': 'Camera not found'}, to=sid)
+                return
+        else:
+            print(f"Stream already active for camera {camera_id}, added viewer")
         
-        # Set running signal
-        self.stream_signals[camera_id] = True
+        previous_room = session.add_viewer(sid, options)
+        if previous_room:
+            leave_room(previous_room, sid=sid)
+        join_room(session.room(options), sid=sid)
+    
+    def unsubscribe(self, camera_id, sid):
+        """Remove a viewer from a camera"""
+        session = self.sessions.get(camera_id)
+        if session is None:
+            return
+        room = session.remove_viewer(sid)
+        if room is None:
+            return
+        try:
+            leave_room(room, sid=sid)
+        except Exception:
+            pass  # Session already gone (disconnect)
+        if not session.viewers:
+            print(f"Last viewer left camera {camera_id}, stopping in {self.idle_grace:.0f}s if nobody returns")
+    
+    def start_stream(self, camera_id):
+        """
+        Start the shared pipeline for a camera or video file
         
+        Returns:
+            StreamSession, or None if the camera does not exist
+        """
         # Get camera info
         camera = Camera.find_by_id(camera_id)
         if not camera:
-            self.socketio.emit('error', {'message': 'Camera not found'})
-            return
+            return None
 
         camera_url = camera["url"]
-        is_file_source = self._is_video_file_source(camera_url)
+        session = StreamSession(
+            camera_id,
+            camera_url,
+            is_file_source=self._is_video_file_source(camera_url),
+            detection_fps=camera.get('detection_fps') or self.detection_fps,
+            inference_size=camera.get('inference_size') or DEFAULT_INFERENCE_SIZE,
+            profiles=resolve_profiles(camera.get('profiles')),
+            tracking=camera.get('tracking', self.tracking),
+            detect_every=camera.get('detect_every') or self.detect_every,
+            calibration=camera.get('calibration'),
+            capture_backend=camera.get('capture_backend') or self.capture_backend,
+            latency_budget_ms=camera.get('latency_budget_ms'),
+            tiling=camera.get('tiling', False),
+            tile_overlap=camera.get('tile_overlap') or DEFAULT_TILE_OVERLAP
+        )
+        if session.latency_budget_ms and self.model_selector:
+            self._select_model(session)
+        self.sessions[camera_id] = session
 
         # Use socketio.start_background_task instead of threading.Thread
         # This is CRITICAL for working with eventlet/gevent
-        stream_task = self.socketio.start_background_task(
-            target=self._stream_worker,
-            camera_id=camera_id,
-            camera_url=camera_url,
-            threshold=threshold,
-            is_file_source=is_file_source
-        )
-        
-        self.active_streams[camera_id] = stream_task
+        session.task = self.socketio.start_background_task(target=self._stream_worker, session=session)
         print(f"Started stream task for camera {camera_id}")
+        return session
+    
+    def _select_model(self, session):
+        """(Re)choose the model and input size for a camera with a latency budget"""
+        tiling = session.tiling_shape
+        candidate = self.model_selector.select(session.latency_budget_ms, session.model, tiling)
+        session.model_selected_at = time.time()
+        if candidate is None or candidate is session.model:
+            return
+        previous = session.model
+        session.model = candidate
+        session.inference_size = candidate.input_size
+        print(f"Camera {session.camera_id}: using {candidate.key} "
+              f"(expected {self.model_selector.expected_ms(candidate, tiling):.0f} ms, "
+              f"budget {session.latency_budget_ms:.0f} ms{', was ' + previous.key if previous else ''})")
+    
+    def _record_model_latency(self, session, model, pending, tiles=1):
+        """
+        Feed a finished detection to the model selector and re-select when due
+        
+        Args:
+            session: Camera's stream session
+            model: Candidate the detection ran with
+            pending: Completed InferenceRequest
+            tiles: Tiles the request carried (the whole frame's latency is compared with the budget)
+        """
+        self.model_selector.record(model, pending.latency_ms, pending.inference_ms, tiles)
+        if time.time() - session.model_selected_at >= self.model_selector.reevaluate_interval:
+            self._select_model(session)
+    
+    def model_selection(self, camera):
+        """
+        Model chosen for a camera's latency budget, for the camera API
+        
+        Returns:
+            dict with the model, input size and measured/expected latency, or None when
+            the camera has no budget or model selection is disabled
+        """
+        budget = camera.get('latency_budget_ms')
+        if not budget or self.model_selector is None:
+            return None
+        session = self.sessions.get(str(camera['_id']))
+        if session is not None and session.model is not None:
+            return dict(
+                self.model_selector.describe(session.model, session.latency_budget_ms, session.tiling_shape),
+                active=True
+            )
+        candidate = self.model_selector.select(budget)
+        selection = dict(self.model_selector.describe(candidate, budget), active=False)
+        if camera.get('tiling'):
+            # The tile count depends on the frame size, known once the stream runs
+            selection['note'] = 'Estimate for one tile per frame; re-selected by frame size when streaming'
+        return selection
     
     def stop_stream(self, camera_id):
-        """Stop streaming a camera"""
-        if camera_id in self.stream_signals:
+        """Stop a camera's stream immediately, regardless of viewers"""
+        session = self.sessions.pop(camera_id, None)
+        if session:
             # Signal the worker loop to stop
-            self.stream_signals[camera_id] = False
-            
-            # Clean up references
-            if camera_id in self.active_streams:
-                del self.active_streams[camera_id]
-            
+            session.running = False
             print(f"Stopped stream for camera {camera_id}")
     
     def _is_video_file_source(self, camera_url: str) -> bool:
@@ -158,9 +412,54 @@ class VideoStreamer:
             return url
         return os.path.join(VIDEO_DIR, url)
 
-    def _stream_worker(self, camera_id, camera_url, threshold, is_file_source=False):
+    def _open_capture(self, session, source):
+        """
+        Open a source without stalling the event loop
+        
+        Opening blocks for seconds on an unreachable source (ffprobe's timeout,
+        OpenCV's own connect), so under eventlet it runs on eventlet's native
+        thread pool and other streams and sockets keep flowing meanwhile.
+        """
+        if patcher is not None and patcher.is_monkey_patched('thread'):
+            return tpool.execute(self._connect_capture, session, source)
+        return self._connect_capture(session, source)
+    
+    def _connect_capture(self, session, source):
+        """
+        Open a network or file source with the session's capture backend
+        
+        The ffmpeg backend scales in the decoder to the largest width the pipeline
+        uses (widest delivery profile or inference input), so oversized sources are
+        never converted to BGR at full resolution - unless the camera uses tiling.
+        """
+        if session.capture_backend == 'ffmpeg':
+            # Tiled cameras need every source pixel
+            max_width = None if session.tiling else max(
+                [session.inference_size] + [p['max_width'] for p in session.profiles.values()]
+            )
+            cap = FFmpegCapture(source, loop=session.is_file_source, max_width=max_width)
+            if cap.isOpened():
+                print(f"✓ ffmpeg capture {cap.width}x{cap.height} @ {cap.fps:.1f} fps for camera {session.camera_id}")
+            else:
+                print(f"✗ ffmpeg capture failed for camera {session.camera_id}: {cap.error}")
+            return cap
+        cap = cv2.VideoCapture(source)
+        if cap.isOpened() and not session.is_file_source:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _emit_to_viewers(self, session, event, payload):
+        """Emit an event to every viewer of a session"""
+        for room in session.all_rooms():
+            self.socketio.emit(event, payload, to=room)
+
+    def _stream_worker(self, session):
         """Worker thread for video streaming (camera or video file)"""
+        camera_id = session.camera_id
+        camera_url = session.camera_url
+        is_file_source = session.is_file_source
         cap = None
+        grabber = None
         last_log_time = time.time()
         log_interval = 5.0  # Log every 5 seconds
         
@@ -171,9 +470,9 @@ class VideoStreamer:
             if is_file_source:
                 video_path = self._resolve_video_file_path(camera_url)
                 if not os.path.exists(video_path):
-                    self.socketio.emit("error", {"camera_id": camera_id, "message": f"File not found: {video_path}"})
+                    self._emit_to_viewers(session, "error", {"camera_id": camera_id, "message": f"File not found: {video_path}"})
                     return
-                cap = cv2.VideoCapture(video_path)
+                cap = self._open_capture(session, video_path)
             elif camera_url and camera_url.strip().isdigit():
                 # Webcam
                 camera_index = int(camera_url.strip())
@@ -182,9 +481,7 @@ class VideoStreamer:
                     cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             else:
                 # RTSP/HTTP
-                cap = cv2.VideoCapture(camera_url)
-                if cap.isOpened():
-                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                cap = self._open_capture(session, camera_url)
             
             # Give it a moment to initialize - Use socketio.sleep for async compatibility
             self.socketio.sleep(0.5)
@@ -192,84 +489,229 @@ class VideoStreamer:
             if not cap or not cap.isOpened():
                 error_msg = f"Could not open video source: {camera_url}"
                 print(f"✗ {error_msg}")
-                self.socketio.emit('error', {'camera_id': camera_id, 'message': error_msg})
+                self._emit_to_viewers(session, 'error', {'camera_id': camera_id, 'message': error_msg})
                 return
             
             print(f"✓ Streaming started for camera {camera_id}")
             
-            consecutive_failures = 0
+            # Capture runs on its own thread and keeps only the newest frame, so a slow
+            # inference step never lets the source buffer up behind real time
+            # Frames beyond the processing rate are grabbed but never converted
+            grabber = FrameGrabber(cap, camera_id, is_file_source, target_fps=session.detection_fps)
+            cap = None  # Owned (and released) by the grabber from here on
+            grabber.start()
+            if self.inference_server:
+                self.inference_server.register_stream(camera_id, session.detector_key)
+            last_frame_id = 0
+            
+            session.grabber = grabber
+            session.rate_controller = rate_controller = RateController(session.detection_fps, self.motion_threshold)
+            session.transport_meter = transport_meter = TransportMeter()
+            session.tracker = tracker = PersonTracker() if session.tracking else None
+            detections = None
+            people = None  # Detections, or tracked boxes when tracking is enabled
+            frame_index = 0
+            last_captured_at = None
             
-            # Use the signal flag to control the loop
-            while self.stream_signals.get(camera_id, False):
-                ret, frame = cap.read()
+            # Use the session flag to control the loop
+            while session.running:
+                if not session.viewers:
+                    # Keep the source open during the grace period so returning viewers
+                    # don't pay for reconnecting, but skip all processing
+                    if session.idle_for() >= self.idle_grace:
+                        print(f"No viewers for {self.idle_grace:.0f}s, closing camera {camera_id}")
+                        break
+                    self.socketio.sleep(0.2)
+                    continue
                 
-                if not ret:
-                    if is_file_source:
-                        # Restart video file loop
-                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                        continue
-                    
-                    consecutive_failures += 1
-                    if consecutive_failures >= 10:
+                latest = grabber.latest(last_frame_id)
+                
+                if latest is None:
+                    if not grabber.alive:
                         print(f"✗ Connection lost to camera {camera_id}")
-                        self.socketio.emit("error", {"camera_id": camera_id, "message": "Connection lost"})
+                        self._emit_to_viewers(session, "error", {"camera_id": camera_id, "message": grabber.error or "Connection lost"})
                         break
-                    self.socketio.sleep(0.1)
+                    self.socketio.sleep(0.005)
                     continue
                 
-                consecutive_failures = 0
-                
-                # Resize large frames to improve performance
-                if frame.shape[1] > 800:
-                    scale = 800 / frame.shape[1]
-                    frame = cv2.resize(frame, None, fx=scale, fy=scale)
+                last_frame_id, frame, captured_at = latest
+                loop_started = time.time()
 
                 # Process frame with YOLO
                 if self.yolo_detector:
-                    detections = self.yolo_detector.detect(frame)
-                    density_info = self.density_detector.calculate_density(detections, frame.shape)
-                    
-                    # Draw
-                    frame = self.yolo_detector.draw_detections(frame, detections)
-                    frame = self._draw_density_overlay(frame, density_info, threshold)
+                    # With tracking, detection only runs on every detect_every-th frame and
+                    # the tracker carries people across the frames in between
+                    frame_index += 1
+                    due = detections is None or tracker is None or frame_index % session.detect_every == 0
+                    inferred = False
+                    if due:
+                        if session.tiling and session.frame_shape != frame.shape[:2]:
+                            # A tiled camera's cost depends on its frame size; re-select once it is known
+                            session.frame_shape = frame.shape[:2]
+                            if session.model is not None:
+                                self._select_model(session)
+                        layout = tile_layout(
+                            frame.shape[0], frame.shape[1], session.inference_size, session.tile_overlap
+                        ) if session.tiling else None
+                        if layout is not None and len(layout) > 1:
+                            # Full-resolution tiles at the model's input size, detected as one
+                            # batch, so distant people keep enough pixels to be found
+                            # The motion check only needs a thumbnail: sample the frame down to the
+                            # inference size first (nearest neighbour reads only the pixels it keeps)
+                            # rather than area-averaging the full-resolution frame
+                            motion_scale = session.inference_size / max(frame.shape[:2])
+                            motion_frame = cv2.resize(
+                                frame, None, fx=motion_scale, fy=motion_scale, interpolation=cv2.INTER_NEAREST
+                            )
+                            inferred = detections is None or rate_controller.should_infer(motion_frame)
+                            if inferred:
+                                model = session.model
+                                pending = self.inference_server.submit_tiles(
+                                    camera_id, layout.tiles(frame), session.detector_key
+                                )
+                                detections = layout.merge(pending.wait(10.0))
+                                if model is not None:
+                                    self._record_model_latency(session, model, pending, len(layout))
+                        else:
+                            # Detection runs on a letterboxed copy at the model's input size; delivery
+                            # frames are scaled separately from the full-resolution source
+                            inference_frame, inference_scale, inference_pad = letterbox(frame, session.inference_size)
+                            
+                            # Static scenes reuse the previous detections instead of running the model
+                            inferred = detections is None or rate_controller.should_infer(inference_frame)
+                            if inferred:
+                                model = session.model
+                                pending = self.inference_server.submit(camera_id, inference_frame, session.detector_key)
+                                detections = unletterbox_detections(
+                                    pending.wait(10.0), inference_scale, inference_pad, frame.shape
+                                )
+                                if model is not None:
+                                    self._record_model_latency(session, model, pending)
                     
-                    # Alert check
-                    alert_triggered = self.density_detector.check_threshold(density_info['density_value'], threshold)
+                    if tracker is not None:
+                        dt = captured_at - last_captured_at if last_captured_at is not None else 0.0
+                        last_captured_at = captured_at
+                        people, _ = tracker.update(detections, dt) if inferred else tracker.predict(dt)
+                    else:
+                        people = detections
+                    density_info = self.density_detector.calculate_density(
+                        people, frame.shape, session.ground_plane, self.density_threshold
+                    )
                     
-                    # Log to DB
+                    # Queue a log entry for the background writer (alerts use the default threshold, not a viewer's)
                     current_time = time.time()
                     if current_time - last_log_time >= log_interval:
-                        DensityLog.create(camera_id, density_info['person_count'], density_info['density_value'], alert_triggered)
+                        alert_logged = self.density_detector.check_alert(density_info, self.density_threshold)
+                        DensityLog.enqueue(camera_id, density_info['person_count'], density_info['density_value'], alert_logged)
                         last_log_time = current_time
                     
-                    # Encode
-                    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+                    # Resize and draw once per (profile, render mode), then one overlay + encode
+                    # per group of viewers that see identical frames
+                    view_groups = session.view_groups()
+                    large_crowd = len(people) >= self.large_crowd_people
+                    profile_frames = {}
+                    profile_groups = {}
+                    for options, *_ in view_groups:
+                        key = (options['profile'], self._render_mode(options, large_crowd))
+                        profile_groups[key] = profile_groups.get(key, 0) + 1
+                    for options, binary_room, base64_room, binary_count, base64_count in view_groups:
+                        profile = session.profiles[options['profile']]
+                        render = self._render_mode(options, large_crowd)
+                        key = (options['profile'], render)
+                        if key not in profile_frames:
+                            delivery_frame, delivery_scale = resize_to_width(frame, profile['max_width'])
+                            if delivery_frame is frame:
+                                delivery_frame = frame.copy()
+                            delivery_people = scale_detections(people, delivery_scale)
+                            if render == 'heatmap':
+                                profile_frames[key] = self.heatmap_renderer.render(delivery_frame, delivery_people)
+                            else:
+                                profile_frames[key] = self.yolo_detector.draw_detections(
+                                    delivery_frame, delivery_people, profile['labels'] and render == 'boxes'
+                                )
+                        view_frame = profile_frames[key]
+                        
+                        threshold = options['threshold']
+                        if profile['overlay']:
+                            if profile_groups[key] > 1:
+                                view_frame = view_frame.copy()
+                            view_frame = self._draw_density_overlay(view_frame, density_info, threshold)
+                        
+                        # Alert check
+                        alert_triggered = self.density_detector.check_alert(density_info, threshold)
+                        
+                        # Encode and emit
+                        self._emit_frame(view_frame, profile['jpeg_quality'], {
+                            'camera_id': camera_id,
+                            'profile': options['profile'],
+                            'render': render,
+                            'density': density_info,
+                            'alert': alert_triggered
+                        }, transport_meter, binary_room, base64_room, binary_count, base64_count)
                     
-                    # Emit
-                    self.socketio.emit('frame', {
-                        'camera_id': camera_id,
-                        'frame': frame_base64,
-                        'density': density_info,
-                        'alert': alert_triggered
-                    })
+                    session.record_latency(time.time() - captured_at)
+                    rate_controller.record(inferred, time.time() - loop_started)
                 
-                # Limit FPS to ~10-15 to save CPU and Network
+                # Pace to the target FPS, counting the time already spent on this frame
                 # Use socketio.sleep instead of time.sleep
-                self.socketio.sleep(0.08)
+                self.socketio.sleep(rate_controller.sleep_time(loop_started))
         
         except Exception as e:
             print(f"Error in stream worker: {e}")
-            self.socketio.emit('error', {'camera_id': camera_id, 'message': str(e)})
+            self._emit_to_viewers(session, 'error', {'camera_id': camera_id, 'message': str(e)})
         
         finally:
             if cap:
                 cap.release()
-            # Clean up signal if it exists
-            if camera_id in self.stream_signals:
-                del self.stream_signals[camera_id]
+            if grabber:
+                grabber.stop()
+                if self.inference_server:
+                    self.inference_server.unregister_stream(camera_id)
+            session.running = False
+            # A newer session may already have replaced this one
+            if self.sessions.get(camera_id) is session:
+                del self.sessions[camera_id]
             print(f"Stream worker stopped for camera {camera_id}")
     
+    def _emit_frame(self, frame, jpeg_quality, metadata, transport_meter, binary_room, base64_room,
+                    binary_count, base64_count):
+        """
+        JPEG-encode a frame once and send it to one view group
+        
+        Binary viewers get the raw JPEG bytes as a Socket.IO attachment; base64 is
+        only produced when the group has at least one base64 viewer.
+        """
+        cpu_started = time.thread_time()
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])
+        jpeg = buffer.tobytes()
+        frame_base64 = base64.b64encode(jpeg).decode('utf-8') if base64_room else None
+        encode_cpu = time.thread_time() - cpu_started
+        
+        if binary_room:
+            self.socketio.emit('frame', dict(metadata, frame=jpeg), to=binary_room)
+        if base64_room:
+            self.socketio.emit('frame', dict(metadata, frame=frame_base64), to=base64_room)
+        
+        transport_meter.record(
+            len(jpeg) * binary_count,
+            len(frame_base64) * base64_count if frame_base64 else 0,
+            encode_cpu
+        )
+
+    def get_stats(self):
+        """
+        Get pipeline statistics for all active streams
+        
+        Returns:
+            dict with per-camera viewers, capture counters, processing rates and latency
+        """
+        return {
+            'streams': {camera_id: session.stats() for camera_id, session in list(self.sessions.items())},
+            'inference': self.inference_server.stats() if self.inference_server else None,
+            'workers': self.yolo_detector.stats() if isinstance(self.yolo_detector, ProcessPoolDetector) else None,
+            'model_selection': self.model_selector.stats() if self.model_selector else None
+        }
+
     def _draw_density_overlay(self, frame, density_info, threshold):
         """Draw density information overlay on frame"""
         # Create overlay
@@ -280,7 +722,7 @@ class VideoStreamer:
         cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
         
         # Text color based on alert status
-        alert_triggered = density_info['density_value'] >= threshold
+        alert_triggered = self.density_detector.check_alert(density_info, threshold)
         text_color = (0, 0, 255) if alert_triggered else (0, 255, 0)
         
         cv2.putText(frame, f"People: {density_info['person_count']}", 
@@ -1,81 +1,84 @@
 """
 YOLOv8 Model wrapper for person detection
 """
-from ultralytics import YOLO
+import numpy as np
 import os
+from ai_processor.detections import empty_detections
+from ai_processor.detector_backends import PersonDetector
 
-class YOLOPersonDetector:
-    """YOLOv8-based person detector"""
+class YOLOPersonDetector(PersonDetector):
+    """YOLOv8-based person detector (ultralytics/PyTorch backend)"""
     
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, input_size=640):
         """
         Initialize YOLO model for person detection
         
         Args:
             model_path: Path to YOLOv8 model weights. If None, uses default 'yolov8n.pt'
+            input_size: Largest network input detect()/detect_array() run a frame at
         """
         if model_path is None:
             # Use nano model for faster inference
             model_path = 'yolov8n.pt'
         
+        # Imported here: loading torch is slow and the ONNX backends never need it
+        from ultralytics import YOLO
         self.model = YOLO(model_path)
         self.person_class_id = 0  # COCO dataset class 0 is 'person'
+        self.input_size = input_size
     
-    def detect(self, frame, conf_threshold=0.25):
+    def detect_array(self, frame, conf_threshold=0.25):
         """
-        Detect people in a frame
+        Detect people in a frame, returning a compact array
+        
+        Frames larger than input_size are letterboxed down to it (boxes are
+        returned in frame coordinates), so a full-resolution frame does not run
+        the network at 1920 or 3840; smaller frames run at their own size.
         
         Args:
             frame: OpenCV frame (numpy array)
             conf_threshold: Confidence threshold for detections
         
         Returns:
-            List of detections: [{'bbox': [x1, y1, x2, y2], 'confidence': float}, ...]
+            (N, 5) float32 array of [x1, y1, x2, y2, confidence]
         """
-        results = self.model(frame, conf=conf_threshold, classes=[self.person_class_id], verbose=False)
-        
-        detections = []
-        if len(results) > 0 and results[0].boxes is not None:
-            boxes = results[0].boxes
-            for i in range(len(boxes)):
-                box = boxes[i]
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                confidence = float(box.conf[0].cpu().numpy())
-                
-                detections.append({
-                    'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                    'confidence': confidence
-                })
+        results = self.model(frame, conf=conf_threshold, classes=[self.person_class_id],
+                             imgsz=min(self._input_size([frame]), self.input_size), verbose=False)
         
-        return detections
+        if len(results) > 0:
+            return self._extract_detections(results[0])
+        return empty_detections()
     
-    def draw_detections(self, frame, detections):
+    def detect_batch(self, frames, conf_threshold=0.25):
         """
-        Draw bounding boxes on frame
+        Detect people in several frames with a single forward pass
+        
+        Frames run at their own size (up to the largest in the batch): the
+        callers already letterboxed them to the camera's inference size or cut
+        tiles at it. Use detect_array() for frames of arbitrary size.
         
         Args:
-            frame: OpenCV frame
-            detections: List of detections from detect() method
+            frames: List of OpenCV frames (numpy arrays)
+            conf_threshold: Confidence threshold for detections
         
         Returns:
-            Frame with drawn bounding boxes
+            List with one (N, 5) detection array per input frame, in input order
         """
-        import cv2
-        
-        for det in detections:
-            x1, y1, x2, y2 = det['bbox']
-            confidence = det['confidence']
-            
-            # Draw bounding box (blue color)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 100, 0), 2)
-            
-            # Draw confidence label
-            label = f'Person {confidence:.2f}'
-            label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), (255, 100, 0), -1)
-            cv2.putText(frame, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        return frame
-
+        if not frames:
+            return []
+        results = self.model(list(frames), conf=conf_threshold, classes=[self.person_class_id],
+                             imgsz=self._input_size(frames), verbose=False)
+        return [self._extract_detections(result) for result in results]
+    
+    def _input_size(self, frames):
+        """Network input size covering the largest frame (multiple of the model stride)"""
+        largest = max(max(frame.shape[:2]) for frame in frames)
+        return max(32, (largest + 31) // 32 * 32)
+    
+    def _extract_detections(self, result):
+        """Convert a single ultralytics result into an (N, 5) array with one device-to-host copy"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return empty_detections()
+        # boxes.data rows are [x1, y1, x2, y2, conf, cls]
+        return boxes.data[:, :5].cpu().numpy().astype(np.float32, copy=False)
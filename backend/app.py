@@ -10,11 +10,12 @@ from flask import Flask, send_from_directory, send_file
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from dotenv import load_dotenv
-from models import init_db
+from models import init_db, init_log_writer, init_camera_cache
 from routes.user_routes import user_bp
 from routes.camera_routes import camera_bp
 from routes.monitoring_routes import monitoring_bp
 from ai_processor.video_streamer import VideoStreamer
+from ai_processor.model_selector import DEFAULT_CANDIDATES
 
 # Load environment variables
 load_dotenv()
@@ -42,7 +43,24 @@ except Exception as e:
     socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # Initialize database
-init_db(app.config['MONGODB_URI'])
+init_db(
+    app.config['MONGODB_URI'],
+    log_storage=os.getenv('DENSITY_LOG_STORAGE', 'standard'),
+    log_ttl_days=float(os.getenv('DENSITY_LOG_TTL_DAYS', 0))
+)
+
+# Camera lookups are cached in-process; a change stream keeps replicas coherent where supported
+init_camera_cache(
+    ttl=float(os.getenv('CAMERA_CACHE_TTL_SECONDS', 30)),
+    max_size=int(os.getenv('CAMERA_CACHE_SIZE', 1024))
+)
+
+# Density logs from every stream are buffered and written in batches
+init_log_writer(
+    max_queue=int(os.getenv('DENSITY_LOG_QUEUE_SIZE', 10000)),
+    batch_size=int(os.getenv('DENSITY_LOG_BATCH_SIZE', 200)),
+    flush_interval=float(os.getenv('DENSITY_LOG_FLUSH_SECONDS', 2.0))
+)
 
 # Register blueprints
 app.register_blueprint(user_bp, url_prefix='/api/auth')
@@ -50,7 +68,23 @@ app.register_blueprint(camera_bp, url_prefix='/api/cameras')
 app.register_blueprint(monitoring_bp, url_prefix='/api/monitoring')
 
 # Initialize video streamer (must be after socketio initialization)
-video_streamer = VideoStreamer(socketio)
+video_streamer = VideoStreamer(
+    socketio,
+    inference_batch_size=int(os.getenv('INFERENCE_MAX_BATCH', 8)),
+    inference_max_wait=float(os.getenv('INFERENCE_MAX_WAIT_MS', 20)) / 1000.0,
+    inference_processes=int(os.getenv('INFERENCE_PROCESSES', 0)),
+    detection_fps=float(os.getenv('DETECTION_FPS', 12)),
+    motion_threshold=float(os.getenv('MOTION_THRESHOLD', 2.0)),
+    idle_grace=float(os.getenv('STREAM_IDLE_GRACE_SECONDS', 30)),
+    tracking=os.getenv('TRACKING_ENABLED', 'False').lower() == 'true',
+    detect_every=int(os.getenv('TRACKING_DETECT_EVERY', 3)),
+    large_crowd_people=int(os.getenv('LARGE_CROWD_PEOPLE', 40)),
+    capture_backend=os.getenv('CAPTURE_BACKEND', 'opencv'),
+    detector_backend=os.getenv('DETECTOR_BACKEND', 'ultralytics'),
+    detector_model=os.getenv('DETECTOR_MODEL') or None,
+    model_candidates=os.getenv('MODEL_CANDIDATES', DEFAULT_CANDIDATES)
+)
+app.extensions['video_streamer'] = video_streamer
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
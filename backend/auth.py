@@ -3,22 +3,92 @@ JWT Authentication utilities
 """
 import jwt
 import bcrypt
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify
 import os
+import threading
+import time
+
+try:
+    from eventlet import patcher, tpool
+except ImportError:
+    patcher = tpool = None
 
 JWT_SECRET = os.getenv('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
 
+# bcrypt settings and slots, created on first use (see bcrypt_settings)
+_bcrypt_settings = None
+_bcrypt_settings_lock = threading.Lock()
+
+# Verified tokens -> payload, so repeat requests from a session skip signature checks.
+# Keyed by the exact token string, so only byte-identical tokens that already
+# passed verification can hit; entries are dropped once the token expires.
+_token_cache_size = None  # JWT_CACHE_SIZE, read on first use (see token_cache_size)
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_counters = {'hits': 0, 'misses': 0}
+
+class PasswordHashingBusy(Exception):
+    """Raised when every bcrypt slot is taken; routes answer 429"""
+
+def _offload(function, *args):
+    """
+    Run a CPU-bound call without stalling the event loop
+    
+    Under eventlet the call runs on eventlet's native thread pool (tpool) so
+    video emits and other requests keep flowing; bcrypt releases the GIL while
+    hashing. Without eventlet the caller is already a native thread.
+    """
+    if patcher is not None and patcher.is_monkey_patched('thread'):
+        return tpool.execute(function, *args)
+    return function(*args)
+
+def bcrypt_settings():
+    """
+    bcrypt settings, read from the environment on first use
+    
+    Not read at import time: app.py imports the routes (and so this module)
+    before load_dotenv(), so values from .env would otherwise be ignored.
+    
+    Returns:
+        Dict with rounds (cost factor for new hashes; existing hashes keep
+        theirs), max_concurrency (concurrent bcrypt calls), queue_timeout
+        (seconds a request waits for a slot before a 429) and slots
+    """
+    global _bcrypt_settings
+    with _bcrypt_settings_lock:
+        if _bcrypt_settings is None:
+            max_concurrency = int(os.getenv('BCRYPT_MAX_CONCURRENCY', 4))
+            _bcrypt_settings = {
+                'rounds': int(os.getenv('BCRYPT_ROUNDS', 12)),
+                'max_concurrency': max_concurrency,
+                'queue_timeout': float(os.getenv('BCRYPT_QUEUE_TIMEOUT_MS', 2000)) / 1000.0,
+                'slots': threading.BoundedSemaphore(max_concurrency)
+            }
+        return _bcrypt_settings
+
+def _bcrypt_slot(function, *args):
+    """Run a bcrypt call within the concurrency limit"""
+    settings = bcrypt_settings()
+    if not settings['slots'].acquire(timeout=settings['queue_timeout']):
+        raise PasswordHashingBusy('Too many concurrent password checks')
+    try:
+        return _offload(function, *args)
+    finally:
+        settings['slots'].release()
+
 def hash_password(password):
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    salt = bcrypt.gensalt(rounds=bcrypt_settings()['rounds'])
+    return _bcrypt_slot(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
 
 def verify_password(password, password_hash):
     """Verify a password against a hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    return _bcrypt_slot(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
 
 def create_token(user_id, email):
     """Create a JWT token"""
@@ -30,15 +100,55 @@ def create_token(user_id, email):
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def token_cache_size():
+    """Maximum cached tokens, read on first use so JWT_CACHE_SIZE from .env applies (see bcrypt_settings)"""
+    global _token_cache_size
+    if _token_cache_size is None:
+        _token_cache_size = int(os.getenv('JWT_CACHE_SIZE', 4096))
+    return _token_cache_size
+
 def verify_token(token):
-    """Verify and decode a JWT token"""
+    """Verify and decode a JWT token (verified tokens are cached until they expire)"""
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            if cached['exp'] > time.time():
+                _token_cache.move_to_end(token)
+                _token_cache_counters['hits'] += 1
+                return dict(cached)
+            del _token_cache[token]
+        _token_cache_counters['misses'] += 1
+    
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    
+    max_size = token_cache_size()
+    if isinstance(payload.get('exp'), (int, float)) and max_size > 0:
+        with _token_cache_lock:
+            _token_cache[token] = payload
+            while len(_token_cache) > max_size:
+                _token_cache.popitem(last=False)
+    return dict(payload)
+
+def clear_token_cache():
+    """Forget all verified tokens"""
+    with _token_cache_lock:
+        _token_cache.clear()
+
+def token_cache_stats():
+    """Return token cache counters"""
+    lookups = _token_cache_counters['hits'] + _token_cache_counters['misses']
+    return {
+        'size': len(_token_cache),
+        'max_size': token_cache_size(),
+        'hits': _token_cache_counters['hits'],
+        'misses': _token_cache_counters['misses'],
+        'hit_ratio': round(_token_cache_counters['hits'] / lookups, 3) if lookups else 0.0
+    }
 
 def auth_required(f):
     """Decorator for routes that require authentication"""
@@ -0,0 +1,73 @@
+"""
+Measure authenticated request throughput with and without the token cache
+
+Runs an auth_required route through Flask's test client, first clearing the
+verified-token cache before every request (a full jwt.decode each time, as
+before the cache existed) and then with the cache warm. Runs offline - no
+server or database needed.
+
+Usage: python benchmarks/bench_auth.py [--requests 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from auth import auth_required, create_token, verify_token, clear_token_cache
+
+def build_app():
+    """Minimal app with one protected route"""
+    app = Flask(__name__)
+
+    @app.route('/protected')
+    @auth_required
+    def protected():
+        return jsonify({'ok': True})
+
+    return app
+
+def run(client, headers, count, cached):
+    """Return requests per second for count sequential requests"""
+    clear_token_cache()
+    started = time.perf_counter()
+    for _ in range(count):
+        if not cached:
+            clear_token_cache()
+        response = client.get('/protected', headers=headers)
+        assert response.status_code == 200
+    return count / (time.perf_counter() - started)
+
+def run_verify(token, count, cached):
+    """Return verify_token calls per second"""
+    clear_token_cache()
+    started = time.perf_counter()
+    for _ in range(count):
+        if not cached:
+            clear_token_cache()
+        verify_token(token)
+    return count / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Auth throughput benchmark')
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per measurement')
+    args = parser.parse_args()
+
+    token = create_token('0' * 24, 'bench@example.com')
+    headers = {'Authorization': f'Bearer {token}'}
+    client = build_app().test_client()
+
+    print(f"Requests per measurement: {args.requests}")
+    print("=" * 70)
+    for label, measure in (
+        ('verify_token', lambda cached: run_verify(token, args.requests * 10, cached)),
+        ('auth_required route', lambda cached: run(client, headers, args.requests, cached))
+    ):
+        before = measure(False)
+        after = measure(True)
+        print(f"{label:<22} uncached {before:10.0f}/s   cached {after:10.0f}/s   ({after / before:.1f}x)")
+
+if __name__ == '__main__':
+    main()
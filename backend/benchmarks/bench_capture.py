@@ -0,0 +1,141 @@
+"""
+Compare CPU per stream for the OpenCV and ffmpeg capture backends
+
+Reads frames as fast as each backend delivers them and reports CPU time (this
+process plus the ffmpeg child) per frame, and the cores one stream would use at
+the source frame rate. Use a 1080p clip or camera URL for per-1080p numbers.
+
+With --target-fps the OpenCV backend is also measured grabbing every frame but
+retrieving only enough for that rate, as FrameGrabber does.
+
+Usage: python benchmarks/bench_capture.py <video file or URL> [--frames 600] [--max-width 1280]
+                                          [--target-fps 10]
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor.ffmpeg_capture import FFmpegCapture
+
+def cpu_seconds():
+    """User + system CPU of this process and its waited-for children"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+def measure(open_capture, frames):
+    cpu_started = cpu_seconds()
+    wall_started = time.perf_counter()
+    cap = open_capture()
+    if not cap.isOpened():
+        return None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    read = 0
+    shape = None
+    while read < frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        shape = frame.shape
+        read += 1
+    cap.release()  # Waits for the ffmpeg child so its CPU time is counted
+    cpu = cpu_seconds() - cpu_started
+    wall = time.perf_counter() - wall_started
+    if not read:
+        return None
+    return {
+        'frames': read,
+        'shape': shape,
+        'cpu_ms_per_frame': cpu * 1000.0 / read,
+        'decode_fps': read / wall,
+        'cores_at_source_fps': cpu / read * fps
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Capture backend CPU benchmark')
+    parser.add_argument('source', help='Video file path or RTSP/HTTP URL')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--max-width', type=int, default=0,
+                        help='Also measure ffmpeg scaling to this width in the decoder')
+    parser.add_argument('--target-fps', type=float, default=0,
+                        help='Also measure grab() for every frame and retrieve() at this rate')
+    args = parser.parse_args()
+
+    runs = [
+        ('opencv', lambda: cv2.VideoCapture(args.source)),
+        ('ffmpeg', lambda: FFmpegCapture(args.source))
+    ]
+    if args.max_width:
+        runs += [
+            (f'opencv + resize {args.max_width}',
+             lambda: _ResizingCapture(cv2.VideoCapture(args.source), args.max_width)),
+            (f'ffmpeg scale {args.max_width}',
+             lambda: FFmpegCapture(args.source, max_width=args.max_width))
+        ]
+    if args.target_fps:
+        runs.append((f'opencv retrieve {args.target_fps:g}fps',
+                     lambda: _SkippingCapture(cv2.VideoCapture(args.source), args.target_fps)))
+
+    print(f"Source: {args.source}, {args.frames} frames per backend")
+    print("=" * 78)
+    print(f"{'backend':<22}{'frames':>8}{'size':>12}{'CPU ms/frame':>15}{'decode fps':>12}{'cores/stream':>14}")
+    for name, open_capture in runs:
+        result = measure(open_capture, args.frames)
+        if result is None:
+            print(f"{name:<22}{'could not open source':>56}")
+            continue
+        height, width = result['shape'][:2]
+        print(f"{name:<22}{result['frames']:>8}{f'{width}x{height}':>12}{result['cpu_ms_per_frame']:>15.2f}"
+              f"{result['decode_fps']:>12.1f}{result['cores_at_source_fps']:>14.3f}")
+
+class _ResizingCapture:
+    """OpenCV capture followed by the INTER_AREA downscale the pipeline would otherwise do"""
+
+    def __init__(self, cap, max_width):
+        self.cap = cap
+        self.max_width = max_width
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def read(self):
+        ok, frame = self.cap.read()
+        if ok and frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return ok, frame
+
+    def release(self):
+        self.cap.release()
+
+class _SkippingCapture(_ResizingCapture):
+    """OpenCV capture that grabs every frame and retrieves one per target interval"""
+
+    def __init__(self, cap, target_fps):
+        super().__init__(cap, 0)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self.every = max(1, round(fps / target_fps))
+        self.fps = fps / self.every
+        self.grabbed = 0
+
+    def get(self, prop):
+        # Processed rate, so cores/stream is CPU per second of source video
+        return self.fps if prop == cv2.CAP_PROP_FPS else self.cap.get(prop)
+
+    def read(self):
+        # Counted as one processed frame per retrieve, so CPU ms/frame includes the skipped grabs
+        while True:
+            if not self.cap.grab():
+                return False, None
+            self.grabbed += 1
+            if self.grabbed % self.every == 0:
+                return self.cap.retrieve()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare detector backends on latency and person-count agreement
+
+The first backend is the reference (the current PyTorch path by default);
+every other backend is scored by how far its per-frame person count is from
+the reference's on the same frames. Frames are letterboxed to --size first,
+as the streaming pipeline does, so latency covers the model and its pre- and
+post-processing only.
+
+Usage: python benchmarks/bench_detectors.py video [video ...] [--frames 200] [--size 640]
+           [--backends ultralytics:yolov8n.pt onnxruntime:weights/yolov8n-person-int8.onnx opencv:...]
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor.detector_backends import create_detector, DEFAULT_ONNX_MODEL
+from ai_processor.frame_profiles import letterbox
+
+DEFAULT_BACKENDS = [
+    'ultralytics:yolov8n.pt',
+    f'onnxruntime:{DEFAULT_ONNX_MODEL}',
+    f'opencv:{DEFAULT_ONNX_MODEL}'
+]
+
+def load_frames(videos, count, size):
+    """Letterboxed frames sampled evenly across the videos"""
+    frames = []
+    per_video = max(1, count // len(videos))
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or per_video
+        step = max(1, total // per_video)
+        for index in range(0, total, step)[:per_video]:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ret, frame = cap.read()
+            if ret:
+                frames.append(letterbox(frame, size)[0])
+        cap.release()
+    return frames
+
+def run(detector, frames, conf):
+    detector.detect_batch([frames[0]], conf)  # Warm-up (lazy initialisation, allocations)
+    timings, counts = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        detections = detector.detect_batch([frame], conf)[0]
+        timings.append((time.perf_counter() - started) * 1000.0)
+        counts.append(len(detections))
+    return np.array(timings), np.array(counts)
+
+def main():
+    parser = argparse.ArgumentParser(description='Detector backend comparison')
+    parser.add_argument('videos', nargs='+', help='Sample videos')
+    parser.add_argument('--frames', type=int, default=200, help='Frames in total')
+    parser.add_argument('--size', type=int, default=640, help='Letterbox size (must match fixed-size exports)')
+    parser.add_argument('--conf', type=float, default=0.25)
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime intra-op threads')
+    parser.add_argument('--backends', nargs='+', default=DEFAULT_BACKENDS,
+                        help='backend:model pairs; the first is the reference')
+    args = parser.parse_args()
+
+    frames = load_frames(args.videos, args.frames, args.size)
+    if not frames:
+        print("Could not read any frames")
+        return
+
+    print(f"{len(frames)} frames at {args.size}px from {len(args.videos)} video(s)")
+    print("=" * 96)
+    print(f"{'backend':<48}{'mean ms':>9}{'p95 ms':>9}{'people':>9}{'count MAE':>11}{'bias':>8}")
+    reference = None
+    for spec in args.backends:
+        backend, _, model = spec.partition(':')
+        try:
+            started = time.perf_counter()
+            detector = create_detector(backend, model or None, threads=args.threads)
+            load_ms = (time.perf_counter() - started) * 1000.0
+        except Exception as e:
+            print(f"{spec:<48}  could not load: {e}")
+            continue
+        timings, counts = run(detector, frames, args.conf)
+        if reference is None:
+            reference = counts
+            error, bias = '-', '-'
+        else:
+            error = f"{np.mean(np.abs(counts - reference)):.2f}"
+            bias = f"{np.mean(counts - reference):+.2f}"
+        print(f"{spec:<48}{timings.mean():>9.1f}{np.percentile(timings, 95):>9.1f}"
+              f"{counts.mean():>9.1f}{error:>11}{bias:>8}   (loaded in {load_ms:.0f} ms)")
+
+if __name__ == '__main__':
+    main()
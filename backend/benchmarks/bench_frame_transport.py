@@ -0,0 +1,89 @@
+"""
+Compare base64-in-JSON and binary-attachment frame transport
+
+Measures, per frame and per second of streaming, the payload size and the
+server CPU spent encoding for both formats. Runs offline - no server needed.
+
+Usage: python benchmarks/bench_frame_transport.py [video_file] [--fps 12] [--frames 200]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def load_frames(video_path, count):
+    """Read frames from a video, or synthesize a moving test scene"""
+    frames = []
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame.shape[1] > 800:
+                scale = 800 / frame.shape[1]
+                frame = cv2.resize(frame, None, fx=scale, fy=scale)
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames
+        print(f"Could not read {video_path}, using a synthetic scene")
+
+    base = np.zeros((450, 800, 3), dtype=np.uint8)
+    base[:] = np.linspace(40, 200, 800, dtype=np.uint8)[None, :, None]
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        frame = base.copy()
+        for _ in range(40):
+            x, y = rng.integers(0, 760), rng.integers(0, 380)
+            cv2.rectangle(frame, (x + i % 20, y), (x + 30 + i % 20, y + 70), (255, 100, 0), 2)
+        frames.append(frame)
+    return frames
+
+def measure(frames, binary):
+    """Return (avg payload bytes, avg CPU ms) per frame"""
+    metadata = {'camera_id': '0' * 24, 'density': {'person_count': 40, 'density_value': 0.5, 'density_per_sqm': 1.0}, 'alert': False}
+    total_bytes = 0
+    cpu_started = time.thread_time()
+    for frame in frames:
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        if binary:
+            jpeg = buffer.tobytes()
+            # Socket.IO sends metadata as a JSON packet plus one binary attachment
+            total_bytes += len(json.dumps(dict(metadata, frame={'_placeholder': True, 'num': 0}))) + len(jpeg)
+        else:
+            frame_base64 = base64.b64encode(buffer).decode('utf-8')
+            total_bytes += len(json.dumps(dict(metadata, frame=frame_base64)))
+    cpu_ms = (time.thread_time() - cpu_started) * 1000.0
+    return total_bytes / len(frames), cpu_ms / len(frames)
+
+def main():
+    parser = argparse.ArgumentParser(description='Frame transport benchmark')
+    parser.add_argument('video', nargs='?', help='Optional video file to sample frames from')
+    parser.add_argument('--fps', type=float, default=12.0, help='Streaming rate used for per-second figures')
+    parser.add_argument('--frames', type=int, default=200, help='Number of frames to encode')
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    print(f"Frames: {len(frames)} at {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print("=" * 70)
+
+    results = {}
+    for name, binary in (('base64 JSON', False), ('binary attachment', True)):
+        payload, cpu_ms = measure(frames, binary)
+        results[name] = payload
+        print(f"{name:<20} {payload / 1024:8.1f} KiB/frame  {payload * args.fps / 1024:9.1f} KiB/s  "
+              f"{cpu_ms:6.2f} ms CPU/frame  ({cpu_ms * args.fps / 10:.1f}% of a core)")
+
+    saved = 1.0 - results['binary attachment'] / results['base64 JSON']
+    print("=" * 70)
+    print(f"Binary transport saves {saved * 100:.1f}% of bytes per stream")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Measure frame emit jitter on the eventlet hub during a burst of logins
+
+A green thread ticks at the streaming rate (as a camera's emit loop does)
+while 50 password checks arrive at once. Runs twice: with bcrypt called
+inline on the hub, and through auth.verify_password (tpool + concurrency
+limit). Reports how late the ticks were. Runs offline - no server needed.
+
+Usage: python benchmarks/bench_login_jitter.py [--logins 50] [--fps 12] [--rounds 12]
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+
+def emitter(fps, stop, lateness):
+    """Tick at fps, recording how late each tick was (ms)"""
+    interval = 1.0 / fps
+    next_tick = time.perf_counter() + interval
+    while not stop['done']:
+        eventlet.sleep(max(0.0, next_tick - time.perf_counter()))
+        lateness.append(max(0.0, time.perf_counter() - next_tick) * 1000.0)
+        next_tick += interval
+
+def burst(check, logins):
+    """Run logins concurrent password checks; return (ok, rejected, seconds)"""
+    results = {'ok': 0, 'rejected': 0}
+
+    def login():
+        try:
+            check()
+            results['ok'] += 1
+        except Exception:
+            results['rejected'] += 1
+
+    started = time.perf_counter()
+    pool = eventlet.GreenPool(logins)
+    for _ in range(logins):
+        pool.spawn(login)
+    pool.waitall()
+    return results['ok'], results['rejected'], time.perf_counter() - started
+
+def measure(check, logins, fps):
+    stop = {'done': False}
+    lateness = []
+    ticker = eventlet.spawn(emitter, fps, stop, lateness)
+    eventlet.sleep(0.5)  # Baseline ticks before the burst
+    ok, rejected, seconds = burst(check, logins)
+    eventlet.sleep(0.5)
+    stop['done'] = True
+    ticker.wait()
+    lateness.sort()
+    p50 = lateness[len(lateness) // 2]
+    p99 = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+    return ok, rejected, seconds, p50, p99, lateness[-1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Login burst emit jitter benchmark')
+    parser.add_argument('--logins', type=int, default=50, help='Concurrent logins in the burst')
+    parser.add_argument('--fps', type=float, default=12.0, help='Emit loop rate')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor of the stored hash')
+    args = parser.parse_args()
+
+    os.environ.setdefault('BCRYPT_ROUNDS', str(args.rounds))
+    import auth
+
+    password = b'correct horse battery staple'
+    stored = bcrypt.hashpw(password, bcrypt.gensalt(rounds=args.rounds))
+
+    print(f"{args.logins} logins, bcrypt cost {args.rounds}, emit loop at {args.fps:g} FPS, "
+          f"{auth.bcrypt_settings()['max_concurrency']} bcrypt slots")
+    print("=" * 78)
+    for label, check in (
+        ('inline bcrypt', lambda: bcrypt.checkpw(password, stored)),
+        ('tpool + limit', lambda: auth.verify_password(password.decode(), stored.decode()))
+    ):
+        ok, rejected, seconds, p50, p99, worst = measure(check, args.logins, args.fps)
+        print(f"{label:<15} ok {ok:3d}  429 {rejected:3d}  burst {seconds:5.2f}s   "
+              f"tick lateness p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  max {worst:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare per-box drawing with the heatmap overlay for growing crowds
+
+Usage: python benchmarks/bench_overlay.py [--width 1280] [--height 720] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor.detections import draw_detections
+from ai_processor.heatmap import HeatmapRenderer
+
+def random_detections(count, width, height, rng):
+    x1 = rng.uniform(0, width - 40, count)
+    y1 = rng.uniform(0, height - 90, count)
+    return np.stack([x1, y1, x1 + 30, y1 + 80, rng.uniform(0.3, 0.9, count)], axis=1).astype(np.float32)
+
+def time_ms(function, frame, detections, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(frame.copy(), detections)
+    return (time.perf_counter() - started) * 1000.0 / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description='Overlay rendering benchmark')
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    renderer = HeatmapRenderer()
+    baseline = time_ms(lambda f, d: f, frame, None, args.repeat)  # cost of the frame copy alone
+
+    print(f"Frame {args.width}x{args.height}, ms per frame (excluding the {baseline:.2f} ms frame copy)")
+    print("=" * 70)
+    print(f"{'people':>8}{'boxes + labels':>17}{'boxes only':>13}{'heatmap':>10}")
+    for count in (10, 50, 100, 300, 600):
+        detections = random_detections(count, args.width, args.height, rng)
+        labelled = time_ms(lambda f, d: draw_detections(f, d, True), frame, detections, args.repeat) - baseline
+        plain = time_ms(lambda f, d: draw_detections(f, d, False), frame, detections, args.repeat) - baseline
+        heat = time_ms(renderer.render, frame, detections, args.repeat) - baseline
+        print(f"{count:>8}{labelled:>17.2f}{plain:>13.2f}{heat:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare letterboxed detection with tiled detection on high-resolution video
+
+For each frame the whole image is letterboxed to --size (the default pipeline)
+and, separately, cut into overlapping --size tiles that run as one batch and
+are merged with cross-tile NMS. Reports people found, ms per frame, and the
+cost of the tile planning and merge steps on their own.
+
+Usage: python benchmarks/bench_tiling.py video_file [--frames 100] [--size 640] [--overlap 0.2]
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor.detector_backends import create_detector
+from ai_processor.frame_profiles import letterbox, unletterbox_detections
+from ai_processor.tiling import TileLayout, tile_layout
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiled inference benchmark')
+    parser.add_argument('video', help='High-resolution video file')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--size', type=int, default=640, help='Model input / tile size')
+    parser.add_argument('--overlap', type=float, default=0.2)
+    parser.add_argument('--backend', default='ultralytics')
+    parser.add_argument('--model', default=None)
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    frames = []
+    while len(frames) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        print(f"Could not read {args.video}")
+        return
+
+    detector = create_detector(args.backend, args.model)
+    height, width = frames[0].shape[:2]
+    layout = tile_layout(height, width, args.size, args.overlap)
+    detector.detect_batch(layout.tiles(frames[0]))  # Warm-up
+
+    letterbox_ms, letterbox_counts = [], []
+    tiled_ms, tiled_counts, merge_ms = [], [], []
+    for frame in frames:
+        started = time.perf_counter()
+        square, scale, pad = letterbox(frame, args.size)
+        detections = unletterbox_detections(detector.detect_batch([square])[0], scale, pad, frame.shape)
+        letterbox_ms.append((time.perf_counter() - started) * 1000.0)
+        letterbox_counts.append(len(detections))
+
+        started = time.perf_counter()
+        results = detector.detect_batch(tile_layout(height, width, args.size, args.overlap).tiles(frame))
+        merge_started = time.perf_counter()
+        detections = layout.merge(results)
+        tiled_ms.append((time.perf_counter() - started) * 1000.0)
+        merge_ms.append((time.perf_counter() - merge_started) * 1000.0)
+        tiled_counts.append(len(detections))
+
+    repeat = 1000
+    started = time.perf_counter()
+    for _ in range(repeat):
+        TileLayout(height, width, args.size, args.overlap)
+    plan_us = (time.perf_counter() - started) * 1e6 / repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tile_layout(height, width, args.size, args.overlap)
+    cached_us = (time.perf_counter() - started) * 1e6 / repeat
+
+    print(f"{len(frames)} frames at {width}x{height}, {len(layout)} tiles of "
+          f"{layout.tile_width}x{layout.tile_height} ({args.overlap:.0%} overlap)")
+    print("=" * 64)
+    print(f"{'mode':<12}{'people/frame':>14}{'ms/frame':>12}{'merge ms':>12}")
+    print(f"{'letterbox':<12}{np.mean(letterbox_counts):>14.1f}{np.mean(letterbox_ms):>12.1f}{'-':>12}")
+    print(f"{'tiled':<12}{np.mean(tiled_counts):>14.1f}{np.mean(tiled_ms):>12.1f}{np.mean(merge_ms):>12.2f}")
+    print(f"\nTile planning: {plan_us:.1f} us uncached, {cached_us:.2f} us cached")
+
+if __name__ == '__main__':
+    main()
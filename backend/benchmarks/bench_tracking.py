@@ -0,0 +1,92 @@
+"""
+Compare per-frame detection with detect-every-Nth-frame + tracking
+
+Runs the detector on every frame of a video as the reference, then replays
+the same frames detecting only every Nth frame and letting PersonTracker
+fill the gaps. Reports inference calls, count error against the per-frame
+reference and count flicker (mean frame-to-frame change). The reference is
+the detector itself, not hand-labelled ground truth.
+
+Usage: python benchmarks/bench_tracking.py video_file [--every 1 2 3 5] [--frames 600] [--fps 12]
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor.yolo_model import YOLOPersonDetector
+from ai_processor.frame_profiles import letterbox, unletterbox_detections
+from ai_processor.tracker import PersonTracker
+
+def load_frames(video_path, count):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def detect(detector, frame, size=640):
+    square, scale, pad = letterbox(frame, size)
+    return unletterbox_detections(detector.detect_batch([square])[0], scale, pad, frame.shape)
+
+def flicker(counts):
+    return float(np.mean(np.abs(np.diff(counts)))) if len(counts) > 1 else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description='Tracking benchmark')
+    parser.add_argument('video', help='Video file to evaluate on')
+    parser.add_argument('--every', type=int, nargs='+', default=[1, 2, 3, 5], help='Detection intervals to try')
+    parser.add_argument('--frames', type=int, default=600, help='Maximum frames to use')
+    parser.add_argument('--fps', type=float, default=12.0, help='Processing rate (sets dt between frames)')
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    if not frames:
+        print(f"Could not read {args.video}")
+        return
+    detector = YOLOPersonDetector()
+    dt = 1.0 / args.fps
+
+    started = time.perf_counter()
+    reference = [detect(detector, frame) for frame in frames]
+    detect_ms = (time.perf_counter() - started) * 1000.0 / len(frames)
+    reference_counts = np.array([len(d) for d in reference])
+
+    print(f"Frames: {len(frames)}   detection {detect_ms:.1f} ms/frame")
+    print("=" * 78)
+    print(f"{'mode':<22}{'inferences':>11}{'count MAE':>11}{'flicker':>9}{'tracker ms':>12}{'est. ms/frame':>15}")
+    print(f"{'detect every frame':<22}{len(frames):>11}{0.0:>11.2f}{flicker(reference_counts):>9.2f}"
+          f"{0.0:>12.2f}{detect_ms:>15.1f}")
+
+    for every in args.every:
+        tracker = PersonTracker()
+        counts = []
+        inferences = 0
+        tracker_seconds = 0.0
+        for index, detections in enumerate(reference):
+            started = time.perf_counter()
+            if index % every == 0:
+                # Reuse the reference detections - same output the model would give here
+                inferences += 1
+                boxes, _ = tracker.update(detections, dt)
+            else:
+                boxes, _ = tracker.predict(dt)
+            tracker_seconds += time.perf_counter() - started
+            counts.append(len(boxes))
+        counts = np.array(counts)
+        tracker_ms = tracker_seconds * 1000.0 / len(frames)
+        estimate = detect_ms * inferences / len(frames) + tracker_ms
+        print(f"{'tracking, every ' + str(every):<22}{inferences:>11}"
+              f"{float(np.mean(np.abs(counts - reference_counts))):>11.2f}{flicker(counts):>9.2f}"
+              f"{tracker_ms:>12.2f}{estimate:>15.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,33 @@
 """
 Database models for MongoDB using PyMongo
 """
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError
-from datetime import datetime
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import (
+    DuplicateKeyError, BulkWriteError, AutoReconnect, ConnectionFailure, NetworkTimeout, OperationFailure
+)
+from datetime import datetime, timedelta
 from bson import ObjectId
+from collections import OrderedDict
+import atexit
 import os
+import queue
+import threading
+import time
 
 class Database:
-    def __init__(self, uri):
+    def __init__(self, uri, log_storage=None, log_ttl_days=None):
+        """
+        Connect and prepare collections
+        
+        Args:
+            uri: MongoDB connection string
+            log_storage: 'standard' or 'timeseries' layout for density_logs
+                         (None keeps whatever layout already exists)
+            log_ttl_days: Days raw density logs are kept, 0 for forever
+                          (None leaves the current retention untouched)
+        """
+        self.log_storage = log_storage
+        self.log_ttl_days = log_ttl_days
         try:
             self.client = MongoClient(uri, serverSelectionTimeoutMS=5000)
             # Extract database name from URI or use default
@@ -31,18 +50,197 @@ class Database:
         self.db.users.create_index("email", unique=True)
         # Camera collection indexes
         self.db.cameras.create_index("name", unique=True)
-        # DensityLog collection indexes
+        # DensityLog collection layout, retention and indexes
+        self._init_density_logs()
+        # Density rollup collection indexes
+        for collection in DensityRollup.COLLECTIONS.values():
+            self.db[collection].create_index([("camera_id", 1), ("bucket", 1)], unique=True)
+    
+    def density_logs_layout(self):
+        """Return 'timeseries', 'standard', or None if density_logs does not exist yet"""
+        for info in self.db.list_collections(filter={'name': 'density_logs'}):
+            return 'timeseries' if info.get('type') == 'timeseries' else 'standard'
+        return None
+    
+    def create_timeseries_density_logs(self, ttl_days=0):
+        """Create density_logs as a time-series collection bucketed per camera"""
+        options = {
+            'timeseries': {'timeField': 'timestamp', 'metaField': 'camera_id', 'granularity': 'seconds'}
+        }
+        if ttl_days:
+            options['expireAfterSeconds'] = int(ttl_days * 86400)
+        self.db.create_collection('density_logs', **options)
+    
+    def _init_density_logs(self):
+        """Apply the configured density_logs layout and TTL"""
+        layout = self.density_logs_layout()
+        if self.log_storage == 'timeseries':
+            if layout is None:
+                self.create_timeseries_density_logs(self.log_ttl_days or 0)
+                layout = 'timeseries'
+            elif layout == 'standard':
+                print("[WARN] DENSITY_LOG_STORAGE=timeseries but density_logs is a standard collection; "
+                      "run db/migrate_density_logs.py to convert it")
+        
+        if layout == 'timeseries':
+            if self.log_ttl_days is not None:
+                expire = int(self.log_ttl_days * 86400) if self.log_ttl_days else 'off'
+                self.db.command('collMod', 'density_logs', expireAfterSeconds=expire)
+            # Time-series collections already cluster by camera_id and timestamp;
+            # this index serves the per-camera, newest-first queries
+            self.db.density_logs.create_index([("camera_id", 1), ("timestamp", -1)])
+            return
+        
         self.db.density_logs.create_index([("camera_id", 1), ("timestamp", -1)])
-        self.db.density_logs.create_index("timestamp")
+        if self.log_ttl_days is None:
+            self.db.density_logs.create_index("timestamp")
+            return
+        # Retention on a standard collection is a TTL index on timestamp;
+        # rebuild the index when the configured TTL changes
+        expire = int(self.log_ttl_days * 86400) if self.log_ttl_days else None
+        current = self.db.density_logs.index_information().get('timestamp_1')
+        if current is not None and current.get('expireAfterSeconds') != expire:
+            self.db.density_logs.drop_index('timestamp_1')
+        if expire:
+            self.db.density_logs.create_index("timestamp", expireAfterSeconds=expire)
+        else:
+            self.db.density_logs.create_index("timestamp")
 
 db = None
+log_writer = None
+camera_cache = None
 
-def init_db(uri):
+def init_db(uri, log_storage=None, log_ttl_days=None):
     """Initialize database connection"""
     global db
-    db = Database(uri)
+    db = Database(uri, log_storage, log_ttl_days)
     return db
 
+def init_log_writer(**kwargs):
+    """Start the background density log writer (see DensityLogWriter for options)"""
+    global log_writer
+    if log_writer is None:
+        log_writer = DensityLogWriter(**kwargs)
+        log_writer.start()
+        atexit.register(log_writer.stop)
+    return log_writer
+
+def init_camera_cache(ttl=30.0, max_size=1024, watch=True):
+    """Put a CameraCache in front of Camera.find_by_id, optionally kept coherent by a change stream"""
+    global camera_cache
+    if camera_cache is None:
+        camera_cache = CameraCache(ttl, max_size)
+        if watch:
+            camera_cache.start_watching()
+    return camera_cache
+
+class CameraCache:
+    """TTL + LRU cache of camera documents keyed by camera ID"""
+    
+    def __init__(self, ttl=30.0, max_size=1024):
+        """
+        Initialize camera cache
+        
+        Args:
+            ttl: Seconds an entry is served before it is re-read
+            max_size: Maximum cached cameras; the least recently used are evicted
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # {camera_id: (camera, expires_at)}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so reads that raced a write are not cached
+        self.generation = 0
+        self.watching = False
+        
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+    
+    def get(self, camera_id):
+        """Return a copy of the cached camera, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(camera_id)
+            if entry is None or entry[1] < time.time():
+                if entry is not None:
+                    del self._entries[camera_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(camera_id)
+            self.hits += 1
+            return dict(entry[0])
+    
+    def put(self, camera_id, camera, generation):
+        """Cache a camera read that started at the given generation"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[camera_id] = (camera, time.time() + self.ttl)
+            self._entries.move_to_end(camera_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, camera_id=None):
+        """Drop one camera, or every camera when camera_id is None"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if camera_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(camera_id, None)
+    
+    def start_watching(self):
+        """Invalidate entries from a change stream (replica sets and sharded clusters only)"""
+        thread = threading.Thread(target=self._watch, name='camera-cache-watch', daemon=True)
+        thread.start()
+    
+    def _watch(self):
+        """Follow camera changes made by any backend instance"""
+        resume_token = None
+        while True:
+            try:
+                with db.db.cameras.watch(resume_after=resume_token) as stream:
+                    self.watching = True
+                    # Anything may have changed while the stream was down
+                    self.invalidate()
+                    for change in stream:
+                        resume_token = stream.resume_token
+                        document_key = change.get('documentKey')
+                        self.invalidate(str(document_key['_id']) if document_key else None)
+                        # Listings elsewhere must see the new version without waiting for its TTL
+                        Camera._version_fetched_at = 0.0
+            except OperationFailure as e:
+                self.watching = False
+                if e.code in (40573, 40324):
+                    # Standalone server: change streams are unavailable, rely on TTL + local invalidation
+                    print("[INFO] Camera change stream unavailable (standalone MongoDB); using TTL invalidation only")
+                    return
+                print(f"Camera change stream error: {e}")
+                resume_token = None
+                time.sleep(5.0)
+            except Exception as e:
+                self.watching = False
+                print(f"Camera change stream error: {e}")
+                time.sleep(5.0)
+    
+    def stats(self):
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+            'change_stream': self.watching
+        }
+
 class User:
     @staticmethod
     def create(email, password_hash, name):
@@ -83,6 +281,12 @@ class User:
             return None
 
 class Camera:
+    # Collection version, bumped on every write and cached for VERSION_TTL seconds
+    # so conditional listing requests can be answered without a query
+    VERSION_TTL = 2.0
+    _version = None
+    _version_fetched_at = 0.0
+    
     @staticmethod
     def create(name, url, location, owner_id):
         """Create a new camera"""
@@ -94,6 +298,7 @@ class Camera:
                 'owner_id': ObjectId(owner_id),
                 'created_at': datetime.utcnow()
             })
+            Camera.bump_version()
             return str(result.inserted_id)
         except DuplicateKeyError:
             return None
@@ -103,13 +308,65 @@ class Camera:
         """Find all cameras"""
         return list(db.db.cameras.find())
     
+    @staticmethod
+    def find_page(after=None, limit=100, projection=None):
+        """
+        Find one page of cameras in _id order
+        
+        Args:
+            after: Return cameras whose _id is greater than this (the previous page's cursor)
+            limit: Page size
+            projection: Fields to fetch
+        
+        Returns:
+            Tuple (cameras, next cursor or None)
+        """
+        query = {'_id': {'$gt': ObjectId(after)}} if after else {}
+        cameras = list(db.db.cameras.find(query, projection).sort('_id', 1).limit(limit + 1))
+        if len(cameras) > limit:
+            cameras = cameras[:limit]
+            return cameras, str(cameras[-1]['_id'])
+        return cameras, None
+    
+    @staticmethod
+    def collection_version():
+        """Current camera collection version (cached for VERSION_TTL seconds)"""
+        now = time.time()
+        if Camera._version is None or now - Camera._version_fetched_at >= Camera.VERSION_TTL:
+            meta = db.db.meta.find_one({'_id': 'cameras'})
+            Camera._version = meta['version'] if meta else 0
+            Camera._version_fetched_at = now
+        return Camera._version
+    
+    @staticmethod
+    def bump_version():
+        """Record a change to the camera collection"""
+        meta = db.db.meta.find_one_and_update(
+            {'_id': 'cameras'},
+            {'$inc': {'version': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        Camera._version = meta['version']
+        Camera._version_fetched_at = time.time()
+    
     @staticmethod
     def find_by_id(camera_id):
-        """Find camera by ID"""
+        """Find camera by ID (served from the camera cache when it is enabled)"""
+        camera_id = str(camera_id)
+        if camera_cache is not None:
+            camera = camera_cache.get(camera_id)
+            if camera is not None:
+                return camera
+            generation = camera_cache.generation
         try:
-            return db.db.cameras.find_one({'_id': ObjectId(camera_id)})
+            camera = db.db.cameras.find_one({'_id': ObjectId(camera_id)})
         except:
             return None
+        if camera is not None and camera_cache is not None:
+            camera_cache.put(camera_id, camera, generation)
+            return dict(camera)
+        return camera
     
     @staticmethod
     def find_by_owner(owner_id):
@@ -127,6 +384,10 @@ class Camera:
                 {'_id': ObjectId(camera_id)},
                 {'$set': updates}
             )
+            if camera_cache is not None:
+                camera_cache.invalidate(str(camera_id))
+            if result.modified_count > 0:
+                Camera.bump_version()
             return result.modified_count > 0
         except:
             return False
@@ -136,6 +397,10 @@ class Camera:
         """Delete camera"""
         try:
             result = db.db.cameras.delete_one({'_id': ObjectId(camera_id)})
+            if camera_cache is not None:
+                camera_cache.invalidate(str(camera_id))
+            if result.deleted_count > 0:
+                Camera.bump_version()
             return result.deleted_count > 0
         except:
             return False
@@ -145,13 +410,15 @@ class DensityLog:
     def create(camera_id, person_count, density_value, alert_triggered=False):
         """Create a new density log entry"""
         try:
-            result = db.db.density_logs.insert_one({
+            entry = {
                 'camera_id': ObjectId(camera_id),
                 'timestamp': datetime.utcnow(),
                 'person_count': person_count,
                 'density_value': density_value,
                 'alert_triggered': alert_triggered
-            })
+            }
+            result = db.db.density_logs.insert_one(entry)
+            DensityRollup.apply([entry])
             return str(result.inserted_id)
         except:
             return None
@@ -169,7 +436,6 @@ class DensityLog:
     @staticmethod
     def find_recent_by_camera(camera_id, minutes=60):
         """Find recent density logs for a camera"""
-        from datetime import timedelta
         try:
             cutoff = datetime.utcnow() - timedelta(minutes=minutes)
             return list(db.db.density_logs.find({
@@ -178,4 +444,419 @@ class DensityLog:
             }).sort('timestamp', 1))
         except:
             return []
+    
+    @staticmethod
+    def find_cursor(camera_id, minutes=0, limit=100, projection=None):
+        """
+        Open a cursor over a camera's density logs without materializing it
+        
+        Args:
+            camera_id: Camera ID
+            minutes: Logs from the last N minutes, oldest first; 0 for the latest
+                     `limit` logs, newest first (same order as the list finders)
+            limit: Maximum logs when minutes is 0
+            projection: Fields to fetch
+        """
+        query = {'camera_id': ObjectId(camera_id)}
+        if minutes > 0:
+            query['timestamp'] = {'$gte': datetime.utcnow() - timedelta(minutes=minutes)}
+            return db.db.density_logs.find(query, projection).sort('timestamp', 1)
+        return db.db.density_logs.find(query, projection).sort('timestamp', -1).limit(limit)
+    
+    @staticmethod
+    def create_many(entries, retry=False):
+        """
+        Insert several density log entries in one round trip
+        
+        Raises on failure so the caller can decide whether to retry. insert_many
+        gives every entry its _id on the first attempt, so a retry (retry=True)
+        skips entries that attempt already stored and counts duplicate-key
+        errors as stored; time-series collections have no unique _id index, so
+        the duplicate-key check alone would not be enough.
+        """
+        if not entries:
+            return 0
+        if retry:
+            stored = {doc['_id'] for doc in db.db.density_logs.find({
+                '_id': {'$in': [entry['_id'] for entry in entries if '_id' in entry]},
+                'timestamp': {
+                    '$gte': min(entry['timestamp'] for entry in entries),
+                    '$lte': max(entry['timestamp'] for entry in entries)
+                }
+            }, {'_id': 1})}
+            entries = [entry for entry in entries if entry.get('_id') not in stored]
+            if not entries:
+                return 0
+        try:
+            result = db.db.density_logs.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            if not retry or any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+            return e.details.get('nInserted', 0)
+        return len(result.inserted_ids)
+    
+    @staticmethod
+    def enqueue(camera_id, person_count, density_value, alert_triggered=False):
+        """
+        Queue a density log entry for the background writer
+        
+        Never blocks on the database. Falls back to a direct insert when the
+        writer has not been started (scripts, tests).
+        """
+        if log_writer is None:
+            return DensityLog.create(camera_id, person_count, density_value, alert_triggered)
+        log_writer.enqueue({
+            'camera_id': ObjectId(camera_id),
+            'timestamp': datetime.utcnow(),
+            'person_count': person_count,
+            'density_value': density_value,
+            'alert_triggered': alert_triggered
+        })
+        return None
 
+class DensityLogWriter:
+    """Background writer that batches density logs from all cameras into insert_many calls"""
+    
+    TRANSIENT_ERRORS = (AutoReconnect, ConnectionFailure, NetworkTimeout)
+    
+    def __init__(self, max_queue=10000, batch_size=200, flush_interval=2.0, max_retries=5):
+        """
+        Initialize log writer
+        
+        Args:
+            max_queue: Maximum queued entries; the oldest are dropped beyond this
+            batch_size: Flush once this many entries are waiting
+            flush_interval: Flush at least this often (seconds) while entries are waiting
+            max_retries: Attempts for a batch that fails with a transient error
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = False
+        self._thread = None
+        self._idle = threading.Event()
+        self._idle.set()
+        
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.rollup_failed = 0
+        self.max_depth = 0
+        self.last_error = None
+        self.last_flush_ms = 0.0
+    
+    def start(self):
+        """Start the writer thread (a green thread when eventlet is active)"""
+        self._thread = threading.Thread(target=self._run, name='density-log-writer', daemon=True)
+        self._thread.start()
+    
+    def enqueue(self, entry):
+        """Queue an entry without blocking; drops the oldest entry when the queue is full"""
+        while True:
+            try:
+                self._queue.put_nowait(entry)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+    
+    def stop(self, timeout=10.0):
+        """Stop the writer, flushing everything still queued"""
+        if self._stopping:
+            return
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+        # Anything the thread did not get to (or if it never ran)
+        remaining = self._drain(self._queue.qsize())
+        if remaining:
+            self._write(remaining)
+    
+    def flush(self, timeout=10.0):
+        """Wait until every queued entry has been written (or failed)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._queue.empty() and self._idle.is_set():
+                return True
+            time.sleep(0.05)
+        return False
+    
+    def _drain(self, limit):
+        entries = []
+        while len(entries) < limit:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return entries
+    
+    def _run(self):
+        """Collect batches until batch_size is reached or flush_interval expires"""
+        while not self._stopping:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._idle.clear()
+            batch = [first]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopping:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            if self._queue.empty():
+                self._idle.set()
+        self._idle.set()
+    
+    def _write(self, batch):
+        """Insert a batch and fold it into the rollups"""
+        started = time.time()
+        if not self._with_retries(lambda retry: DensityLog.create_many(batch, retry=retry)):
+            self.failed += len(batch)
+            return False
+        self.written += len(batch)
+        self.batches += 1
+        # The batch id makes a retried rollup update a no-op for buckets the failed attempt reached
+        batch_id = ObjectId()
+        if not self._with_retries(lambda retry: DensityRollup.apply(batch, batch_id=batch_id)):
+            self.rollup_failed += len(batch)
+        self.last_flush_ms = (time.time() - started) * 1000.0
+        return True
+    
+    def _with_retries(self, operation):
+        """
+        Run a write, retrying transient failures with exponential backoff
+        
+        Args:
+            operation: Callable taking retry (True after a failed attempt, which
+                       may still have been applied on the server)
+        """
+        for attempt in range(self.max_retries):
+            try:
+                operation(attempt > 0)
+                return True
+            except self.TRANSIENT_ERRORS as e:
+                self.last_error = str(e)
+                if attempt + 1 < self.max_retries:
+                    self.retries += 1
+                    time.sleep(min(0.5 * (2 ** attempt), 10.0))
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error writing density logs: {e}")
+                break
+        return False
+    
+    def stats(self):
+        """Return queue and write counters"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'queue_capacity': self._queue.maxsize,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'written': self.written,
+            'failed': self.failed,
+            'rollup_failed': self.rollup_failed,
+            'batches': self.batches,
+            'retries': self.retries,
+            'avg_batch_size': round(self.written / self.batches, 1) if self.batches else 0.0,
+            'last_flush_ms': round(self.last_flush_ms, 1),
+            'last_error': self.last_error
+        }
+
+class DensityRollup:
+    """Minute/hour/day aggregates of density logs, updated incrementally as logs are written"""
+    
+    COLLECTIONS = {
+        'minute': 'density_rollups_minute',
+        'hour': 'density_rollups_hour',
+        'day': 'density_rollups_day'
+    }
+    
+    BUCKET_LENGTHS = {
+        'minute': timedelta(minutes=1),
+        'hour': timedelta(hours=1),
+        'day': timedelta(days=1)
+    }
+    
+    # Longest window (minutes) served at each resolution by resolution=auto;
+    # keeps responses to roughly 1500 points or fewer
+    AUTO_MAX_MINUTES = [
+        ('raw', 60),
+        ('minute', 24 * 60),
+        ('hour', 60 * 24 * 60),
+        ('day', None)
+    ]
+    
+    @staticmethod
+    def bucket_start(timestamp, resolution):
+        """Truncate a timestamp to the start of its bucket"""
+        if resolution == 'minute':
+            return timestamp.replace(second=0, microsecond=0)
+        if resolution == 'hour':
+            return timestamp.replace(minute=0, second=0, microsecond=0)
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    @staticmethod
+    def pick_resolution(minutes):
+        """Coarsest resolution needed to keep a window of this length small"""
+        for resolution, max_minutes in DensityRollup.AUTO_MAX_MINUTES:
+            if max_minutes is None or minutes <= max_minutes:
+                return resolution
+        return 'day'
+    
+    # Recent batch ids kept per bucket; retries follow their failed attempt
+    # within seconds, so only the last few batches need remembering
+    APPLIED_BATCHES = 16
+    
+    @staticmethod
+    def apply(entries, batch_id=None, resolutions=None):
+        """
+        Fold density log entries into every rollup collection
+        
+        Entries are pre-aggregated per bucket so a batch costs one upsert per
+        (camera, bucket) rather than one per entry. Raises on failure.
+        
+        $inc is not idempotent, so with a batch_id each bucket records the
+        batches folded into it and skips one it already has: the update only
+        matches buckets without the id, and the upsert that follows a miss
+        fails on the unique (camera_id, bucket) index, which means the bucket
+        is already up to date.
+        
+        Args:
+            entries: Density log documents (camera_id, timestamp, person_count,
+                     density_value, alert_triggered)
+            batch_id: Id making a retry of the same batch safe (None to always apply)
+            resolutions: Resolutions to update (default: all)
+        """
+        for resolution, collection in DensityRollup.COLLECTIONS.items():
+            if resolutions is not None and resolution not in resolutions:
+                continue
+            buckets = {}
+            for entry in entries:
+                key = (entry['camera_id'], DensityRollup.bucket_start(entry['timestamp'], resolution))
+                bucket = buckets.get(key)
+                density = entry['density_value']
+                count = entry['person_count']
+                if bucket is None:
+                    buckets[key] = {
+                        'samples': 1,
+                        'density_sum': density,
+                        'density_min': density,
+                        'density_max': density,
+                        'person_sum': count,
+                        'person_max': count,
+                        'alert_count': 1 if entry.get('alert_triggered') else 0
+                    }
+                else:
+                    bucket['samples'] += 1
+                    bucket['density_sum'] += density
+                    bucket['density_min'] = min(bucket['density_min'], density)
+                    bucket['density_max'] = max(bucket['density_max'], density)
+                    bucket['person_sum'] += count
+                    bucket['person_max'] = max(bucket['person_max'], count)
+                    bucket['alert_count'] += 1 if entry.get('alert_triggered') else 0
+            
+            operations = []
+            for (camera_id, bucket_start), bucket in buckets.items():
+                query = {'camera_id': camera_id, 'bucket': bucket_start}
+                update = {
+                    '$inc': {
+                        'samples': bucket['samples'],
+                        'density_sum': bucket['density_sum'],
+                        'person_sum': bucket['person_sum'],
+                        'alert_count': bucket['alert_count']
+                    },
+                    '$min': {'density_min': bucket['density_min']},
+                    '$max': {'density_max': bucket['density_max'], 'person_max': bucket['person_max']}
+                }
+                if batch_id is not None:
+                    query['batch_ids'] = {'$ne': batch_id}
+                    update['$push'] = {
+                        'batch_ids': {'$each': [batch_id], '$slice': -DensityRollup.APPLIED_BATCHES}
+                    }
+                operations.append(UpdateOne(query, update, upsert=True))
+            if not operations:
+                continue
+            try:
+                db.db[collection].bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                if batch_id is None or any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                    raise
+    
+    @staticmethod
+    def find_cursor(camera_id, resolution, minutes=60, projection=None):
+        """Open a cursor over rollup buckets overlapping the last N minutes, oldest first"""
+        cutoff = DensityRollup.bucket_start(datetime.utcnow() - timedelta(minutes=minutes), resolution)
+        return db.db[DensityRollup.COLLECTIONS[resolution]].find({
+            'camera_id': ObjectId(camera_id),
+            'bucket': {'$gte': cutoff}
+        }, projection).sort('bucket', 1)
+    
+    @staticmethod
+    def rebuild(camera_id=None, batch_size=5000):
+        """
+        Recompute rollups from the raw density logs
+        
+        Only buckets starting at or after the oldest raw log are recomputed.
+        With a TTL, older logs have expired and their buckets (including the
+        one the oldest log falls in) are the only history left, so they are
+        kept as they are.
+        
+        Args:
+            camera_id: Only rebuild this camera (default: all cameras)
+            batch_size: Raw logs folded per round trip
+        
+        Returns:
+            Number of raw logs processed
+        """
+        query = {'camera_id': ObjectId(camera_id)} if camera_id else {}
+        oldest = next(iter(db.db.density_logs.find(query, {'timestamp': 1}).sort('timestamp', 1).limit(1)), None)
+        if oldest is None:
+            return 0
+        
+        # First whole bucket covered by raw logs, per resolution
+        starts = {}
+        for resolution, collection in DensityRollup.COLLECTIONS.items():
+            start = DensityRollup.bucket_start(oldest['timestamp'], resolution)
+            if start < oldest['timestamp']:
+                start += DensityRollup.BUCKET_LENGTHS[resolution]
+            starts[resolution] = start
+            db.db[collection].delete_many(dict(query, bucket={'$gte': start}))
+        
+        processed = 0
+        batch = []
+        cursor = db.db.density_logs.find(dict(query, timestamp={'$gte': min(starts.values())}), {
+            'camera_id': 1, 'timestamp': 1, 'person_count': 1, 'density_value': 1, 'alert_triggered': 1
+        }).batch_size(batch_size)
+        for entry in cursor:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                processed += DensityRollup._refold(batch, starts)
+                batch = []
+        if batch:
+            processed += DensityRollup._refold(batch, starts)
+        return processed
+    
+    @staticmethod
+    def _refold(entries, starts):
+        """Apply raw logs to each resolution whose rebuilt range they fall in"""
+        for resolution, start in starts.items():
+            covered = [entry for entry in entries if entry['timestamp'] >= start]
+            if covered:
+                DensityRollup.apply(covered, resolutions=[resolution])
+        return len(entries)
@@ -1,28 +1,178 @@
 """
 Camera management routes
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+import hashlib
 from models import Camera
 from auth import auth_required
 from bson import ObjectId
+from ai_processor.frame_profiles import DELIVERY_PROFILES
+from ai_processor.ground_plane import validate_calibration, DEFAULT_CELL_SIZE_M
+from ai_processor.ffmpeg_capture import CAPTURE_BACKENDS
 
 camera_bp = Blueprint('camera', __name__)
 
+def _parse_stream_settings(data):
+    """
+    Validate optional per-camera streaming settings
+    
+    Returns:
+        Tuple (updates dict, error message or None)
+    """
+    updates = {}
+    if 'detection_fps' in data:
+        try:
+            detection_fps = float(data['detection_fps'])
+        except (TypeError, ValueError):
+            return None, 'detection_fps must be a number'
+        if not 0 < detection_fps <= 60:
+            return None, 'detection_fps must be between 0 and 60'
+        updates['detection_fps'] = detection_fps
+    if 'inference_size' in data:
+        inference_size = data['inference_size']
+        if not isinstance(inference_size, int) or not 160 <= inference_size <= 1920 or inference_size % 32:
+            return None, 'inference_size must be a multiple of 32 between 160 and 1920'
+        updates['inference_size'] = inference_size
+    if 'profiles' in data:
+        profiles = data['profiles']
+        if not isinstance(profiles, dict):
+            return None, 'profiles must be an object'
+        for name, settings in profiles.items():
+            if name not in DELIVERY_PROFILES or not isinstance(settings, dict):
+                return None, f'Unknown profile: {name}'
+            max_width = settings.get('max_width', DELIVERY_PROFILES[name]['max_width'])
+            jpeg_quality = settings.get('jpeg_quality', DELIVERY_PROFILES[name]['jpeg_quality'])
+            if not isinstance(max_width, int) or not 64 <= max_width <= 3840:
+                return None, 'max_width must be between 64 and 3840'
+            if not isinstance(jpeg_quality, int) or not 10 <= jpeg_quality <= 100:
+                return None, 'jpeg_quality must be between 10 and 100'
+        updates['profiles'] = profiles
+    if 'tracking' in data:
+        if not isinstance(data['tracking'], bool):
+            return None, 'tracking must be true or false'
+        updates['tracking'] = data['tracking']
+    if 'detect_every' in data:
+        detect_every = data['detect_every']
+        if not isinstance(detect_every, int) or not 1 <= detect_every <= 30:
+            return None, 'detect_every must be an integer between 1 and 30'
+        updates['detect_every'] = detect_every
+    if 'calibration' in data:
+        calibration = data['calibration']
+        if calibration is not None:
+            error = validate_calibration(calibration)
+            if error:
+                return None, error
+            calibration = {
+                'image_points': [[float(x), float(y)] for x, y in calibration['image_points']],
+                'world_points': [[float(x), float(y)] for x, y in calibration['world_points']],
+                'grid_cell_m': float(calibration.get('grid_cell_m', DEFAULT_CELL_SIZE_M))
+            }
+        updates['calibration'] = calibration
+    if 'capture_backend' in data:
+        capture_backend = data['capture_backend']
+        if capture_backend is not None and capture_backend not in CAPTURE_BACKENDS:
+            return None, f"capture_backend must be one of: {', '.join(CAPTURE_BACKENDS)}"
+        updates['capture_backend'] = capture_backend
+    if 'latency_budget_ms' in data:
+        latency_budget_ms = data['latency_budget_ms']
+        if latency_budget_ms is not None:
+            if isinstance(latency_budget_ms, bool) or not isinstance(latency_budget_ms, (int, float)) \
+                    or not 5 <= latency_budget_ms <= 10000:
+                return None, 'latency_budget_ms must be a number between 5 and 10000'
+            latency_budget_ms = float(latency_budget_ms)
+        updates['latency_budget_ms'] = latency_budget_ms
+    if 'tiling' in data:
+        if not isinstance(data['tiling'], bool):
+            return None, 'tiling must be true or false'
+        updates['tiling'] = data['tiling']
+    if 'tile_overlap' in data:
+        tile_overlap = data['tile_overlap']
+        if isinstance(tile_overlap, bool) or not isinstance(tile_overlap, (int, float)) or not 0 <= tile_overlap <= 0.5:
+            return None, 'tile_overlap must be a number between 0 and 0.5'
+        updates['tile_overlap'] = float(tile_overlap)
+    return updates, None
+
+def _stream_settings(camera):
+    """Per-camera streaming settings for API responses"""
+    return {
+        'detection_fps': camera.get('detection_fps'),
+        'inference_size': camera.get('inference_size'),
+        'profiles': camera.get('profiles', {}),
+        'tracking': camera.get('tracking'),
+        'detect_every': camera.get('detect_every'),
+        'calibration': camera.get('calibration'),
+        'capture_backend': camera.get('capture_backend'),
+        'latency_budget_ms': camera.get('latency_budget_ms'),
+        'tiling': camera.get('tiling'),
+        'tile_overlap': camera.get('tile_overlap')
+    }
+
+def _model_selection(camera):
+    """Model the streamer picked (or would pick) for the camera's latency budget"""
+    video_streamer = current_app.extensions.get('video_streamer')
+    return video_streamer.model_selection(camera) if video_streamer else None
+
+# Fields a listing can request with ?fields= (id is always included)
+LIST_FIELDS = ('name', 'url', 'location', 'owner_id', 'created_at',
+               'detection_fps', 'inference_size', 'profiles', 'tracking', 'detect_every',
+               'calibration', 'capture_backend', 'latency_budget_ms', 'tiling', 'tile_overlap')
+DEFAULT_LIST_FIELDS = ('name', 'url', 'location', 'owner_id')
+MAX_PAGE_SIZE = 500
+
+def _list_value(camera, field):
+    """Serialize one camera field for the listing"""
+    if field == 'owner_id':
+        return str(camera.get('owner_id', ''))
+    if field == 'location':
+        return camera.get('location', '')
+    if field == 'created_at':
+        return camera['created_at'].isoformat() if camera.get('created_at') else None
+    return camera.get(field)
+
 @camera_bp.route('', methods=['GET'])
 @auth_required
 def get_cameras():
-    """Get all cameras"""
+    """
+    Get cameras, one page at a time
+    
+    Query parameters: after (next_cursor of the previous page), limit and
+    fields (comma separated). Responses carry an ETag derived from the
+    camera collection version, so unchanged listings return 304.
+    """
     try:
-        cameras = Camera.find_all()
-        return jsonify({
-            'cameras': [{
-                'id': str(cam['_id']),
-                'name': cam['name'],
-                'url': cam['url'],
-                'location': cam.get('location', ''),
-                'owner_id': str(cam.get('owner_id', ''))
-            } for cam in cameras]
-        }), 200
+        after = request.args.get('after') or None
+        limit = request.args.get('limit', 100, type=int)
+        fields = request.args.get('fields')
+        fields = tuple(f.strip() for f in fields.split(',') if f.strip() and f.strip() != 'id') if fields else DEFAULT_LIST_FIELDS
+        
+        if after and not ObjectId.is_valid(after):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+        unknown = [f for f in fields if f not in LIST_FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        
+        # Read the version before the page so a concurrent write can only make the tag stale-newer
+        version = Camera.collection_version()
+        query_key = f"{after}|{limit}|{','.join(fields)}"
+        etag = f"cameras-{version}-{hashlib.sha1(query_key.encode()).hexdigest()[:12]}"
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        cameras, next_cursor = Camera.find_page(after, limit, {field: 1 for field in fields} or {'_id': 1})
+        response = jsonify({
+            'cameras': [dict(
+                {'id': str(cam['_id'])},
+                **{field: _list_value(cam, field) for field in fields}
+            ) for cam in cameras],
+            'next_cursor': next_cursor
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response, 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -95,7 +245,9 @@ def get_camera(camera_id):
                 'name': camera['name'],
                 'url': camera['url'],
                 'location': camera.get('location', ''),
-                'owner_id': str(camera.get('owner_id', ''))
+                'owner_id': str(camera.get('owner_id', '')),
+                'stream_settings': _stream_settings(camera),
+                'model_selection': _model_selection(camera)
             }
         }), 200
     except Exception as e:
@@ -138,6 +290,11 @@ def update_camera(camera_id):
         if 'location' in data:
             updates['location'] = data['location'].strip()
         
+        settings, error = _parse_stream_settings(data)
+        if error:
+            return jsonify({'error': error}), 400
+        updates.update(settings)
+        
         if not updates:
             return jsonify({'error': 'No valid fields to update'}), 400
         
@@ -152,7 +309,9 @@ def update_camera(camera_id):
                 'id': str(camera['_id']),
                 'name': camera['name'],
                 'url': camera['url'],
-                'location': camera.get('location', '')
+                'location': camera.get('location', ''),
+                'stream_settings': _stream_settings(camera),
+                'model_selection': _model_selection(camera)
             }
         }), 200
     
@@ -1,16 +1,118 @@
 """
 Monitoring and density logging routes
 """
-from flask import Blueprint, request, jsonify
-from models import Camera, DensityLog
-from auth import auth_required
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from datetime import timezone
+from itertools import chain
+import json
+import models
+from models import Camera, DensityLog, DensityRollup
+from auth import auth_required, token_cache_stats
 
 monitoring_bp = Blueprint('monitoring', __name__)
 
+# Fields fetched for each history row - everything else stays in the database
+RAW_PROJECTION = {'timestamp': 1, 'person_count': 1, 'density_value': 1, 'alert_triggered': 1}
+ROLLUP_PROJECTION = {
+    '_id': 0, 'bucket': 1, 'samples': 1, 'density_sum': 1, 'density_min': 1,
+    'density_max': 1, 'person_sum': 1, 'person_max': 1, 'alert_count': 1
+}
+COLUMNS = ('timestamp', 'person_count', 'density_value', 'alert_triggered')
+
+# Rows serialized per chunk written to the response
+STREAM_CHUNK_ROWS = 500
+
+def _raw_row(log):
+    return {
+        'id': str(log['_id']),
+        'timestamp': log['timestamp'].isoformat(),
+        'person_count': log['person_count'],
+        'density_value': log['density_value'],
+        'alert_triggered': log.get('alert_triggered', False)
+    }
+
+def _rollup_row(bucket):
+    return {
+        'timestamp': bucket['bucket'].isoformat(),
+        'person_count': round(bucket['person_sum'] / bucket['samples'], 1),
+        'density_value': bucket['density_sum'] / bucket['samples'],
+        'alert_triggered': bucket['alert_count'] > 0,
+        'person_max': bucket['person_max'],
+        'density_min': bucket['density_min'],
+        'density_max': bucket['density_max'],
+        'alert_count': bucket['alert_count'],
+        'samples': bucket['samples']
+    }
+
+def _stream_rows(header, rows):
+    """Yield a JSON object whose 'logs' array is serialized chunk by chunk from a cursor"""
+    yield json.dumps(header)[:-1] + ', "logs": ['
+    chunk = []
+    separator = ''
+    for row in rows:
+        chunk.append(json.dumps(row))
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield ']}'
+
+def _stream_columns(header, rows):
+    """
+    Yield a JSON object whose 'chunks' array holds parallel column arrays
+    
+    Each chunk carries up to STREAM_CHUNK_ROWS rows as one array per column
+    (timestamps as epoch milliseconds), so the columns are written as the
+    cursor is read instead of being collected first; clients concatenate the
+    chunks' columns. The row count follows the chunks.
+    """
+    yield json.dumps(dict(header, timestamp_unit='ms', columns=list(COLUMNS)))[:-1] + ', "chunks": ['
+    columns = {name: [] for name in COLUMNS}
+    count = 0
+    separator = ''
+    for row in rows:
+        for name in COLUMNS:
+            columns[name].append(row[name])
+        count += 1
+        if len(columns['timestamp']) >= STREAM_CHUNK_ROWS:
+            yield separator + json.dumps(columns)
+            separator = ','
+            columns = {name: [] for name in COLUMNS}
+    if columns['timestamp']:
+        yield separator + json.dumps(columns)
+    yield '], "count": ' + str(count) + '}'
+
+def _epoch_ms(timestamp):
+    """Milliseconds since the epoch for a naive UTC datetime"""
+    return int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+def _column_values(document, rollup):
+    if rollup:
+        return {
+            'timestamp': _epoch_ms(document['bucket']),
+            'person_count': round(document['person_sum'] / document['samples'], 1),
+            'density_value': document['density_sum'] / document['samples'],
+            'alert_triggered': document['alert_count'] > 0
+        }
+    return {
+        'timestamp': _epoch_ms(document['timestamp']),
+        'person_count': document['person_count'],
+        'density_value': document['density_value'],
+        'alert_triggered': bool(document.get('alert_triggered'))
+    }
+
 @monitoring_bp.route('/density/<camera_id>', methods=['GET'])
 @auth_required
 def get_density_history(camera_id):
-    """Get density history for a camera"""
+    """
+    Get density history for a camera
+    
+    Query parameters: minutes (0 for the latest `limit` logs), limit,
+    resolution (raw|minute|hour|day|auto) and format (rows|columnar).
+    The response is streamed straight from the database cursor.
+    """
     try:
         # Verify camera exists
         camera = Camera.find_by_id(camera_id)
@@ -20,22 +122,37 @@ def get_density_history(camera_id):
         # Get query parameters
         limit = request.args.get('limit', 100, type=int)
         minutes = request.args.get('minutes', 60, type=int)
+        resolution = request.args.get('resolution', 'raw')
+        output_format = request.args.get('format', 'rows')
+        
+        if resolution not in ('raw', 'auto') and resolution not in DensityRollup.COLLECTIONS:
+            return jsonify({'error': 'resolution must be raw, minute, hour, day or auto'}), 400
+        if output_format not in ('rows', 'columnar'):
+            return jsonify({'error': 'format must be rows or columnar'}), 400
+        if minutes <= 0:
+            # Rollups are only served for time windows
+            resolution = 'raw'
+        elif resolution == 'auto':
+            resolution = DensityRollup.pick_resolution(minutes)
         
-        if minutes > 0:
-            logs = DensityLog.find_recent_by_camera(camera_id, minutes)
+        rollup = resolution != 'raw'
+        if rollup:
+            cursor = DensityRollup.find_cursor(camera_id, resolution, minutes, ROLLUP_PROJECTION)
         else:
-            logs = DensityLog.find_by_camera(camera_id, limit)
+            cursor = DensityLog.find_cursor(camera_id, minutes, limit, RAW_PROJECTION)
         
-        return jsonify({
-            'camera_id': camera_id,
-            'logs': [{
-                'id': str(log['_id']),
-                'timestamp': log['timestamp'].isoformat(),
-                'person_count': log['person_count'],
-                'density_value': log['density_value'],
-                'alert_triggered': log.get('alert_triggered', False)
-            } for log in logs]
-        }), 200
+        # Fetch the first row here so database errors still produce a 500
+        first = next(cursor, None)
+        documents = cursor if first is None else chain([first], cursor)
+        header = {'camera_id': camera_id, 'resolution': resolution}
+        
+        if output_format == 'columnar':
+            rows = (_column_values(document, rollup) for document in documents)
+            body = _stream_columns(dict(header, format='columnar'), rows)
+        else:
+            rows = (_rollup_row(document) if rollup else _raw_row(document) for document in documents)
+            body = _stream_rows(header, rows)
+        return Response(stream_with_context(body), mimetype='application/json')
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -72,3 +189,20 @@ def stop_monitoring(camera_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@monitoring_bp.route('/stats', methods=['GET'])
+@auth_required
+def get_pipeline_stats():
+    """Get live pipeline statistics for all active streams"""
+    try:
+        video_streamer = current_app.extensions.get('video_streamer')
+        if video_streamer is None:
+            return jsonify({'error': 'Video streamer not initialized'}), 503
+        
+        stats = video_streamer.get_stats()
+        stats['log_writer'] = models.log_writer.stats() if models.log_writer else None
+        stats['camera_cache'] = models.camera_cache.stats() if models.camera_cache else None
+        stats['token_cache'] = token_cache_stats()
+        return jsonify(stats), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -3,10 +3,16 @@ User authentication routes
 """
 from flask import Blueprint, request, jsonify
 from models import User
-from auth import hash_password, verify_password, create_token, auth_required
+from auth import hash_password, verify_password, create_token, auth_required, PasswordHashingBusy
 
 user_bp = Blueprint('user', __name__)
 
+def _busy_response():
+    """429 returned when the password hashing pool is saturated"""
+    response = jsonify({'error': 'Too many login attempts in progress, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
 @user_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -47,6 +53,9 @@ def register():
             }
         }), 201
     
+    except PasswordHashingBusy:
+        return _busy_response()
+    
     except Exception as e:
         error_msg = str(e)
         print(f"Registration error: {error_msg}")  # Log for debugging
@@ -88,6 +97,9 @@ def login():
             }
         }), 200
     
+    except PasswordHashingBusy:
+        return _busy_response()
+    
     except Exception as e:
         error_msg = str(e)
         print(f"Login error: {error_msg}")  # Log for debugging
@@ -0,0 +1,76 @@
+"""
+FrameGrabber with an ffmpeg ring source: published frames must outlive the ring
+
+Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor import ffmpeg_capture
+from ai_processor.ffmpeg_capture import FFmpegCapture
+from ai_processor.frame_grabber import FrameGrabber
+
+class _NumberedFrames:
+    """Stand-in for ffmpeg's stdout: frame n is filled with the byte n % 256"""
+
+    def __init__(self, frame_bytes):
+        self.frame_bytes = frame_bytes
+        self.sent = 0
+
+    def readinto(self, view):
+        number = self.sent // self.frame_bytes
+        count = min(len(view), self.frame_bytes - self.sent % self.frame_bytes)
+        view[:count] = bytes([number % 256]) * count
+        self.sent += count
+        return count
+
+    def close(self):
+        pass
+
+class _FakeProcess:
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def kill(self):
+        pass
+
+    def wait(self, timeout=None):
+        return 0
+
+def _ring_capture(monkeypatch, width=8, height=4, ring_size=4):
+    """FFmpegCapture reading numbered frames without starting ffmpeg"""
+    monkeypatch.setattr(ffmpeg_capture, 'FFMPEG', None)
+    cap = FFmpegCapture('test.mp4', ring_size=ring_size)
+    cap.error = None
+    cap.width, cap.height = width, height
+    cap._allocate()
+    cap.proc = _FakeProcess(_NumberedFrames(width * height * 3))
+    return cap
+
+def test_ring_views_are_overwritten(monkeypatch):
+    cap = _ring_capture(monkeypatch)
+    ret, frame = cap.read()
+    assert ret and frame.min() == frame.max() == 0
+    for _ in range(cap.ring_size):
+        cap.grab()
+    # The view now shows a later frame: this is what the grabber must not publish
+    assert frame[0, 0, 0] == cap.ring_size
+
+def test_published_frame_survives_more_than_ring_size_grabs(monkeypatch):
+    cap = _ring_capture(monkeypatch)
+    grabber = FrameGrabber(cap, 'camera', target_fps=5)
+    assert cap.grab()
+    ret, frame = cap.retrieve()
+    grabber._publish(frame)
+    frame_id, held, _ = grabber.latest()
+
+    for _ in range(cap.ring_size * 2 + 1):
+        assert cap.grab()
+        ret, frame = cap.retrieve()
+        grabber._publish(frame)
+
+    assert held.min() == held.max() == 0
+    newest_id, newest, _ = grabber.latest(frame_id)
+    assert newest[0, 0, 0] == cap.ring_size * 2 + 1
@@ -0,0 +1,44 @@
+"""
+Cross-tile duplicate suppression
+
+Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_processor.tiling import cross_tile_nms
+
+# Three overlapping 150 px tiles across a 300 x 100 frame
+TILE_RECTS = np.array([
+    [0, 0, 150, 100],
+    [75, 0, 225, 100],
+    [150, 0, 300, 100]
+], dtype=np.float32)
+
+def _nms(boxes, tile_ids):
+    detections = np.array(boxes, dtype=np.float32)
+    return cross_tile_nms(detections, np.array(tile_ids), TILE_RECTS)
+
+def test_suppressed_box_does_not_suppress_others():
+    # A overlaps B and B overlaps C (IoU 0.6 each), but A and C barely overlap:
+    # B goes, and C stays because only kept boxes suppress
+    a = [100, 10, 140, 90, 0.9]
+    b = [110, 10, 150, 90, 0.8]
+    c = [120, 10, 160, 90, 0.7]
+    kept = _nms([a, b, c], [0, 1, 2])
+    assert kept[:, 4].tolist() == np.float32([0.9, 0.7]).tolist()
+
+def test_cut_off_half_is_merged_into_the_whole_person():
+    whole = [120, 10, 170, 90, 0.9]  # Tile 1 sees the whole person
+    cut = [135, 10, 150, 90, 0.6]  # Tile 0 only sees up to its right edge
+    kept = _nms([whole, cut], [1, 0])
+    assert len(kept) == 1 and kept[0, 4] == np.float32(0.9)
+
+def test_small_person_inside_a_larger_box_is_kept():
+    large = [60, 0, 140, 100, 0.9]
+    small = [100, 20, 120, 60, 0.5]  # Whole, partly hidden person seen by the next tile
+    kept = _nms([large, small], [0, 1])
+    assert len(kept) == 2
@@ -0,0 +1,121 @@
+"""
+Convert density_logs to a MongoDB time-series collection
+Run: python db/migrate_density_logs.py [--batch-size 5000] [--ttl-days 30] [--drop-legacy]
+
+The existing collection is renamed to density_logs_legacy, density_logs is
+recreated as a time-series collection and the old logs are copied across in
+batches. Progress is recorded in the migrations collection, so an
+interrupted run can simply be started again (logs of the batch it was
+copying are not inserted twice). Stop the server first - logs
+written between the rename and the create would recreate a standard
+collection.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from models import init_db
+from dotenv import load_dotenv
+
+# Loaded before the arguments are parsed: DENSITY_LOG_TTL_DAYS is the --ttl-days default
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'backend', '.env'))
+
+LEGACY_COLLECTION = 'density_logs_legacy'
+MIGRATION_ID = 'density_logs_timeseries'
+
+def without_copied(mongo, batch):
+    """Logs of a batch not yet present in density_logs"""
+    copied = {doc['_id'] for doc in mongo.density_logs.find({
+        '_id': {'$in': [log['_id'] for log in batch]},
+        'timestamp': {
+            '$gte': min(log['timestamp'] for log in batch),
+            '$lte': max(log['timestamp'] for log in batch)
+        }
+    }, {'_id': 1})}
+    return [log for log in batch if log['_id'] not in copied]
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate density_logs to a time-series collection')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Logs copied per insert_many')
+    parser.add_argument('--ttl-days', type=float,
+                        default=float(os.getenv('DENSITY_LOG_TTL_DAYS', 0)),
+                        help='Retention for raw logs (0 keeps them forever)')
+    parser.add_argument('--drop-legacy', action='store_true', help='Drop density_logs_legacy once copied')
+    args = parser.parse_args()
+
+    mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://127.0.0.1:27017/crowd_density_db')
+    database = init_db(mongodb_uri)
+    mongo = database.db
+
+    print("=" * 60)
+    print("MIGRATE DENSITY LOGS TO TIME-SERIES")
+    print("=" * 60)
+
+    layout = database.density_logs_layout()
+    legacy_exists = LEGACY_COLLECTION in mongo.list_collection_names()
+
+    if layout == 'standard':
+        if legacy_exists:
+            print(f"[ERROR] Both density_logs and {LEGACY_COLLECTION} exist as standard collections; "
+                  "resolve this manually before migrating")
+            return
+        mongo.density_logs.rename(LEGACY_COLLECTION)
+        database.create_timeseries_density_logs(args.ttl_days)
+        mongo.density_logs.create_index([("camera_id", 1), ("timestamp", -1)])
+        mongo.migrations.replace_one({'_id': MIGRATION_ID}, {'_id': MIGRATION_ID, 'last_id': None}, upsert=True)
+        print(f"[OK] Renamed density_logs to {LEGACY_COLLECTION} and created the time-series collection")
+    elif layout is None:
+        database.create_timeseries_density_logs(args.ttl_days)
+        mongo.density_logs.create_index([("camera_id", 1), ("timestamp", -1)])
+        if not legacy_exists:
+            print("[OK] Created density_logs as a time-series collection (nothing to migrate)")
+            return
+        # A previous run stopped between the rename and the create
+        print(f"[OK] Created the time-series collection; resuming the copy from {LEGACY_COLLECTION}")
+    elif not legacy_exists:
+        print("[OK] density_logs is already a time-series collection")
+        return
+
+    # Copy in _id order, resuming after the last copied batch
+    state = mongo.migrations.find_one({'_id': MIGRATION_ID}) or {}
+    last_id = state.get('last_id')
+    total = mongo[LEGACY_COLLECTION].estimated_document_count()
+    copied = mongo[LEGACY_COLLECTION].count_documents({'_id': {'$lte': last_id}}) if last_id else 0
+    started = time.time()
+    resuming = True
+
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id else {}
+        batch = list(mongo[LEGACY_COLLECTION].find(query).sort('_id', 1).limit(args.batch_size))
+        if not batch:
+            break
+        missing = batch
+        if resuming:
+            # An interrupted run may have inserted this batch without recording it, and
+            # time-series collections do not enforce unique _ids: skip what is already there
+            missing = without_copied(mongo, batch)
+            resuming = False
+        if missing:
+            mongo.density_logs.insert_many(missing, ordered=False)
+        last_id = batch[-1]['_id']
+        mongo.migrations.update_one({'_id': MIGRATION_ID}, {'$set': {'last_id': last_id}})
+        copied += len(batch)
+        rate = copied / max(time.time() - started, 1e-6)
+        print(f"  {copied}/{total} logs copied ({rate:.0f}/s)")
+
+    mongo.migrations.update_one({'_id': MIGRATION_ID}, {'$set': {'completed_at': time.time()}})
+    print(f"[OK] Copied {copied} logs into the time-series collection")
+
+    if args.drop_legacy:
+        mongo[LEGACY_COLLECTION].drop()
+        print(f"[OK] Dropped {LEGACY_COLLECTION}")
+    else:
+        print(f"Old logs kept in {LEGACY_COLLECTION}; re-run with --drop-legacy to remove them")
+    print("Set DENSITY_LOG_STORAGE=timeseries in .env before restarting the server")
+
+if __name__ == '__main__':
+    main()
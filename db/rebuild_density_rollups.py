@@ -0,0 +1,30 @@
+"""
+Recompute density rollups (minute/hour/day) from the raw density logs
+Run: python db/rebuild_density_rollups.py [camera_id]
+
+Buckets older than the oldest raw log (expired by DENSITY_LOG_TTL_DAYS) are
+left untouched.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from models import init_db, DensityRollup
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'backend', '.env'))
+
+# Initialize database
+mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://127.0.0.1:27017/crowd_density_db')
+init_db(mongodb_uri)
+
+camera_id = sys.argv[1] if len(sys.argv) > 1 else None
+
+print("=" * 60)
+print(f"Rebuilding density rollups for {'camera ' + camera_id if camera_id else 'all cameras'}")
+print("=" * 60)
+
+processed = DensityRollup.rebuild(camera_id)
+print(f"[OK] Folded {processed} density logs into {', '.join(DensityRollup.COLLECTIONS.values())}")
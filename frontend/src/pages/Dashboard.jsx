@@ -1,14 +1,18 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { useAuth } from '../context/AuthContext'
 import api from '../services/api'
-import { Camera, Plus, LogOut, AlertCircle } from 'lucide-react'
+import { io } from 'socket.io-client'
+import { Camera, Plus, LogOut, AlertCircle, Eye, EyeOff } from 'lucide-react'
 
 const Dashboard = () => {
   const [cameras, setCameras] = useState([])
   const [loading, setLoading] = useState(true)
   const [showAddModal, setShowAddModal] = useState(false)
   const [newCamera, setNewCamera] = useState({ name: '', url: '', location: '' })
+  const [livePreview, setLivePreview] = useState(false)
+  const previewRefs = useRef({})
+  const previewUrls = useRef({})
   const { user, logout } = useAuth()
   const navigate = useNavigate()
 
@@ -16,10 +20,57 @@ const Dashboard = () => {
     fetchCameras()
   }, [])
 
+  // Live thumbnails use the low-bandwidth profile and are drawn straight into the
+  // <img> elements so frames don't re-render the whole grid
+  useEffect(() => {
+    if (!livePreview || cameras.length === 0) return
+
+    const socketUrl = import.meta.env.VITE_SOCKET_URL || window.location.origin
+    const socket = io(socketUrl, {
+      transports: ['websocket', 'polling'],
+      path: '/socket.io/',
+      auth: { token: localStorage.getItem('token') }
+    })
+
+    socket.on('connect', () => {
+      cameras.forEach((camera) => {
+        socket.emit('start_stream', { camera_id: camera.id, profile: 'thumbnail', binary: true })
+      })
+    })
+
+    socket.on('frame', (data) => {
+      const img = previewRefs.current[data?.camera_id]
+      if (!img || !data.frame) return
+      const url = typeof data.frame === 'string'
+        ? `data:image/jpeg;base64,${data.frame}`
+        : URL.createObjectURL(new Blob([data.frame], { type: 'image/jpeg' }))
+      img.src = url
+      const previous = previewUrls.current[data.camera_id]
+      if (previous) URL.revokeObjectURL(previous)
+      previewUrls.current[data.camera_id] = url.startsWith('blob:') ? url : null
+    })
+
+    return () => {
+      cameras.forEach((camera) => socket.emit('stop_stream', { camera_id: camera.id }))
+      socket.disconnect()
+      Object.values(previewUrls.current).forEach((url) => url && URL.revokeObjectURL(url))
+      previewUrls.current = {}
+    }
+  }, [livePreview, cameras])
+
   const fetchCameras = async () => {
     try {
-      const response = await api.get('/cameras')
-      setCameras(response.data.cameras)
+      // Follow the keyset cursor until every page is loaded
+      const allCameras = []
+      let cursor = null
+      do {
+        const response = await api.get('/cameras', {
+          params: { limit: 200, fields: 'name,location', ...(cursor && { after: cursor }) }
+        })
+        allCameras.push(...response.data.cameras)
+        cursor = response.data.next_cursor
+      } while (cursor)
+      setCameras(allCameras)
     } catch (error) {
       console.error('Failed to fetch cameras:', error)
     } finally {
@@ -68,13 +119,22 @@ const Dashboard = () => {
       <main className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
         <div className="flex justify-between items-center mb-6">
           <h2 className="text-3xl font-bold text-white">Camera Feeds</h2>
-          <button
-            onClick={() => setShowAddModal(true)}
-            className="flex items-center gap-2 px-6 py-3 bg-blue-600 hover:bg-blue-700 text-white rounded-lg font-semibold transition shadow-lg"
-          >
-            <Plus className="w-5 h-5" />
-            Add Camera
-          </button>
+          <div className="flex gap-3">
+            <button
+              onClick={() => setLivePreview(!livePreview)}
+              className="flex items-center gap-2 px-6 py-3 bg-white/10 hover:bg-white/20 text-white rounded-lg font-semibold transition shadow-lg"
+            >
+              {livePreview ? <EyeOff className="w-5 h-5" /> : <Eye className="w-5 h-5" />}
+              {livePreview ? 'Hide Previews' : 'Live Previews'}
+            </button>
+            <button
+              onClick={() => setShowAddModal(true)}
+              className="flex items-center gap-2 px-6 py-3 bg-blue-600 hover:bg-blue-700 text-white rounded-lg font-semibold transition shadow-lg"
+            >
+              <Plus className="w-5 h-5" />
+              Add Camera
+            </button>
+          </div>
         </div>
 
         {loading ? (
@@ -112,6 +172,15 @@ const Dashboard = () => {
                     </div>
                   </div>
                 </div>
+                {livePreview && (
+                  <div className="bg-black rounded-lg overflow-hidden" style={{ aspectRatio: '16/9' }}>
+                    <img
+                      ref={(el) => { previewRefs.current[camera.id] = el }}
+                      alt={`${camera.name} preview`}
+                      className="w-full h-full object-contain"
+                    />
+                  </div>
+                )}
                 <div className="mt-4 pt-4 border-t border-white/20">
                   <p className="text-blue-200 text-sm">Click to monitor</p>
                 </div>
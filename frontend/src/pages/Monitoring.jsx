@@ -29,6 +29,9 @@ ChartJS.register(
   Filler
 )
 
+// Wall displays get the full-resolution profile, everything else the standard one
+const pickProfile = () => (window.innerWidth * (window.devicePixelRatio || 1) >= 1600 ? 'full' : 'standard')
+
 const Monitoring = () => {
   const { cameraId } = useParams()
   const navigate = useNavigate()
@@ -38,10 +41,12 @@ const Monitoring = () => {
   const [density, setDensity] = useState({ person_count: 0, density_value: 0, density_per_sqm: 0 })
   const [alert, setAlert] = useState(false)
   const [threshold, setThreshold] = useState(0.65)
+  const [renderMode, setRenderMode] = useState('auto')
   const [densityHistory, setDensityHistory] = useState([])
   const [chartData, setChartData] = useState({ labels: [], datasets: [] })
   const videoRef = useRef(null)
   const socketRef = useRef(null)
+  const frameUrlRef = useRef(null)
   const [showSettings, setShowSettings] = useState(false)
 
   const fetchCameraInfo = useCallback(async () => {
@@ -72,6 +77,8 @@ const Monitoring = () => {
       socketRef.current = io(socketUrl, {
         transports: ['websocket', 'polling'],
         path: '/socket.io/',
+        // The server authenticates the handshake once instead of every event
+        auth: { token: localStorage.getItem('token') },
         reconnection: true,
         reconnectionDelay: 1000,
         reconnectionAttempts: 5
@@ -82,7 +89,10 @@ const Monitoring = () => {
         // Send start signal once connected
         socketRef.current.emit('start_stream', {
           camera_id: cameraId,
-          threshold: threshold 
+          threshold: threshold,
+          profile: pickProfile(),
+          render: renderMode,
+          binary: true
         })
       })
 
@@ -93,7 +103,15 @@ const Monitoring = () => {
       socketRef.current.on('frame', (data) => {
         if (data && data.camera_id === cameraId) {
           if (videoRef.current && data.frame) {
-            videoRef.current.src = `data:image/jpeg;base64,${data.frame}`
+            if (typeof data.frame === 'string') {
+              videoRef.current.src = `data:image/jpeg;base64,${data.frame}`
+            } else {
+              // Raw JPEG bytes sent as a binary attachment
+              const url = URL.createObjectURL(new Blob([data.frame], { type: 'image/jpeg' }))
+              videoRef.current.src = url
+              if (frameUrlRef.current) URL.revokeObjectURL(frameUrlRef.current)
+              frameUrlRef.current = url
+            }
           }
           if (data.density) setDensity(data.density)
           if (data.alert !== undefined) setAlert(data.alert)
@@ -114,11 +132,16 @@ const Monitoring = () => {
         setStreaming(false)
       })
 
+      socketRef.current.on('connect_error', (error) => {
+        console.error('Socket connection refused:', error.message)
+        setStreaming(false)
+      })
+
       socketRef.current.on('disconnect', () => {
         console.log('Socket disconnected')
       })
     }
-  }, [cameraId, threshold])
+  }, [cameraId, threshold, renderMode])
 
   const stopStream = useCallback(() => {
     if (socketRef.current) {
@@ -129,6 +152,10 @@ const Monitoring = () => {
     if (videoRef.current) {
       videoRef.current.src = ''
     }
+    if (frameUrlRef.current) {
+      URL.revokeObjectURL(frameUrlRef.current)
+      frameUrlRef.current = null
+    }
   }, [cameraId])
 
   // Setup streaming effect
@@ -326,12 +353,30 @@ const Monitoring = () => {
                   className="w-full"
                 />
               </div>
+              <div>
+                <label className="block text-sm font-medium text-gray-700 mb-2">Overlay</label>
+                <select
+                  value={renderMode}
+                  onChange={(e) => setRenderMode(e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg text-gray-800"
+                >
+                  <option value="auto">Auto (no labels for large crowds)</option>
+                  <option value="boxes">Bounding boxes</option>
+                  <option value="heatmap">Heatmap</option>
+                </select>
+              </div>
               <button
                 onClick={() => {
                   setShowSettings(false);
-                  if (streaming) {
-                    setStreaming(false);
-                    setTimeout(() => setStreaming(true), 100);
+                  // The server applies the new threshold to this viewer without restarting the stream
+                  if (streaming && socketRef.current) {
+                    socketRef.current.emit('update_stream', {
+                      camera_id: cameraId,
+                      threshold: threshold,
+                      profile: pickProfile(),
+                      render: renderMode,
+                      binary: true
+                    })
                   }
                 }}
                 className="w-full px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white rounded-lg font-semibold transition"